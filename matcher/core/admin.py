@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import User, Thesis, Application, Skill, ResearchInterest, StudentInterest, ThesisSkill, ThesisInterest, StudentSkill
+from .models import User, Thesis, Application, Skill, ResearchInterest, StudentInterest, ThesisSkill, ThesisInterest, StudentSkill, MatchScore, \
+    NotificationArchive
 
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
@@ -7,7 +8,7 @@ class UserAdmin(admin.ModelAdmin):
 
 @admin.register(Thesis)
 class ThesisAdmin(admin.ModelAdmin):
-    list_display = ("id", "title", "supervisor", "status", "max_students")
+    list_display = ("id", "title", "supervisor", "status", "max_students", "accepted_count")
     list_filter = ("status", "department")
 
 @admin.register(Application)
@@ -38,3 +39,12 @@ class ThesisInterestAdmin(admin.ModelAdmin):
 @admin.register(StudentSkill)
 class StudentSkillAdmin(admin.ModelAdmin):
     list_display = ("id", "student", "skill")
+
+@admin.register(MatchScore)
+class MatchScoreAdmin(admin.ModelAdmin):
+    list_display = ("id", "student", "thesis", "rank", "score", "computed_at")
+
+@admin.register(NotificationArchive)
+class NotificationArchiveAdmin(admin.ModelAdmin):
+    list_display = ("id", "recipient", "created_at", "archived_at")
+    list_filter = ("archived_at",)
@@ -0,0 +1,219 @@
+"""
+Batch allocation of pending applications.
+
+Runs student-proposing deferred acceptance (Gale-Shapley with capacities)
+over every pending Application in one pass:
+
+- students propose to the theses they applied to, best match score first
+  (the score already weights their StudentInterest priorities), earlier
+  applications breaking ties;
+- a thesis and its supervisor tentatively hold the best proposals by the
+  same score, and bump the weakest one whenever Thesis.max_students or the
+  per-supervisor cap would be exceeded.
+
+Students already accepted somewhere keep their place and use up capacity.
+The result is stable for the score ordering: no student/thesis pair would
+both rather be matched to each other.
+"""
+import heapq
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+
+from django.db import transaction
+
+from . import matching, applications, stats
+from .notifications import notify_many
+from .models import Application, Notification, Thesis, User, MAX_STUDENTS_PER_SUPERVISOR
+
+
+@dataclass
+class Allocation:
+    accepted: list = field(default_factory=list)
+    unmatched: list = field(default_factory=list)
+    committed: bool = False
+
+    @property
+    def accepted_ids(self):
+        return [app.id for app in self.accepted]
+
+
+def _remaining_capacity():
+    """
+    Free seats per open thesis and per supervisor, from the maintained accepted counters.
+    """
+    theses = Thesis.objects.filter(status=Thesis.Status.OPEN).values(
+        "id", "supervisor_id", "max_students", "accepted_count", "supervisor__accepted_students_count"
+    )
+    thesis_free, supervisor_free, supervisor_of = {}, {}, {}
+    for t in theses:
+        thesis_free[t["id"]] = t["max_students"] - t["accepted_count"]
+        supervisor_free[t["supervisor_id"]] = MAX_STUDENTS_PER_SUPERVISOR - t["supervisor__accepted_students_count"]
+        supervisor_of[t["id"]] = t["supervisor_id"]
+    return thesis_free, supervisor_free, supervisor_of
+
+
+def _locked_capacity(thesis_ids):
+    """
+    Same as _remaining_capacity for `thesis_ids`, with the thesis rows and then the
+    supervisor rows locked in pk order (the order decide_many takes them).
+    """
+    theses = []
+    for ids in _chunks(sorted(thesis_ids)):
+        theses += list(
+            Thesis.objects.select_for_update().filter(id__in=ids, status=Thesis.Status.OPEN)
+            .order_by("id").values("id", "supervisor_id", "max_students", "accepted_count")
+        )
+    supervisor_free = {}
+    for ids in _chunks(sorted({t["supervisor_id"] for t in theses})):
+        supervisor_free.update(
+            (pk, MAX_STUDENTS_PER_SUPERVISOR - count) for pk, count in
+            User.objects.select_for_update().filter(id__in=ids).order_by("id")
+            .values_list("id", "accepted_students_count")
+        )
+    thesis_free = {t["id"]: t["max_students"] - t["accepted_count"] for t in theses}
+    supervisor_of = {t["id"]: t["supervisor_id"] for t in theses}
+    return thesis_free, supervisor_free, supervisor_of
+
+
+def allocate():
+    """
+    Compute an assignment for all pending applications without writing anything.
+    """
+    thesis_free, supervisor_free, supervisor_of = _remaining_capacity()
+    already_placed = set(
+        Application.objects.filter(status=Application.Status.ACCEPTED).values_list("student_id", flat=True)
+    )
+    pending = [
+        app for app in Application.objects.filter(
+            status=Application.Status.PENDING, thesis__status=Thesis.Status.OPEN
+        ).select_related("student", "thesis").order_by("application_date", "id")
+        if app.student_id not in already_placed
+    ]
+
+    engine = matching.get_engine()
+    vectors = engine.student_vectors({app.student_id for app in pending})
+    rank = {}
+    for order, app in enumerate(pending):
+        match = engine.pair_score(vectors[app.student_id], app.thesis_id)
+        score = match.score if match else 0
+        # larger is better for both sides: higher score, then earlier application
+        rank[app.id] = (score, -order)
+
+    preferences = defaultdict(list)
+    for app in pending:
+        preferences[app.student_id].append(app)
+    for apps in preferences.values():
+        apps.sort(key=lambda a: rank[a.id], reverse=True)
+
+    held = set()
+    thesis_heaps = defaultdict(list)
+    supervisor_heaps = defaultdict(list)
+    thesis_load = defaultdict(int)
+    supervisor_load = defaultdict(int)
+    next_choice = defaultdict(int)
+    free_students = deque(preferences)
+
+    def release(app):
+        held.discard(app.id)
+        thesis_load[app.thesis_id] -= 1
+        supervisor_load[supervisor_of[app.thesis_id]] -= 1
+        free_students.append(app.student_id)
+
+    def weakest(heap):
+        # entries of released applications are dropped lazily
+        while heap[0][2].id not in held:
+            heapq.heappop(heap)
+        return heapq.heappop(heap)[2]
+
+    while free_students:
+        student_id = free_students.popleft()
+        choices = preferences[student_id]
+        while next_choice[student_id] < len(choices):
+            app = choices[next_choice[student_id]]
+            next_choice[student_id] += 1
+            supervisor_id = supervisor_of[app.thesis_id]
+            if thesis_free[app.thesis_id] <= 0 or supervisor_free[supervisor_id] <= 0:
+                continue
+
+            held.add(app.id)
+            entry = (rank[app.id], app.id, app)
+            heapq.heappush(thesis_heaps[app.thesis_id], entry)
+            heapq.heappush(supervisor_heaps[supervisor_id], entry)
+            thesis_load[app.thesis_id] += 1
+            supervisor_load[supervisor_id] += 1
+
+            if thesis_load[app.thesis_id] > thesis_free[app.thesis_id]:
+                release(weakest(thesis_heaps[app.thesis_id]))
+            elif supervisor_load[supervisor_id] > supervisor_free[supervisor_id]:
+                release(weakest(supervisor_heaps[supervisor_id]))
+            break
+
+    accepted = [app for app in pending if app.id in held]
+    return Allocation(accepted=accepted, unmatched=[app for app in pending if app.id not in held])
+
+
+def _chunks(items, size=500):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+@transaction.atomic
+def commit_allocation(allocation, reject_unmatched=False):
+    """
+    Apply an allocation in one transaction; notifications are written as one bulk insert.
+    Applications that stopped being pending, or no longer fit because of
+    accepts made since allocate() ran, are skipped. The theses and supervisors
+    involved stay locked until commit, so concurrent accepts cannot take the
+    seats counted here.
+    """
+    still_pending = set()
+    for ids in _chunks(allocation.accepted_ids):
+        still_pending.update(
+            Application.objects.select_for_update()
+            .filter(id__in=ids, status=Application.Status.PENDING)
+            .values_list("id", flat=True)
+        )
+    thesis_free, supervisor_free, supervisor_of = _locked_capacity({app.thesis_id for app in allocation.accepted})
+    accepted = []
+    for app in allocation.accepted:
+        supervisor_id = supervisor_of.get(app.thesis_id)
+        if app.id not in still_pending or supervisor_id is None:
+            continue
+        if thesis_free[app.thesis_id] <= 0 or supervisor_free[supervisor_id] <= 0:
+            continue
+        thesis_free[app.thesis_id] -= 1
+        supervisor_free[supervisor_id] -= 1
+        accepted.append(app)
+
+    for ids in _chunks([app.id for app in accepted]):
+        Application.objects.filter(id__in=ids).update(status=Application.Status.ACCEPTED)
+    applications.record_accepted(accepted)
+    stats.record_bulk(accepted, Application.Status.PENDING, Application.Status.ACCEPTED)
+    notifications = [
+        Notification(recipient_id=app.student_id, message=f"Your application for '{app.thesis.title}' was accepted.")
+        for app in accepted
+    ]
+
+    if reject_unmatched:
+        accepted_ids = {app.id for app in accepted}
+        leftovers = [app for app in allocation.unmatched + allocation.accepted if app.id not in accepted_ids]
+        rejected = []
+        for ids in _chunks([app.id for app in leftovers]):
+            rejected += list(
+                Application.objects.select_for_update(of=("self",))
+                .filter(id__in=ids, status=Application.Status.PENDING)
+                .select_related("thesis")
+            )
+        for ids in _chunks([app.id for app in rejected]):
+            Application.objects.filter(id__in=ids).update(status=Application.Status.REJECTED)
+        stats.record_bulk(rejected, Application.Status.PENDING, Application.Status.REJECTED)
+        notifications += [
+            Notification(recipient_id=app.student_id,
+                         message=f"Your application for '{app.thesis.title}' was rejected.")
+            for app in rejected
+        ]
+
+    notify_many(notifications)
+    allocation.accepted = accepted
+    allocation.committed = True
+    return allocation
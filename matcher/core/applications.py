@@ -0,0 +1,204 @@
+"""
+Application status transitions.
+
+Every status change goes through here so the denormalized accepted counters
+(Thesis.accepted_count and User.accepted_students_count on the supervisor)
+and the per-thesis ThesisStats row move in the same transaction as the
+Application row. Capacity checks then
+read those columns instead of running COUNT queries.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F
+
+from . import stats, catalog
+from .notifications import notify_many
+from .models import Application, Notification, Thesis, User, MAX_STUDENTS_PER_SUPERVISOR
+
+
+class CapacityError(Exception):
+    pass
+
+
+def _shift_counters(thesis_counts, supervisor_counts, sign):
+    for thesis_id, n in thesis_counts.items():
+        Thesis.objects.filter(pk=thesis_id).update(accepted_count=F("accepted_count") + sign * n)
+    for supervisor_id, n in supervisor_counts.items():
+        User.objects.filter(pk=supervisor_id).update(
+            accepted_students_count=F("accepted_students_count") + sign * n
+        )
+    # a supervisor reaching or leaving the cap changes what students can browse
+    catalog.bump()
+
+
+def record_accepted_deleted(application):
+    thesis = Thesis.objects.filter(pk=application.thesis_id).values("id", "supervisor_id").first()
+    if thesis is not None:
+        _shift_counters({thesis["id"]: 1}, {thesis["supervisor_id"]: 1}, -1)
+
+
+def record_accepted(applications, sign=1):
+    """
+    Shift the counters for applications that entered (sign=1) or left (sign=-1)
+    the accepted state through a bulk path. `applications` need thesis loaded.
+    """
+    thesis_counts = Counter(app.thesis_id for app in applications)
+    supervisor_counts = Counter(app.thesis.supervisor_id for app in applications)
+    _shift_counters(thesis_counts, supervisor_counts, sign)
+
+
+def reserve_seat(thesis_id, supervisor_id):
+    """
+    Take one seat on the thesis and one under the supervisor's cap, or raise CapacityError.
+
+    Each counter moves with a conditional UPDATE, so the check and the
+    increment are one statement: concurrent accepts queue on the row lock and
+    re-evaluate the condition, and only accepts for the same thesis or
+    supervisor wait on each other. Call inside a transaction; an error rolls
+    back the thesis seat taken just before.
+    """
+    if not Thesis.objects.filter(pk=thesis_id, accepted_count__lt=F("max_students")).update(
+        accepted_count=F("accepted_count") + 1
+    ):
+        raise CapacityError("Thesis has no capacity.")
+    if not User.objects.filter(pk=supervisor_id, accepted_students_count__lt=MAX_STUDENTS_PER_SUPERVISOR).update(
+        accepted_students_count=F("accepted_students_count") + 1
+    ):
+        raise CapacityError(
+            f"You cannot accept more than {MAX_STUDENTS_PER_SUPERVISOR} students across all your theses."
+        )
+    catalog.bump()
+
+
+def change_status(application, new_status, enforce_capacity=True):
+    """
+    Move an application to `new_status`, keeping the accepted counters in step.
+    Raises CapacityError when accepting would exceed the thesis or supervisor cap.
+    """
+    with transaction.atomic():
+        app = Application.objects.select_for_update().get(pk=application.pk)
+        old_status = app.status
+        if old_status == new_status:
+            return application
+
+        delta = (new_status == Application.Status.ACCEPTED) - (old_status == Application.Status.ACCEPTED)
+        if delta:
+            supervisor_id = Thesis.objects.values_list("supervisor_id", flat=True).get(pk=app.thesis_id)
+            if delta > 0 and enforce_capacity:
+                reserve_seat(app.thesis_id, supervisor_id)
+            else:
+                _shift_counters({app.thesis_id: 1}, {supervisor_id: 1}, delta)
+
+        app.status = new_status
+        app.save(update_fields=["status"])
+        stats.record_transition(app.thesis_id, old_status, new_status)
+    application.status = new_status
+    return application
+
+
+DECISIONS = {"accept": Application.Status.ACCEPTED, "reject": Application.Status.REJECTED}
+
+
+def decide_many(supervisor, decisions):
+    """
+    Apply {application_id: "accept" | "reject"} for one supervisor's theses in a single transaction.
+
+    Rows are locked in the same order as change_status (applications, theses,
+    supervisor), capacity is checked in memory against the locked counters,
+    and everything is written with bulk_update plus one notification insert.
+    Rejects run first so they can free seats for accepts; accepts that do not
+    fit, and ids that are not this supervisor's, are reported in "errors".
+    """
+    result = {"accepted": [], "rejected": [], "errors": {}}
+    with transaction.atomic():
+        apps = {
+            app.pk: app for app in Application.objects.select_for_update(of=("self",))
+            .filter(pk__in=decisions, thesis__supervisor=supervisor)
+            .select_related("thesis").order_by("pk")
+        }
+        theses = {
+            t.pk: t for t in Thesis.objects.select_for_update().filter(pk__in={a.thesis_id for a in apps.values()})
+            .order_by("pk")
+        }
+        supervisor = User.objects.select_for_update().get(pk=supervisor.pk)
+        thesis_free = {pk: t.max_students - t.accepted_count for pk, t in theses.items()}
+        supervisor_free = MAX_STUDENTS_PER_SUPERVISOR - supervisor.accepted_students_count
+
+        ordered = sorted(decisions.items(), key=lambda item: item[1] != "reject")
+        changed, transitions, accepted_delta = [], [], Counter()
+        for app_id, action in ordered:
+            app = apps.get(app_id)
+            if app is None:
+                result["errors"][app_id] = "Application not found."
+                continue
+            new_status = DECISIONS[action]
+            if app.status == new_status:
+                continue
+            delta = (new_status == Application.Status.ACCEPTED) - (app.status == Application.Status.ACCEPTED)
+            if delta > 0:
+                if supervisor_free <= 0:
+                    result["errors"][app_id] = (
+                        f"You cannot accept more than {MAX_STUDENTS_PER_SUPERVISOR} students across all your theses."
+                    )
+                    continue
+                if thesis_free[app.thesis_id] <= 0:
+                    result["errors"][app_id] = "Thesis has no capacity."
+                    continue
+            thesis_free[app.thesis_id] -= delta
+            supervisor_free -= delta
+            accepted_delta[app.thesis_id] += delta
+            transitions.append((app.thesis_id, app.status, new_status))
+            app.status = new_status
+            changed.append(app)
+            result["accepted" if new_status == Application.Status.ACCEPTED else "rejected"].append(app_id)
+
+        Application.objects.bulk_update(changed, ["status"], batch_size=500)
+        thesis_counts = {pk: n for pk, n in accepted_delta.items() if n}
+        if thesis_counts:
+            _shift_counters(thesis_counts, {supervisor.pk: sum(thesis_counts.values())}, 1)
+        status_changes = Counter()
+        for thesis_id, old_status, new_status in transitions:
+            status_changes[(thesis_id, old_status)] -= 1
+            status_changes[(thesis_id, new_status)] += 1
+        stats.shift(status_changes)
+        notify_many(
+            Notification(recipient_id=app.student_id,
+                         message=f"Your application for '{app.thesis.title}' was {app.status}.")
+            for app in changed
+        )
+    return result
+
+
+def reconcile_counters():
+    """
+    Recompute the accepted counters from Application rows and fix any that drifted.
+    Returns (theses fixed, supervisors fixed).
+    """
+    accepted = Application.objects.filter(status=Application.Status.ACCEPTED)
+    thesis_actual = dict(accepted.values("thesis_id").annotate(n=Count("id")).values_list("thesis_id", "n"))
+    supervisor_actual = dict(
+        accepted.values("thesis__supervisor_id").annotate(n=Count("id")).values_list("thesis__supervisor_id", "n")
+    )
+
+    theses = []
+    for thesis in Thesis.objects.only("id", "accepted_count").iterator(chunk_size=2000):
+        actual = thesis_actual.get(thesis.id, 0)
+        if thesis.accepted_count != actual:
+            thesis.accepted_count = actual
+            theses.append(thesis)
+    supervisors = []
+    for user in User.objects.filter(role=User.Role.SUPERVISOR).only("id", "accepted_students_count").iterator(
+        chunk_size=2000
+    ):
+        actual = supervisor_actual.get(user.id, 0)
+        if user.accepted_students_count != actual:
+            user.accepted_students_count = actual
+            supervisors.append(user)
+
+    with transaction.atomic():
+        Thesis.objects.bulk_update(theses, ["accepted_count"], batch_size=500)
+        User.objects.bulk_update(supervisors, ["accepted_students_count"], batch_size=500)
+    if supervisors:
+        catalog.bump()
+    return len(theses), len(supervisors)
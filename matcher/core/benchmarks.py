@@ -0,0 +1,132 @@
+"""
+Latency and query-count benchmarks for the hot views.
+
+Each scenario is driven through the test Client as a real user, so it covers
+middleware, view, ORM and template rendering. Write scenarios run inside a
+transaction that is rolled back, so benchmarking leaves the data (and the
+students' inboxes) untouched. Results can be saved as JSON
+and compared against a stored baseline to catch regressions.
+"""
+import statistics
+import time
+from contextlib import contextmanager, nullcontext
+
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from .models import Application, User
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _pick_users():
+    # the busiest supervisor (most pending applications) and a student with data
+    pending = Q(theses__applications__status=Application.Status.PENDING)
+    supervisor = (
+        User.objects.filter(role=User.Role.SUPERVISOR)
+        .annotate(pending=Count("theses__applications", filter=pending))
+        .filter(pending__gt=0).order_by("-pending", "-id").first()
+    )
+    student = User.objects.filter(role=User.Role.STUDENT, student_skills__isnull=False).order_by("-id").first()
+    return student, supervisor
+
+
+@contextmanager
+def _rolled_back():
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def scenarios(student, supervisor):
+    """
+    (name, user, method, url factory) for every benchmarked endpoint.
+    """
+    pending = iter(
+        Application.objects.filter(thesis__supervisor=supervisor, status=Application.Status.PENDING)
+        .order_by("id").values_list("id", flat=True)
+    )
+
+    def next_pending():
+        pk = next(pending, None)
+        return reverse("update-application-status", args=[pk]) if pk else None
+
+    def fixed(name):
+        return lambda: reverse(name)
+
+    return [
+        ("matched_theses", student, "get", fixed("matched-theses")),
+        ("theses_list[student]", student, "get", fixed("theses")),
+        ("my_applications", student, "get", fixed("my-applications")),
+        ("api_student_theses", student, "get", fixed("api-student-thesis-list")),
+        ("api_my_applications", student, "get", fixed("api-my-applications")),
+        ("api_notifications", student, "get", fixed("api-notification-list")),
+        ("theses_list[supervisor]", supervisor, "get", fixed("theses")),
+        ("supervisor_applications", supervisor, "get", fixed("supervisor-applications")),
+        ("api_theses", supervisor, "get", fixed("api-thesis-list")),
+        ("api_applications", supervisor, "get", fixed("api-application-list")),
+        ("api_supervisor_applications", supervisor, "get", fixed("api-my-thesis-applications")),
+        ("update_application_status", supervisor, "post", next_pending),
+    ]
+
+
+def run(iterations=20, warmup=2):
+    """
+    Time every scenario; returns {name: {p50_ms, p99_ms, mean_ms, queries, samples}}.
+    """
+    student, supervisor = _pick_users()
+    if student is None or supervisor is None:
+        raise ValueError("No suitable student/supervisor found; run generate_dataset first.")
+
+    results = {}
+    with override_settings(ALLOWED_HOSTS=["*"]):
+        for name, user, method, url_for in scenarios(student, supervisor):
+            client = Client()
+            client.force_login(user)
+            timings, queries = [], []
+            for i in range(warmup + iterations):
+                url = url_for()
+                if url is None:
+                    break
+                data = {"action": "reject"} if method == "post" else None
+                with _rolled_back() if method == "post" else nullcontext():
+                    with CaptureQueriesContext(connection) as ctx:
+                        started = time.perf_counter()
+                        getattr(client, method)(url, data)
+                        elapsed = (time.perf_counter() - started) * 1000
+                if i >= warmup:
+                    timings.append(elapsed)
+                    queries.append(len(ctx.captured_queries))
+            if not timings:
+                continue
+            results[name] = {
+                "p50_ms": round(statistics.median(timings), 3),
+                "p99_ms": round(_percentile(timings, 99), 3),
+                "mean_ms": round(statistics.fmean(timings), 3),
+                "queries": max(queries),
+                "samples": len(timings),
+            }
+    return results
+
+
+def regressions(results, baseline, tolerance=0.25):
+    """
+    Human-readable problems: more queries than the baseline, or p50 slower than baseline * (1 + tolerance).
+    """
+    problems = []
+    for name, base in baseline.items():
+        current = results.get(name)
+        if current is None:
+            continue
+        if current["queries"] > base["queries"]:
+            problems.append(f"{name}: {current['queries']} queries (baseline {base['queries']})")
+        if current["p50_ms"] > base["p50_ms"] * (1 + tolerance):
+            problems.append(f"{name}: p50 {current['p50_ms']:.1f} ms (baseline {base['p50_ms']:.1f} ms)")
+    return problems
@@ -0,0 +1,245 @@
+"""
+Vectorized matching of the whole student cohort against all open theses.
+
+Link tables are read once as (row, column) index pairs and turned into
+student x skill, student x interest, thesis x skill and thesis x interest
+matrices. Scores for a block of students against every thesis are then a
+few matrix multiplies, and only the top-K per student is kept and written
+to MatchScore. Scoring is the same as core.matching (keyword-named
+interests and similarity near misses included), so the persisted table and
+the per-request engine agree. Near misses are one more multiply per block:
+student x source item times a source x neighbor adjacency matrix.
+"""
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import keywords, similarity
+from .matching import SKILL_WEIGHT, NEAR_MISS_WEIGHT, Match
+from .models import (
+    User,
+    Thesis,
+    StudentSkill,
+    StudentInterest,
+    ThesisSkill,
+    ThesisInterest,
+    MatchScore,
+)
+
+DEFAULT_CHUNK_SIZE = 2048
+
+
+def _index(ids):
+    return {pk: i for i, pk in enumerate(ids)}
+
+
+def _coo(rows, row_index, col_index):
+    """
+    Keep the (row, col, value) triples whose row and column are both known,
+    as parallel int arrays.
+    """
+    r, c, v = [], [], []
+    for row, col, value in rows:
+        ri = row_index.get(row)
+        ci = col_index.get(col)
+        if ri is not None and ci is not None:
+            r.append(ri)
+            c.append(ci)
+            v.append(value)
+    return np.array(r, dtype=np.int64), np.array(c, dtype=np.int64), np.array(v, dtype=np.float32)
+
+
+def _dense(coo, shape, row_start=0, row_stop=None):
+    rows, cols, values = coo
+    matrix = np.zeros(shape, dtype=np.float32)
+    if row_stop is None:
+        mask = slice(None)
+    else:
+        mask = (rows >= row_start) & (rows < row_stop)
+    matrix[rows[mask] - row_start, cols[mask]] = values[mask]
+    return matrix
+
+
+def _adjacency(neighbors, target_index):
+    """
+    Source index and 0/1 source x target matrix for the neighbor edges that land on a target column.
+    """
+    edges = [(pk, target_index[n]) for pk, ids in neighbors.items() for n in ids if n in target_index]
+    source_index = _index(sorted({pk for pk, _ in edges}))
+    matrix = np.zeros((len(source_index), len(target_index)), dtype=np.float32)
+    for pk, col in edges:
+        matrix[source_index[pk], col] = 1
+    return source_index, matrix
+
+
+class CohortMatrices:
+    """
+    Feature matrices for a set of students and the open theses (or just the open ones of `thesis_ids`).
+    Only skills and interests that appear on some of those theses get a column.
+    """
+
+    def __init__(self, student_ids=None, thesis_ids=None):
+        students = User.objects.filter(role=User.Role.STUDENT)
+        if student_ids is not None:
+            students = students.filter(id__in=student_ids)
+        self.student_ids = list(students.order_by("id").values_list("id", flat=True))
+        theses = Thesis.objects.filter(status=Thesis.Status.OPEN)
+        if thesis_ids is not None:
+            theses = theses.filter(id__in=thesis_ids)
+        self.thesis_ids = list(theses.order_by("id").values_list("id", flat=True))
+        student_index = _index(self.student_ids)
+        thesis_index = _index(self.thesis_ids)
+
+        thesis_filter = {"thesis__status": Thesis.Status.OPEN}
+        if thesis_ids is not None:
+            thesis_filter["thesis_id__in"] = self.thesis_ids
+        thesis_skills = list(ThesisSkill.objects.filter(**thesis_filter).values_list("thesis_id", "skill_id"))
+        thesis_interests = ThesisInterest.objects.filter(**thesis_filter).values_list("thesis_id", "interest_id")
+        keyword_interests = keywords.interest_pairs(status=Thesis.Status.OPEN)
+        if thesis_ids is not None:
+            keyword_interests = [(t, i) for t, i in keyword_interests if t in thesis_index]
+        # a keyword naming an interest the thesis also links must not count twice
+        thesis_interests = list(set(thesis_interests) | set(keyword_interests))
+        skill_index = _index(sorted({s for _, s in thesis_skills}))
+        interest_index = _index(sorted({i for _, i in thesis_interests}))
+
+        self.thesis_skills = _dense(
+            _coo(((t, s, 1) for t, s in thesis_skills), thesis_index, skill_index),
+            (len(self.thesis_ids), len(skill_index)),
+        )
+        self.thesis_interests = _dense(
+            _coo(((t, i, 1) for t, i in thesis_interests), thesis_index, interest_index),
+            (len(self.thesis_ids), len(interest_index)),
+        )
+
+        skill_sources, self.skill_near = _adjacency(similarity.skill_neighbors(), skill_index)
+        interest_sources, self.interest_near = _adjacency(similarity.interest_neighbors(), interest_index)
+
+        student_filter = {} if student_ids is None else {"student_id__in": self.student_ids}
+        # students are kept as index triples and densified one chunk at a time
+        student_skills = list(StudentSkill.objects.filter(**student_filter).values_list("student_id", "skill_id"))
+        student_interests = list(
+            StudentInterest.objects.filter(**student_filter).values_list("student_id", "interest_id", "priority")
+        )
+        self.student_skills = _coo(((st, sk, 1) for st, sk in student_skills), student_index, skill_index)
+        self.student_interests = _coo(student_interests, student_index, interest_index)
+        # the same links over the items that have neighbors, whether or not a thesis lists them
+        self.student_skill_sources = _coo(((st, sk, 1) for st, sk in student_skills), student_index, skill_sources)
+        self.student_interest_sources = _coo(
+            ((st, i, 1) for st, i, _ in student_interests), student_index, interest_sources
+        )
+        self.n_skills = len(skill_index)
+        self.n_interests = len(interest_index)
+
+    def scores(self, start, stop):
+        """
+        Score students[start:stop] against every open thesis. Returns (score, shared_skills,
+        shared_interests, near_skills, near_interests) matrices of shape (stop - start, n_theses).
+        """
+        n = stop - start
+        skills = _dense(self.student_skills, (n, self.n_skills), start, stop)
+        weights = _dense(self.student_interests, (n, self.n_interests), start, stop)
+        shared_skills = skills @ self.thesis_skills.T
+        shared_interests = (weights > 0).astype(np.float32) @ self.thesis_interests.T
+        near_skills = self._near(self.student_skill_sources, self.skill_near, skills, start, stop) @ self.thesis_skills.T
+        near_interests = (
+            self._near(self.student_interest_sources, self.interest_near, weights, start, stop)
+            @ self.thesis_interests.T
+        )
+        score = (
+            SKILL_WEIGHT * shared_skills
+            + weights @ self.thesis_interests.T
+            + NEAR_MISS_WEIGHT * (near_skills + near_interests)
+        )
+        return score, shared_skills, shared_interests, near_skills, near_interests
+
+    @staticmethod
+    def _near(sources, adjacency, held, start, stop):
+        # neighbors of anything the students list, minus what they already list
+        listed = _dense(sources, (stop - start, adjacency.shape[0]), start, stop)
+        return ((listed @ adjacency > 0) & (held == 0)).astype(np.float32)
+
+
+def compute_top_matches(student_ids=None, top_k=None, min_shared=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                        thesis_ids=None):
+    """
+    Yield (student_id, [Match, ...]) for every student, best match first.
+    `thesis_ids` limits the candidates to those theses.
+    """
+    if top_k is None:
+        top_k = getattr(settings, "MATCH_TOP_K", 20)
+    if min_shared is None:
+        min_shared = getattr(settings, "MATCH_MIN_SHARED", 2)
+
+    cohort = CohortMatrices(student_ids, thesis_ids)
+    thesis_ids = np.array(cohort.thesis_ids, dtype=np.int64)
+    n_students = len(cohort.student_ids)
+
+    for start in range(0, n_students, chunk_size):
+        stop = min(start + chunk_size, n_students)
+        if not len(thesis_ids) or top_k <= 0:
+            for student_id in cohort.student_ids[start:stop]:
+                yield student_id, []
+            continue
+
+        score, shared_skills, shared_interests, near_skills, near_interests = cohort.scores(start, stop)
+        eligible = (shared_skills + near_skills >= min_shared) | (shared_interests + near_interests >= min_shared)
+        # fold the tie-break (older theses first, same order as MatchEngine) into a single key
+        n_theses = len(thesis_ids)
+        tie_break = np.arange(n_theses - 1, -1, -1, dtype=np.float64)
+        key = np.where(eligible, score.astype(np.float64) * n_theses + tie_break, -1.0)
+
+        k = min(top_k, n_theses)
+        candidates = np.argpartition(-key, k - 1, axis=1)[:, :k]
+        for row, student_id in enumerate(cohort.student_ids[start:stop]):
+            cols = candidates[row]
+            cols = cols[key[row, cols] >= 0]
+            cols = cols[np.argsort(-key[row, cols])]
+            yield student_id, [
+                Match(
+                    int(thesis_ids[c]),
+                    int(score[row, c]),
+                    int(shared_skills[row, c]),
+                    int(shared_interests[row, c]),
+                    int(near_skills[row, c] + near_interests[row, c]),
+                )
+                for c in cols
+            ]
+
+
+def persist_match_scores(student_ids=None, top_k=None, min_shared=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                         batch_size=5000):
+    """
+    Recompute and replace the MatchScore rows of the given students (all students by default).
+    Returns the number of rows written.
+    """
+    now = timezone.now()
+    written = 0
+    with transaction.atomic():
+        stale = MatchScore.objects.all()
+        if student_ids is not None:
+            stale = stale.filter(student_id__in=student_ids)
+        stale.delete()
+
+        batch = []
+        for student_id, matches in compute_top_matches(student_ids, top_k, min_shared, chunk_size):
+            for rank, m in enumerate(matches, start=1):
+                batch.append(MatchScore(
+                    student_id=student_id,
+                    thesis_id=m.thesis_id,
+                    score=m.score,
+                    rank=rank,
+                    shared_skills=m.shared_skills,
+                    shared_interests=m.shared_interests,
+                    near_misses=m.near_misses,
+                    computed_at=now,
+                ))
+            if len(batch) >= batch_size:
+                MatchScore.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            MatchScore.objects.bulk_create(batch)
+            written += len(batch)
+    return written
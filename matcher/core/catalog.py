@@ -0,0 +1,96 @@
+"""
+Cached open-thesis catalog for students.
+
+Everything students browse is cached under a catalog version number kept in
+the cache. The version is bumped whenever a thesis is saved or deleted,
+whenever a supervisor's profile is saved (theses are listed with their
+supervisor) and whenever accepted counters move (a full supervisor drops
+out of the catalog), so stale entries are never read again and simply expire. The
+version doubles as the ETag of the catalog API responses: a client that
+sends it back in If-None-Match gets a 304 without any catalog query.
+
+The cache is per process with the default backend; CATALOG_CACHE_TTL bounds
+how long another worker can serve a catalog from before a bump reached it.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import Thesis, MAX_STUDENTS_PER_SUPERVISOR
+
+VERSION_KEY = "catalog:version"
+
+
+def _ttl():
+    return getattr(settings, "CATALOG_CACHE_TTL", 600)
+
+
+def version():
+    current = cache.get(VERSION_KEY)
+    if current is None:
+        # start from the clock, so a lost version key never brings back an old version's entries
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        current = cache.get(VERSION_KEY)
+    return current
+
+
+def _incr():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        version()
+
+
+def bump():
+    """
+    Invalidate the catalog now and again once the surrounding transaction commits,
+    so a reader that cached the pre-commit rows in between is not served afterwards.
+    """
+    _incr()
+    if connection.in_atomic_block:
+        transaction.on_commit(_incr)
+
+
+def cached(name, build, at=None):
+    key = f"catalog:{at or version()}:{name}"
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, _ttl())
+    return value
+
+
+def open_theses():
+    """
+    Open theses whose supervisor is still below the cap, supervisor loaded, as a list.
+    """
+    return cached("open_theses", lambda: list(
+        Thesis.objects.list_ready().filter(
+            status=Thesis.Status.OPEN,
+            supervisor__accepted_students_count__lt=MAX_STUDENTS_PER_SUPERVISOR,
+        )
+    ))
+
+
+class CatalogCacheMixin:
+    """
+    Serve student GET lists from the catalog cache, with ETag / If-None-Match.
+    Other roles go straight to the view.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if request.user.role != "student":
+            return super().list(request, *args, **kwargs)
+        current = version()
+        etag = f'"catalog-{current}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag in request.headers.get("If-None-Match", ""):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        data = cached(f"api:{request.get_full_path()}", lambda: super(CatalogCacheMixin, self).list(
+            request, *args, **kwargs
+        ).data, at=current)
+        return Response(data, headers=headers)
@@ -0,0 +1,11 @@
+from . import notifications as notification_store
+
+
+def notifications(request):
+    """
+    Unread badge count for the navbar; a cache read, resolved only when a template uses it.
+    """
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {"unread_notifications": lambda: notification_store.unread_count(user)}
@@ -0,0 +1,129 @@
+"""
+Synthetic data at realistic volumes, inserted with bulk_create.
+
+Used by the benchmark commands; every generated username carries a short
+run tag so repeated runs can share one database. Needs a backend where
+bulk_create returns primary keys (PostgreSQL, SQLite).
+"""
+import random
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from . import keywords, stats
+from .models import (
+    User,
+    Skill,
+    ResearchInterest,
+    Thesis,
+    ThesisSkill,
+    ThesisInterest,
+    ThesisKeyword,
+    StudentSkill,
+    StudentInterest,
+    Application,
+    Notification,
+)
+
+BATCH_SIZE = 2000
+
+
+def _bulk(model, objs):
+    return model.objects.bulk_create(objs, batch_size=BATCH_SIZE)
+
+
+@transaction.atomic
+def generate(students=1000, supervisors=50, theses=200, skills=100, interests=60,
+             skills_per_item=4, interests_per_item=3, applications_per_student=2,
+             notifications_per_user=5, seed=0):
+    """
+    Create a dataset and return a dict of row counts per table.
+    """
+    rng = random.Random(seed)
+    run = uuid.uuid4().hex[:6]
+    now = timezone.now()
+    password = make_password("pass")  # hash once, share across all rows
+
+    skill_objs = _bulk(Skill, [Skill(name=f"skill-{run}-{i}") for i in range(skills)])
+    interest_objs = _bulk(ResearchInterest, [ResearchInterest(name=f"interest-{run}-{i}") for i in range(interests)])
+    skill_ids = [s.id for s in skill_objs]
+    interest_ids = [i.id for i in interest_objs]
+
+    supervisor_objs = _bulk(User, [
+        User(username=f"sup-{run}-{i}", password=password, role=User.Role.SUPERVISOR, department=f"dept{i % 8}")
+        for i in range(supervisors)
+    ])
+    student_objs = _bulk(User, [
+        User(username=f"stud-{run}-{i}", password=password, role=User.Role.STUDENT, department=f"dept{i % 8}")
+        for i in range(students)
+    ])
+
+    thesis_objs = _bulk(Thesis, [
+        Thesis(
+            title=f"Thesis {run}-{i}",
+            description="Generated thesis " * 8,
+            department=f"dept{i % 8}",
+            keywords=", ".join(f"kw{rng.randrange(200)}" for _ in range(4)),
+            supervisor=supervisor_objs[i % len(supervisor_objs)],
+            status=Thesis.Status.OPEN if rng.random() < 0.8 else Thesis.Status.CLOSED,
+            max_students=rng.randint(1, 3),
+        )
+        for i in range(theses)
+    ]) if supervisor_objs else []
+    _bulk(ThesisKeyword, keywords.rows_for((t.id, t.keywords) for t in thesis_objs))
+
+    _bulk(ThesisSkill, [
+        ThesisSkill(thesis=t, skill_id=s)
+        for t in thesis_objs for s in rng.sample(skill_ids, min(skills_per_item, len(skill_ids)))
+    ])
+    _bulk(ThesisInterest, [
+        ThesisInterest(thesis=t, interest_id=i)
+        for t in thesis_objs for i in rng.sample(interest_ids, min(interests_per_item, len(interest_ids)))
+    ])
+    _bulk(StudentSkill, [
+        StudentSkill(student=st, skill_id=s)
+        for st in student_objs for s in rng.sample(skill_ids, min(skills_per_item, len(skill_ids)))
+    ])
+    _bulk(StudentInterest, [
+        StudentInterest(student=st, interest_id=i, priority=rng.randint(1, 3))
+        for st in student_objs for i in rng.sample(interest_ids, min(interests_per_item, len(interest_ids)))
+    ])
+
+    # no accepted rows, so the accepted counters on Thesis/User stay in sync
+    statuses = [Application.Status.PENDING] * 6 + [Application.Status.REJECTED] * 3 + [Application.Status.WITHDRAWN]
+    applications = _bulk(Application, [
+        Application(
+            student=st,
+            thesis=t,
+            status=rng.choice(statuses),
+            application_date=now - timedelta(minutes=rng.randrange(60 * 24 * 30)),
+            motivation_letter="Generated motivation.",
+        )
+        for st in student_objs
+        for t in rng.sample(thesis_objs, min(applications_per_student, len(thesis_objs)))
+    ])
+
+    # bulk_create skips the signals that maintain ThesisStats
+    stats.refresh([t.id for t in thesis_objs])
+
+    notifications = _bulk(Notification, [
+        Notification(
+            recipient=user,
+            message=f"Generated notification {n}",
+            created_at=now - timedelta(minutes=rng.randrange(60 * 24 * 90)),
+            read=rng.random() < 0.7,
+        )
+        for user in supervisor_objs + student_objs
+        for n in range(notifications_per_user)
+    ])
+
+    return {
+        "users": len(supervisor_objs) + len(student_objs),
+        "theses": len(thesis_objs),
+        "applications": len(applications),
+        "notifications": len(notifications),
+        "run": run,
+    }
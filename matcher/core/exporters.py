@@ -0,0 +1,63 @@
+"""
+Streaming exports of applications as CSV or JSONL.
+
+Rows come from a flat values_list() projection read with .iterator(), and
+are formatted one line at a time, so memory use does not grow with the
+number of rows exported. Accepted applications are the assignments.
+"""
+import csv
+import json
+
+from .models import Application
+
+CHUNK_SIZE = 2000
+FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+
+# output column -> ORM path
+COLUMNS = {
+    "id": "id",
+    "status": "status",
+    "application_date": "application_date",
+    "student": "student__username",
+    "student_email": "student__email",
+    "student_department": "student__department",
+    "thesis_id": "thesis_id",
+    "thesis": "thesis__title",
+    "department": "thesis__department",
+    "supervisor": "thesis__supervisor__username",
+}
+
+
+def applications(status=None, department=None, supervisor=None):
+    """
+    Export rows as tuples in COLUMNS order; `supervisor` is a username.
+    """
+    qs = Application.objects.order_by("id")
+    if status:
+        qs = qs.filter(status=status)
+    if department:
+        qs = qs.filter(thesis__department=department)
+    if supervisor:
+        qs = qs.filter(thesis__supervisor__username=supervisor)
+    return qs.values_list(*COLUMNS.values())
+
+
+class _Echo:
+    # csv.writer target that hands each formatted line back instead of buffering it
+    def write(self, value):
+        return value
+
+
+def lines(rows, fmt, chunk_size=CHUNK_SIZE):
+    """
+    Formatted output lines for a values_list queryset, header first for CSV.
+    """
+    columns = list(COLUMNS)
+    if fmt == "csv":
+        writer = csv.writer(_Echo())
+        yield writer.writerow(columns)
+        for row in rows.iterator(chunk_size=chunk_size):
+            yield writer.writerow(row)
+    else:
+        for row in rows.iterator(chunk_size=chunk_size):
+            yield json.dumps(dict(zip(columns, row)), default=str) + "\n"
@@ -0,0 +1,384 @@
+"""
+Bulk imports from CSV or JSONL.
+
+Input is streamed and handled in chunks: each chunk is validated row by
+row (bad rows are reported, not fatal), lookup names are resolved through
+in-memory name -> id maps that create missing rows in bulk, and the chunk
+is written with bulk_create in one transaction. Memory stays bounded by
+the chunk size plus the size of the lookup tables.
+
+Thesis rows: title, supervisor (username), and optionally description,
+department, keywords, status, max_students, skills, interests. In CSV,
+skills and interests are ";"-separated; in JSONL they may also be lists.
+
+Student rows: username, and optionally email, first_name, last_name,
+department, skills, interests. Interests carry a priority as "name:3"
+(1-3, default 2; only a trailing ":<digits>" is a priority, so names may
+contain ":"), or as a {name: priority} object in JSONL. Usernames longer
+than the column are row errors, never truncated. Students are
+upserted by username, overwriting only the profile columns present in the
+file; skills and interests are added (or re-prioritised), never removed.
+"""
+import csv
+import json
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from . import matching, catalog, search, keywords, incremental
+from .models import (
+    User,
+    Skill,
+    ResearchInterest,
+    Thesis,
+    ThesisSkill,
+    ThesisInterest,
+    ThesisKeyword,
+    StudentSkill,
+    StudentInterest,
+)
+
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_PRIORITY = 2
+STUDENT_FIELDS = ["email", "first_name", "last_name", "department"]
+MAX_REPORTED_ERRORS = 1000
+MAX_USERNAME_LENGTH = User._meta.get_field("username").max_length
+
+
+class ImportFormatError(Exception):
+    pass
+
+
+def detect_format(filename, fmt=None):
+    fmt = fmt or filename.rsplit(".", 1)[-1].lower()
+    if fmt in ("json", "ndjson"):
+        fmt = "jsonl"
+    if fmt not in ("csv", "jsonl"):
+        raise ImportFormatError(f"Unsupported import format: {fmt!r} (use csv or jsonl).")
+    return fmt
+
+
+def read_records(stream, fmt):
+    """
+    Yield (row number, dict) from a text stream; malformed JSON lines come through as (row, None).
+    """
+    if fmt == "csv":
+        for number, row in enumerate(csv.DictReader(stream), start=1):
+            yield number, row
+        return
+    number = 0
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        number += 1
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield number, record if isinstance(record, dict) else None
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def text(record, key):
+    value = record.get(key)
+    return "" if value is None else str(value).strip()
+
+
+def split_names(value, max_length=120):
+    """
+    ";"-separated string or list -> unique, stripped names in input order.
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(";")
+    names = list(dict.fromkeys(str(name).strip() for name in value if name and str(name).strip()))
+    if any(len(name) > max_length for name in names):
+        raise ValueError(f"names are limited to {max_length} characters")
+    return names
+
+
+class NameMap:
+    """
+    name -> id for a table with a unique name column, filled per chunk.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.ids = {}
+
+    def resolve(self, names):
+        missing = set(names) - self.ids.keys()
+        if not missing:
+            return
+        found = dict(self.model.objects.filter(name__in=missing).values_list("name", "id"))
+        new = missing - found.keys()
+        if new:
+            # ignore_conflicts: a concurrent import may have added the same names
+            self.model.objects.bulk_create([self.model(name=name) for name in new], ignore_conflicts=True)
+            found.update(self.model.objects.filter(name__in=new).values_list("name", "id"))
+        self.ids.update(found)
+
+    def __getitem__(self, name):
+        return self.ids[name]
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    links: int = 0
+    errors: list = field(default_factory=list)
+    error_count: int = 0
+
+    def error(self, row, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "error": message})
+
+    def as_dict(self):
+        return {"rows": self.rows, "created": self.created, "updated": self.updated, "links": self.links,
+                "error_count": self.error_count, "errors": self.errors}
+
+
+def _parse_thesis(record, supervisors):
+    title = text(record, "title")
+    if not title:
+        raise ValueError("title is required")
+    username = text(record, "supervisor")
+    if username not in supervisors:
+        raise ValueError(f"unknown supervisor {username!r}")
+    status = text(record, "status").lower() or Thesis.Status.OPEN
+    if status not in Thesis.Status.values:
+        raise ValueError(f"invalid status {status!r}")
+    try:
+        max_students = int(text(record, "max_students") or 1)
+    except ValueError:
+        raise ValueError("max_students must be a whole number")
+    if max_students < 1:
+        raise ValueError("max_students must be at least 1")
+    thesis = Thesis(
+        title=title[:200],
+        description=text(record, "description"),
+        department=text(record, "department")[:120],
+        keywords=text(record, "keywords")[:300],
+        supervisor_id=supervisors[username],
+        status=status,
+        max_students=max_students,
+    )
+    return thesis, split_names(record.get("skills")), split_names(record.get("interests"))
+
+
+def _write_theses(parsed, skills, interests, batch_size):
+    skills.resolve({name for _, names, _ in parsed for name in names})
+    interests.resolve({name for _, _, names in parsed for name in names})
+    with transaction.atomic():
+        theses = Thesis.objects.bulk_create([thesis for thesis, _, _ in parsed])
+        thesis_skills = [
+            ThesisSkill(thesis_id=thesis.id, skill_id=skills[name])
+            for thesis, (_, names, _) in zip(theses, parsed) for name in names
+        ]
+        thesis_interests = [
+            ThesisInterest(thesis_id=thesis.id, interest_id=interests[name])
+            for thesis, (_, _, names) in zip(theses, parsed) for name in names
+        ]
+        ThesisSkill.objects.bulk_create(thesis_skills, batch_size=batch_size)
+        ThesisInterest.objects.bulk_create(thesis_interests, batch_size=batch_size)
+        ThesisKeyword.objects.bulk_create(
+            keywords.rows_for((thesis.id, thesis.keywords) for thesis in theses), batch_size=batch_size
+        )
+        # bulk_create skips the change-capture signals
+        incremental.mark(thesis_ids=[thesis.id for thesis in theses])
+    return len(theses), len(thesis_skills) + len(thesis_interests)
+
+
+def import_theses(records, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """
+    Create theses and their skill/interest links from (row number, dict) records.
+    `progress`, if given, is called with the running ImportResult after each chunk.
+    """
+    result = ImportResult()
+    skills = NameMap(Skill)
+    interests = NameMap(ResearchInterest)
+    supervisors = {}
+
+    for chunk in chunked(records, chunk_size):
+        result.rows += len(chunk)
+        usernames = {text(record, "supervisor") for _, record in chunk if record} - supervisors.keys()
+        supervisors.update(
+            User.objects.filter(username__in=usernames, role=User.Role.SUPERVISOR).values_list("username", "id")
+        )
+
+        parsed = []
+        for number, record in chunk:
+            if record is None:
+                result.error(number, "not a JSON object")
+                continue
+            try:
+                parsed.append(_parse_thesis(record, supervisors))
+            except ValueError as e:
+                result.error(number, str(e))
+        if parsed:
+            created, links = _write_theses(parsed, skills, interests, chunk_size)
+            result.created += created
+            result.links += links
+        if progress:
+            progress(result)
+
+    # bulk_create bypasses the signals that drop the cached match engine and catalog and update search
+    if result.created:
+        matching.invalidate()
+        catalog.bump()
+        search.invalidate()
+    return result
+
+
+def priorities(value, max_length=120):
+    """
+    Interests with priorities -> {name: priority}.
+    """
+    if not value:
+        return {}
+    if isinstance(value, dict):
+        pairs = [(str(name), priority) for name, priority in value.items()]
+    else:
+        pairs = []
+        for entry in value.split(";") if isinstance(value, str) else value:
+            name, sep, priority = str(entry).rpartition(":")
+            if sep and priority.strip().isdigit():
+                pairs.append((name, priority))
+            else:
+                pairs.append((str(entry), DEFAULT_PRIORITY))
+    result = {}
+    for name, priority in pairs:
+        name = name.strip()
+        if not name:
+            continue
+        if len(name) > max_length:
+            raise ValueError(f"names are limited to {max_length} characters")
+        try:
+            priority = int(str(priority).strip())
+        except ValueError:
+            priority = None
+        if priority not in dict(StudentInterest.PRIORITY):
+            raise ValueError(f"priority for {name!r} must be 1, 2 or 3")
+        result[name] = priority
+    return result
+
+
+def _parse_student(record):
+    username = text(record, "username")
+    if not username:
+        raise ValueError("username is required")
+    if len(username) > MAX_USERNAME_LENGTH:
+        # truncating could merge two long usernames into one account
+        raise ValueError(f"username is limited to {MAX_USERNAME_LENGTH} characters")
+    try:
+        User.username_validator(username)
+    except ValidationError:
+        raise ValueError(f"invalid username {username!r}")
+    email = text(record, "email")
+    if email:
+        try:
+            validate_email(email)
+        except ValidationError:
+            raise ValueError(f"invalid email {email!r}")
+    user = User(
+        username=username,
+        email=email,
+        first_name=text(record, "first_name")[:150],
+        last_name=text(record, "last_name")[:150],
+        department=text(record, "department")[:120],
+        role=User.Role.STUDENT,
+    )
+    return user, split_names(record.get("skills")), priorities(record.get("interests"))
+
+
+def _write_students(parsed, existing, columns, skills, interests, password, batch_size):
+    skills.resolve({name for _, names, _ in parsed for name in names})
+    interests.resolve({name for _, _, names in parsed for name in names})
+    users = [user for user, _, _ in parsed]
+    for user in users:
+        if user.username not in existing:
+            user.password = password
+    with transaction.atomic():
+        if columns:
+            User.objects.bulk_create(users, update_conflicts=True, unique_fields=["username"], update_fields=columns)
+        else:
+            User.objects.bulk_create(users, ignore_conflicts=True)
+        # not every backend returns ids for upserted rows
+        ids = dict(User.objects.filter(username__in=[u.username for u in users]).values_list("username", "id"))
+        student_skills = [
+            StudentSkill(student_id=ids[user.username], skill_id=skills[name])
+            for user, names, _ in parsed for name in names
+        ]
+        student_interests = [
+            StudentInterest(student_id=ids[user.username], interest_id=interests[name], priority=priority)
+            for user, _, wanted in parsed for name, priority in wanted.items()
+        ]
+        StudentSkill.objects.bulk_create(student_skills, batch_size=batch_size, ignore_conflicts=True)
+        StudentInterest.objects.bulk_create(
+            student_interests, batch_size=batch_size,
+            update_conflicts=True, unique_fields=["student", "interest"], update_fields=["priority"],
+        )
+        incremental.mark(student_ids=ids.values())
+    return len(student_skills) + len(student_interests)
+
+
+def import_students(records, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """
+    Upsert students with their skills and interests from (row number, dict) records.
+    `progress`, if given, is called with the running ImportResult after each chunk.
+    """
+    result = ImportResult()
+    skills = NameMap(Skill)
+    interests = NameMap(ResearchInterest)
+    # new accounts cannot log in until a password is set; hash once per run
+    password = make_password(None)
+
+    for chunk in chunked(records, chunk_size):
+        result.rows += len(chunk)
+        usernames = {text(record, "username") for _, record in chunk if record}
+        existing = dict(User.objects.filter(username__in=usernames).values_list("username", "role"))
+
+        # only overwrite profile fields the file actually carries
+        columns = [f for f in STUDENT_FIELDS if any(record and f in record for _, record in chunk)]
+        parsed, seen = [], {}
+        for number, record in chunk:
+            if record is None:
+                result.error(number, "not a JSON object")
+                continue
+            try:
+                user, skill_names, interest_priorities = _parse_student(record)
+            except ValueError as e:
+                result.error(number, str(e))
+                continue
+            if existing.get(user.username, User.Role.STUDENT) != User.Role.STUDENT:
+                result.error(number, f"{user.username!r} is not a student account")
+                continue
+            if user.username in seen:
+                # one upsert statement cannot touch the same row twice
+                result.error(number, f"duplicate of row {seen[user.username]}")
+                continue
+            seen[user.username] = number
+            parsed.append((user, skill_names, interest_priorities))
+
+        if parsed:
+            result.links += _write_students(parsed, existing, columns, skills, interests, password, chunk_size)
+            updated = sum(user.username in existing for user, _, _ in parsed)
+            result.updated += updated
+            result.created += len(parsed) - updated
+        if progress:
+            progress(result)
+    return result
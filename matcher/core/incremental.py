@@ -0,0 +1,237 @@
+"""
+Incremental MatchScore maintenance.
+
+Signals on StudentSkill, StudentInterest, ThesisSkill, ThesisInterest and
+Thesis (core.signals; a thesis only when its status or keywords really
+change) mark the affected students or theses dirty once the transaction
+commits. Marks are coalesced in a process-wide queue (a set per
+kind, so ten edits to one student are one recompute) and a background
+thread drains it every MATCH_REFRESH_INTERVAL seconds:
+
+- a dirty student gets their top-K rewritten by persist_match_scores;
+- a dirty thesis is scored on its own column only, against the students
+  sharing at least one skill or interest with it (near misses included),
+  and just the students it could enter or leave the top-K of (it is in
+  their rows now, or it beats their current K-th score) are recomputed.
+
+If a refresh fails on a database error the marks are kept for the next
+round. Any other failure is narrowed down by recomputing the marks in
+halves; an id that still fails on its own is retried MAX_RETRIES times and
+then dropped with an error log, so it cannot hold back the others.
+
+MATCH_REFRESH_ASYNC = False refreshes straight away after the commit, and
+hands the marks to the queue if that fails.
+"""
+import atexit
+import logging
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import OperationalError, close_old_connections, transaction
+from django.db.models import Count, Min
+
+from . import keywords, similarity
+from .bulk_matching import compute_top_matches, persist_match_scores
+from .models import MatchScore, StudentInterest, StudentSkill, Thesis, ThesisInterest, ThesisSkill
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRIES = 3
+
+
+def _overlapping(items, neighbors):
+    # students holding one of the thesis' items, or an item whose neighbor it lists (a near miss)
+    return items | {pk for pk, near in neighbors.items() if items.intersection(near)}
+
+
+def candidate_students(thesis_ids):
+    """
+    Students sharing at least one skill or interest (near misses included) with the given theses:
+    the only ones a thesis can be matched to while MATCH_MIN_SHARED >= 1.
+    """
+    skills = _overlapping(
+        set(ThesisSkill.objects.filter(thesis_id__in=thesis_ids).values_list("skill_id", flat=True)),
+        similarity.skill_neighbors(),
+    )
+    interests = _overlapping(
+        set(ThesisInterest.objects.filter(thesis_id__in=thesis_ids).values_list("interest_id", flat=True))
+        | {interest_id for _, interest_id in keywords.interest_pairs(thesis_ids=thesis_ids)},
+        similarity.interest_neighbors(),
+    )
+    return set(
+        StudentSkill.objects.filter(skill_id__in=skills).values_list("student_id", flat=True)
+    ) | set(StudentInterest.objects.filter(interest_id__in=interests).values_list("student_id", flat=True))
+
+
+def affected_students(thesis_ids):
+    """
+    Students whose top-K can change because the given theses changed.
+    """
+    students = set(MatchScore.objects.filter(thesis_id__in=thesis_ids).values_list("student_id", flat=True))
+    # closed or deleted theses can only drop out of rows
+    thesis_ids = list(
+        Thesis.objects.filter(id__in=thesis_ids, status=Thesis.Status.OPEN).values_list("id", flat=True)
+    )
+    if not thesis_ids:
+        return students
+    candidates = None
+    if getattr(settings, "MATCH_MIN_SHARED", 2) >= 1:
+        candidates = sorted(candidate_students(thesis_ids) - students)
+        if not candidates:
+            return students
+    top_k = getattr(settings, "MATCH_TOP_K", 20)
+    rows = MatchScore.objects.all()
+    if candidates is not None:
+        rows = rows.filter(student_id__in=candidates)
+    floors = {
+        row["student_id"]: (row["n"], row["low"])
+        for row in rows.values("student_id").annotate(n=Count("id"), low=Min("score"))
+    }
+    for student_id, matches in compute_top_matches(
+        student_ids=candidates, thesis_ids=thesis_ids, top_k=len(thesis_ids)
+    ):
+        if not matches or student_id in students:
+            continue
+        rows, lowest = floors.get(student_id, (0, 0))
+        # ties can still win on thesis id, so >= rather than >
+        if rows < top_k or matches[0].score >= lowest:
+            students.add(student_id)
+    return students
+
+
+def refresh(student_ids=(), thesis_ids=(), batch_size=None):
+    """
+    Recompute MatchScore for the dirty students plus those the dirty theses affect.
+    Returns the number of students recomputed.
+    """
+    if batch_size is None:
+        batch_size = getattr(settings, "MATCH_REFRESH_BATCH_SIZE", 500)
+    students = set(student_ids)
+    if thesis_ids:
+        students |= affected_students(thesis_ids)
+    ordered = sorted(students)
+    for start in range(0, len(ordered), batch_size):
+        persist_match_scores(student_ids=ordered[start:start + batch_size])
+    return len(students)
+
+
+class DirtyQueue:
+    def __init__(self, interval=2.0, max_retries=MAX_RETRIES):
+        self.interval = interval
+        self.max_retries = max_retries
+        self._students = set()
+        self._theses = set()
+        self._failures = Counter()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def put(self, student_ids=(), thesis_ids=()):
+        with self._lock:
+            self._students.update(student_ids)
+            self._theses.update(thesis_ids)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="match-refresh", daemon=True)
+                self._thread.start()
+
+    def pending(self):
+        return len(self._students), len(self._theses)
+
+    def _take(self):
+        with self._lock:
+            students, theses = self._students, self._theses
+            self._students, self._theses = set(), set()
+            return students, theses
+
+    def flush(self):
+        """
+        Recompute everything marked so far. Returns the number of students recomputed.
+        """
+        with self._flush_lock:
+            students, theses = self._take()
+            if not students and not theses:
+                return 0
+            try:
+                recomputed = refresh(students, theses)
+            except OperationalError:
+                # the database, not the marks: keep them all for the next round
+                self.put(students, theses)
+                logger.exception("Match refresh failed for %d students / %d theses", len(students), len(theses))
+                return 0
+            except Exception:
+                logger.exception("Match refresh failed for %d students / %d theses, isolating", len(students),
+                                 len(theses))
+                marks = [("student", pk) for pk in sorted(students)] + [("thesis", pk) for pk in sorted(theses)]
+                return self._isolate(marks)
+            self._succeeded([("student", pk) for pk in students] + [("thesis", pk) for pk in theses])
+            return recomputed
+
+    def _isolate(self, marks):
+        """
+        Refresh `marks` in halves down to single ids; an id that fails alone gets a strike.
+        """
+        students = {pk for kind, pk in marks if kind == "student"}
+        theses = {pk for kind, pk in marks if kind == "thesis"}
+        try:
+            recomputed = refresh(students, theses)
+        except Exception:
+            if len(marks) > 1:
+                middle = len(marks) // 2
+                return self._isolate(marks[:middle]) + self._isolate(marks[middle:])
+            self._strike(marks[0])
+            return 0
+        self._succeeded(marks)
+        return recomputed
+
+    def _succeeded(self, marks):
+        if self._failures:
+            for mark in marks:
+                self._failures.pop(mark, None)
+
+    def _strike(self, mark):
+        kind, pk = mark
+        self._failures[mark] += 1
+        if self._failures[mark] >= self.max_retries:
+            del self._failures[mark]
+            logger.error("Match refresh: dropping %s %s after %d failed attempts", kind, pk, self.max_retries)
+        elif kind == "student":
+            self.put(student_ids=[pk])
+        else:
+            self.put(thesis_ids=[pk])
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            if not self._students and not self._theses:
+                continue
+            close_old_connections()
+            self.flush()
+
+
+queue = DirtyQueue(interval=getattr(settings, "MATCH_REFRESH_INTERVAL", 2.0))
+atexit.register(queue.flush)
+
+
+def _refresh_now(student_ids, thesis_ids):
+    try:
+        refresh(student_ids, thesis_ids)
+    except Exception:
+        # the request has committed already; retry in the background instead of failing its response
+        logger.exception("Match refresh failed, queueing %d students / %d theses", len(student_ids), len(thesis_ids))
+        queue.put(student_ids, thesis_ids)
+
+
+def mark(student_ids=(), thesis_ids=()):
+    """
+    Mark students / theses dirty once the surrounding transaction commits.
+    """
+    student_ids, thesis_ids = set(student_ids), set(thesis_ids)
+    if not student_ids and not thesis_ids:
+        return
+    if not getattr(settings, "MATCH_REFRESH_ASYNC", True):
+        transaction.on_commit(lambda: _refresh_now(student_ids, thesis_ids))
+        return
+    transaction.on_commit(lambda: queue.put(student_ids, thesis_ids))
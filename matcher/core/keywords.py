@@ -0,0 +1,91 @@
+"""
+Normalized keyword tokens (ThesisKeyword) derived from Thesis.keywords.
+
+Thesis.keywords stays the free-form ","/";"-separated string users edit;
+each entry is normalized (lowercased, whitespace collapsed) into one
+ThesisKeyword row. Rows are rewritten whenever a thesis is saved, and
+backfill() rebuilds them in chunks for rows written around the ORM. The
+token index turns keyword filters and the keyword -> ResearchInterest
+match into indexed lookups: a thesis whose keywords name an interest
+counts as having that interest when scoring matches.
+"""
+import re
+
+from django.db import transaction
+
+from .models import ResearchInterest, Thesis, ThesisKeyword
+
+MAX_TOKEN_LENGTH = ThesisKeyword._meta.get_field("token").max_length
+SEPARATORS = re.compile(r"[,;]")
+
+
+def normalize(value):
+    return " ".join(str(value).lower().split())[:MAX_TOKEN_LENGTH]
+
+
+def tokens(keywords):
+    """
+    Thesis.keywords -> unique normalized tokens in input order.
+    """
+    return list(dict.fromkeys(t for t in map(normalize, SEPARATORS.split(keywords or "")) if t))
+
+
+def sync(thesis):
+    wanted = set(tokens(thesis.keywords))
+    existing = set(ThesisKeyword.objects.filter(thesis_id=thesis.pk).values_list("token", flat=True))
+    if existing - wanted:
+        ThesisKeyword.objects.filter(thesis_id=thesis.pk, token__in=existing - wanted).delete()
+    if wanted - existing:
+        ThesisKeyword.objects.bulk_create(
+            [ThesisKeyword(thesis_id=thesis.pk, token=token) for token in wanted - existing], ignore_conflicts=True
+        )
+
+
+def rows_for(theses):
+    """
+    ThesisKeyword rows for (thesis id, keywords) pairs, e.g. right after a bulk insert.
+    """
+    return [ThesisKeyword(thesis_id=pk, token=token) for pk, keywords in theses for token in tokens(keywords)]
+
+
+def backfill(chunk_size=1000, progress=None):
+    """
+    Rebuild every thesis' tokens in id-ordered chunks, one transaction each. Returns tokens written.
+    """
+    written, last_id = 0, 0
+    while True:
+        chunk = list(
+            Thesis.objects.filter(pk__gt=last_id).order_by("pk").values_list("pk", "keywords")[:chunk_size]
+        )
+        if not chunk:
+            return written
+        last_id = chunk[-1][0]
+        rows = rows_for(chunk)
+        with transaction.atomic():
+            ThesisKeyword.objects.filter(thesis_id__in=[pk for pk, _ in chunk]).delete()
+            ThesisKeyword.objects.bulk_create(rows, batch_size=chunk_size)
+        written += len(rows)
+        if progress:
+            progress(last_id, written)
+
+
+def interest_pairs(status=None, thesis_ids=None):
+    """
+    (thesis id, interest id) for every keyword token that names a ResearchInterest,
+    optionally only for theses with `status` and / or among `thesis_ids`.
+    """
+    by_token = {}
+    for pk, name in ResearchInterest.objects.values_list("pk", "name"):
+        by_token.setdefault(normalize(name), []).append(pk)
+    if not by_token:
+        return []
+    keywords = ThesisKeyword.objects.filter(token__in=list(by_token))
+    if status is not None:
+        keywords = keywords.filter(thesis__status=status)
+    if thesis_ids is not None:
+        keywords = keywords.filter(thesis_id__in=thesis_ids)
+    return [
+        (thesis_id, interest_id)
+        for thesis_id, token in keywords.values_list("thesis_id", "token")
+        for interest_id in by_token[token]
+    ]
@@ -0,0 +1,115 @@
+"""
+Read-only list representations built straight from values() rows.
+
+A Projection describes the same JSON shape as a DRF serializer (nested dicts
+for nested serializers) in terms of ORM paths. It is resolved once into a
+list of per-key getters that turn a values() row into the output dict, which skips
+model instantiation and DRF's per-field machinery on large list responses.
+Views opt in with LeanListMixin; the DRF serializer still handles writes,
+detail views and anything the projection does not cover.
+"""
+from operator import itemgetter
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.response import Response
+
+
+def iso_datetime(value):
+    # same output as rest_framework.fields.DateTimeField with ISO 8601
+    if not value:
+        return None
+    if timezone.is_aware(value):
+        value = value.astimezone(timezone.get_current_timezone())
+    value = value.isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+class Projection:
+    """
+    fields: {output key: ORM path | (ORM path, converter) | nested {...}}
+    """
+
+    def __init__(self, fields):
+        self.paths = []
+        self.build = self._builder(fields)
+
+    def _builder(self, fields):
+        getters = []
+        for key, spec in fields.items():
+            if isinstance(spec, dict):
+                getters.append((key, self._builder(spec)))
+                continue
+            path, convert = spec if isinstance(spec, tuple) else (spec, None)
+            if path not in self.paths:
+                self.paths.append(path)
+            getters.append((key, itemgetter(path) if convert is None else self._converted(path, convert)))
+
+        def build(row):
+            return {key: get(row) for key, get in getters}
+
+        return build
+
+    @staticmethod
+    def _converted(path, convert):
+        return lambda row: convert(row[path])
+
+    def rows(self, queryset):
+        return queryset.values(*self.paths)
+
+    def many(self, rows):
+        build = self.build
+        return [build(row) for row in rows]
+
+
+def user_fields(prefix):
+    return {
+        "id": f"{prefix}__id",
+        "username": f"{prefix}__username",
+        "email": f"{prefix}__email",
+        "role": f"{prefix}__role",
+        "department": f"{prefix}__department",
+    }
+
+
+# ThesisSerializer
+THESIS = Projection({
+    "id": "id",
+    "title": "title",
+    "description": "description",
+    "department": "department",
+    "keywords": "keywords",
+    "supervisor": user_fields("supervisor"),
+    "status": "status",
+    "max_students": "max_students",
+})
+
+# ApplicationSerializer
+APPLICATION = Projection({
+    "id": "id",
+    "student": user_fields("student"),
+    "thesis": "thesis_id",
+    "status": "status",
+    "application_date": ("application_date", iso_datetime),
+    "motivation_letter": "motivation_letter",
+})
+
+
+class LeanListMixin:
+    """
+    Serve GET lists from `lean_projection` instead of the serializer (LEAN_LIST_SERIALIZERS = False turns it off).
+    Pagination ordering fields must be part of the projection.
+    """
+    lean_projection = None
+
+    def list(self, request, *args, **kwargs):
+        if self.lean_projection is None or not getattr(settings, "LEAN_LIST_SERIALIZERS", True):
+            return super().list(request, *args, **kwargs)
+        projection = self.lean_projection
+        rows = projection.rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(projection.many(page))
+        return Response(projection.many(rows))
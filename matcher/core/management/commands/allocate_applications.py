@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.allocation import allocate, commit_allocation
+
+
+class Command(BaseCommand):
+    help = "Assign pending applications in one batch (deferred acceptance) respecting thesis and supervisor caps"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Compute and report the assignment without saving")
+        parser.add_argument("--reject-unmatched", action="store_true",
+                            help="Reject every pending application that was not assigned")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        allocation = allocate()
+        elapsed = time.perf_counter() - started
+
+        if options["verbosity"] > 1:
+            for app in allocation.accepted:
+                self.stdout.write(f"{app.student.username} -> {app.thesis.title}")
+        self.stdout.write(
+            f"{len(allocation.accepted)} assigned, {len(allocation.unmatched)} unmatched "
+            f"(computed in {elapsed:.2f}s)."
+        )
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING("Dry run: nothing saved."))
+            return
+
+        commit_allocation(allocation, reject_unmatched=options["reject_unmatched"])
+        self.stdout.write(self.style.SUCCESS(f"Accepted {len(allocation.accepted)} applications."))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.retention import archive_notifications, expired
+
+
+class Command(BaseCommand):
+    help = "Move read notifications past the retention period out of the Notification table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None,
+                            help="Keep read notifications this many days (default: NOTIFICATION_RETENTION_DAYS)")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows moved per transaction")
+        parser.add_argument("--file", default=None,
+                            help="Append to this gzip JSONL file instead of the NotificationArchive table")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the rows that would be moved")
+
+    def handle(self, *args, **options):
+        if options["dry_run"]:
+            self.stdout.write(f"{expired(options['days']).count()} notifications would be archived.")
+            return
+        started = time.perf_counter()
+        moved = archive_notifications(days=options["days"], batch_size=options["batch_size"], path=options["file"])
+        elapsed = time.perf_counter() - started
+        target = options["file"] or "the archive table"
+        self.stdout.write(self.style.SUCCESS(f"Moved {moved} notifications to {target} in {elapsed:.2f}s."))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from core import keywords, matching
+
+
+class Command(BaseCommand):
+    help = "Rebuild the normalized keyword tokens (ThesisKeyword) from Thesis.keywords in chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        def progress(last_id, written):
+            self.stdout.write(f"  up to thesis {last_id}: {written} tokens")
+
+        written = keywords.backfill(options["chunk_size"], progress=progress if options["verbosity"] > 1 else None)
+        matching.invalidate()
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} keyword tokens."))
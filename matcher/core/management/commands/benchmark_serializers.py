@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import lean
+from core.models import Application, Thesis
+from core.serializers import ApplicationSerializer, ThesisSerializer
+
+
+class Command(BaseCommand):
+    help = "Compare DRF serializers with the lean values() projections on the list querysets"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=500, help="Rows per list (a typical large page)")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        cases = [
+            ("theses", Thesis.objects.list_ready(), ThesisSerializer, lean.THESIS),
+            ("applications", Application.objects.list_ready(), ApplicationSerializer, lean.APPLICATION),
+        ]
+        self.stdout.write(f"{'list':14} {'rows':>6} {'drf rows/s':>12} {'lean rows/s':>12} {'speedup':>8}")
+        for name, queryset, serializer, projection in cases:
+            queryset = queryset.order_by("-id")[:rows]
+            count = queryset.count()
+            if not count:
+                raise CommandError(f"No {name} to serialize; run generate_dataset first.")
+            drf = self._best(lambda: serializer(queryset.all(), many=True).data, repeat)
+            fast = self._best(lambda: projection.many(projection.rows(queryset.all())), repeat)
+            self.stdout.write(
+                f"{name:14} {count:6} {count / drf:12.0f} {count / fast:12.0f} {drf / fast:7.1f}x"
+            )
+
+    @staticmethod
+    def _best(fn, repeat):
+        # best of `repeat`, query included, so both sides pay for fetching the rows
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
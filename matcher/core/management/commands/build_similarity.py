@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from core import matching, similarity
+from core.bulk_matching import persist_match_scores
+
+
+class Command(BaseCommand):
+    help = ("Rebuild the skill and research-interest similarity graph from co-occurrence in the link tables, "
+            "then recompute the stored match scores against it")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--neighbors", type=int, default=similarity.NEIGHBORS,
+                            help="Neighbors kept per skill / interest")
+        parser.add_argument("--min-similarity", type=float, default=similarity.MIN_SIMILARITY,
+                            help="Minimum cosine similarity of a kept neighbor")
+        parser.add_argument("--min-support", type=int, default=similarity.MIN_SUPPORT,
+                            help="Minimum number of students/theses listing both items")
+
+    def handle(self, *args, **options):
+        skills, interests = similarity.build(options["neighbors"], options["min_similarity"], options["min_support"])
+        matching.invalidate()
+        self.stdout.write(self.style.SUCCESS(f"Wrote {skills} skill and {interests} interest neighbor edges."))
+        # every student's near misses can change with the graph
+        written = persist_match_scores()
+        self.stdout.write(self.style.SUCCESS(f"Stored {written} match scores."))
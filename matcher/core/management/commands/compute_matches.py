@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.bulk_matching import DEFAULT_CHUNK_SIZE, persist_match_scores
+
+
+class Command(BaseCommand):
+    help = "Score every student against all open theses and store the ranked top-K in MatchScore"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top-k", type=int, default=None, help="Matches kept per student (default: MATCH_TOP_K)")
+        parser.add_argument("--min-shared", type=int, default=None,
+                            help="Minimum shared skills or interests (default: MATCH_MIN_SHARED)")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                            help="Students scored per matrix block")
+        parser.add_argument("--student", type=int, action="append", dest="students",
+                            help="Only recompute this student id (repeatable)")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = persist_match_scores(
+            student_ids=options["students"],
+            top_k=options["top_k"],
+            min_shared=options["min_shared"],
+            chunk_size=options["chunk_size"],
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Stored {written} match scores in {elapsed:.2f}s."))
@@ -0,0 +1,78 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core import datagen
+from core.models import Application, Notification, Thesis, User
+
+
+def hot_queries():
+    """
+    The filter shapes the views run most, bound to ids from the current data.
+    """
+    student = User.objects.filter(role=User.Role.STUDENT).order_by("-id").first()
+    supervisor = User.objects.filter(role=User.Role.SUPERVISOR).order_by("-id").first()
+    thesis = Thesis.objects.order_by("-id").first()
+    if not (student and supervisor and thesis):
+        return []
+    return [
+        ("pending application of student",
+         Application.objects.filter(student=student, status=Application.Status.PENDING)),
+        ("accepted applications of supervisor",
+         Application.objects.filter(thesis__supervisor=supervisor, status=Application.Status.ACCEPTED)),
+        ("student applied to thesis", Application.objects.filter(student=student, thesis=thesis)),
+        ("supervisor applications page",
+         Application.objects.filter(thesis__supervisor=supervisor).order_by("-application_date")),
+        ("open theses", Thesis.objects.filter(status=Thesis.Status.OPEN)),
+        ("notification list", Notification.objects.filter(recipient=student).order_by("-created_at")[:50]),
+        ("unread notifications", Notification.objects.filter(recipient=student, read=False)),
+    ]
+
+
+class Command(BaseCommand):
+    help = "Show query plans and timings for the hot filter paths, optionally with the Meta indexes dropped"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--generate", type=int, default=0, metavar="STUDENTS",
+                            help="First generate a dataset with this many students")
+        parser.add_argument("--compare", action="store_true",
+                            help="Also run every query with the hot-path indexes dropped inside a transaction "
+                                 "that is rolled back (the tables stay locked meanwhile)")
+        parser.add_argument("--repeat", type=int, default=20, help="Executions per query for the timing")
+
+    def handle(self, *args, **options):
+        if options["generate"]:
+            students = options["generate"]
+            counts = datagen.generate(
+                students=students, supervisors=max(students // 20, 1), theses=max(students // 5, 1)
+            )
+            self.stdout.write(f"Generated {counts}")
+
+        self.report("with indexes", options["repeat"])
+        if options["compare"]:
+            if not connection.features.can_rollback_ddl:
+                raise CommandError("--compare needs a database that can roll back DDL.")
+            # SQLite's schema editor needs foreign key checks off before the transaction starts
+            connection.disable_constraint_checking()
+            try:
+                with transaction.atomic():
+                    with connection.schema_editor(atomic=False) as editor:
+                        for model in [Application, Thesis, Notification]:
+                            for index in model._meta.indexes:
+                                editor.remove_index(model, index)
+                    self.report("without hot-path indexes", options["repeat"])
+                    # the indexes come back with the rollback, even if the process dies midway
+                    transaction.set_rollback(True)
+            finally:
+                connection.enable_constraint_checking()
+
+    def report(self, label, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"== {label} =="))
+        for name, qs in hot_queries():
+            started = time.perf_counter()
+            for _ in range(repeat):
+                list(qs.all())
+            elapsed_ms = (time.perf_counter() - started) * 1000 / repeat
+            self.stdout.write(self.style.SUCCESS(f"{name}: {elapsed_ms:.2f} ms"))
+            self.stdout.write(qs.explain())
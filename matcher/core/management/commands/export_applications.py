@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from core import exporters
+from core.models import Application
+
+
+class Command(BaseCommand):
+    help = "Stream applications (or, with --status accepted, assignments) as CSV or JSONL"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=list(exporters.FORMATS), default="csv")
+        parser.add_argument("--status", choices=Application.Status.values, default=None)
+        parser.add_argument("--department", default=None, help="Thesis department")
+        parser.add_argument("--supervisor", default=None, help="Supervisor username")
+        parser.add_argument("--output", "-o", default=None, help="File to write (default: stdout)")
+
+    def handle(self, *args, **options):
+        rows = exporters.applications(
+            status=options["status"], department=options["department"], supervisor=options["supervisor"]
+        )
+        output = exporters.lines(rows, options["format"])
+        if options["output"] is None:
+            for line in output:
+                self.stdout.write(line, ending="")
+            return
+        with open(options["output"], "w", newline="", encoding="utf-8") as f:
+            f.writelines(output)
+        self.stdout.write(self.style.SUCCESS(f"Exported applications to {options['output']}."))
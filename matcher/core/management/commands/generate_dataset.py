@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import datagen
+
+
+class Command(BaseCommand):
+    help = "Generate a synthetic dataset (users, theses, skills, interests, links, applications) with bulk inserts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=1000)
+        parser.add_argument("--supervisors", type=int, default=50)
+        parser.add_argument("--theses", type=int, default=200)
+        parser.add_argument("--skills", type=int, default=100)
+        parser.add_argument("--interests", type=int, default=60)
+        parser.add_argument("--skills-per-item", type=int, default=4,
+                            help="Skills linked to each student and each thesis")
+        parser.add_argument("--interests-per-item", type=int, default=3,
+                            help="Interests linked to each student and each thesis")
+        parser.add_argument("--applications-per-student", type=int, default=2)
+        parser.add_argument("--notifications-per-user", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        counts = datagen.generate(
+            students=options["students"],
+            supervisors=options["supervisors"],
+            theses=options["theses"],
+            skills=options["skills"],
+            interests=options["interests"],
+            skills_per_item=options["skills_per_item"],
+            interests_per_item=options["interests_per_item"],
+            applications_per_student=options["applications_per_student"],
+            notifications_per_user=options["notifications_per_user"],
+            seed=options["seed"],
+        )
+        elapsed = time.perf_counter() - started
+        run = counts.pop("run")
+        summary = ", ".join(f"{n} {table}" for table, n in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Generated run {run}: {summary} in {elapsed:.2f}s."))
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.importers import DEFAULT_CHUNK_SIZE, ImportFormatError, detect_format, import_students, read_records
+
+
+class Command(BaseCommand):
+    help = "Create or update student accounts with their skills and interests from a registrar CSV or JSONL export"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=["csv", "jsonl"], default=None,
+                            help="Input format (default: from the file extension)")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows written per transaction")
+
+    def handle(self, *args, **options):
+        try:
+            fmt = detect_format(options["path"], options["format"])
+        except ImportFormatError as e:
+            raise CommandError(str(e))
+
+        def progress(result):
+            self.stdout.write(f"{result.rows} rows read, {result.created} created, {result.updated} updated, "
+                              f"{result.links} links, {result.error_count} errors")
+
+        started = time.perf_counter()
+        with open(options["path"], newline="", encoding="utf-8-sig") as f:
+            result = import_students(read_records(f, fmt), chunk_size=options["chunk_size"], progress=progress)
+        elapsed = time.perf_counter() - started
+
+        for error in result.errors[:50]:
+            self.stderr.write(f"row {error['row']}: {error['error']}")
+        if result.error_count > 50:
+            self.stderr.write(f"... and {result.error_count - 50} more errors")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.created + result.updated} students and {result.links} links in {elapsed:.2f}s."
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.applications import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute accepted-application counters on theses and supervisors and repair any drift"
+
+    def handle(self, *args, **kwargs):
+        theses, supervisors = reconcile_counters()
+        if theses or supervisors:
+            self.stdout.write(self.style.WARNING(f"Repaired {theses} theses and {supervisors} supervisors."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Counters are in sync."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.stats import refresh
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-thesis application counts (ThesisStats) from Application rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--thesis", type=int, action="append", dest="theses",
+                            help="Only rebuild this thesis id (repeatable)")
+
+    def handle(self, *args, **options):
+        written = refresh(options["theses"])
+        self.stdout.write(self.style.SUCCESS(f"Refreshed stats for {written} theses."))
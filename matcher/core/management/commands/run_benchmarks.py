@@ -0,0 +1,44 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import benchmarks, datagen
+
+
+class Command(BaseCommand):
+    help = "Time the hot views and API endpoints (p50/p99 latency, query counts), optionally against a baseline"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--generate", type=int, default=0, metavar="STUDENTS",
+                            help="Generate a dataset with this many students before running")
+        parser.add_argument("--output", help="Write results as JSON to this file")
+        parser.add_argument("--baseline", help="Fail if results regress against this JSON file")
+        parser.add_argument("--tolerance", type=float, default=0.25,
+                            help="Allowed p50 slowdown against the baseline (0.25 = 25%%)")
+
+    def handle(self, *args, **options):
+        if options["generate"]:
+            students = options["generate"]
+            datagen.generate(students=students, supervisors=max(students // 20, 1), theses=max(students // 5, 1))
+
+        try:
+            results = benchmarks.run(iterations=options["iterations"])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f"{'scenario':32} {'p50 ms':>9} {'p99 ms':>9} {'queries':>8}")
+        for name, row in results.items():
+            self.stdout.write(f"{name:32} {row['p50_ms']:9.2f} {row['p99_ms']:9.2f} {row['queries']:8}")
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(results, fh, indent=2)
+
+        if options["baseline"]:
+            with open(options["baseline"]) as fh:
+                baseline = json.load(fh)
+            problems = benchmarks.regressions(results, baseline, options["tolerance"])
+            if problems:
+                raise CommandError("Regressions found:\n" + "\n".join(problems))
+            self.stdout.write(self.style.SUCCESS("No regressions against baseline."))
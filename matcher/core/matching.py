@@ -0,0 +1,241 @@
+"""
+In-memory match scoring for students against open theses.
+
+Every open thesis is kept as a compact feature vector: its required skills and
+research interests packed into int bitsets over a dense id -> bit mapping.
+A student is turned into the same shape (skills bitset plus one interest
+bitset per StudentInterest.priority level), so scoring the whole catalog is a
+handful of AND + popcount operations per thesis instead of a multi-join
+Count aggregate in the database. Interests named in a thesis' keywords
+(core.keywords) count as interests of that thesis.
+
+Near misses come from the precomputed similarity graph (core.similarity):
+the neighbors of everything a student lists, minus what they already
+list, form one more bitset per kind, and each thesis skill or interest
+found there adds NEAR_MISS_WEIGHT.
+"""
+import heapq
+import threading
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from . import keywords, similarity
+from .models import Thesis, ThesisSkill, ThesisInterest, StudentSkill, StudentInterest
+
+# one shared skill is worth about as much as a "Medium" priority interest
+SKILL_WEIGHT = 2
+# a related skill or interest (similarity neighbor) the student does not list
+NEAR_MISS_WEIGHT = 1
+PRIORITY_LEVELS = tuple(level for level, _ in StudentInterest.PRIORITY)
+
+
+@dataclass(frozen=True)
+class Match:
+    thesis_id: int
+    score: int
+    shared_skills: int
+    shared_interests: int
+    near_misses: int = 0
+
+
+@dataclass(frozen=True)
+class StudentVector:
+    skills: int
+    # bitset of interests per priority level, aligned with PRIORITY_LEVELS
+    interests: tuple
+    # similarity neighbors of the student's skills / interests they do not list themselves
+    near_skills: int = 0
+    near_interests: int = 0
+
+
+def _bit_index(ids):
+    return {pk: bit for bit, pk in enumerate(sorted(set(ids)))}
+
+
+def _pack(ids, index):
+    bits = 0
+    for pk in ids:
+        bit = index.get(pk)
+        if bit is not None:
+            bits |= 1 << bit
+    return bits
+
+
+class MatchEngine:
+    def __init__(self, thesis_ids, thesis_skills, thesis_interests, skill_neighbors=None, interest_neighbors=None):
+        """
+        thesis_skills / thesis_interests map thesis id -> iterable of skill / interest ids;
+        skill_neighbors / interest_neighbors map an id -> its similar ids.
+        """
+        self.skill_index = _bit_index(s for ids in thesis_skills.values() for s in ids)
+        self.interest_index = _bit_index(i for ids in thesis_interests.values() for i in ids)
+        self.thesis_ids = list(thesis_ids)
+        self.positions = {pk: i for i, pk in enumerate(self.thesis_ids)}
+        self.skill_bits = [_pack(thesis_skills.get(pk, ()), self.skill_index) for pk in self.thesis_ids]
+        self.interest_bits = [_pack(thesis_interests.get(pk, ()), self.interest_index) for pk in self.thesis_ids]
+        # id -> bitset of its neighbors that appear on some open thesis
+        self.skill_near = self._near_bits(skill_neighbors, self.skill_index)
+        self.interest_near = self._near_bits(interest_neighbors, self.interest_index)
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def build(cls):
+        thesis_ids = list(
+            Thesis.objects.filter(status=Thesis.Status.OPEN).order_by("id").values_list("id", flat=True)
+        )
+        thesis_skills, thesis_interests = {}, {}
+        for thesis_id, skill_id in ThesisSkill.objects.filter(
+            thesis__status=Thesis.Status.OPEN
+        ).values_list("thesis_id", "skill_id"):
+            thesis_skills.setdefault(thesis_id, []).append(skill_id)
+        for thesis_id, interest_id in ThesisInterest.objects.filter(
+            thesis__status=Thesis.Status.OPEN
+        ).values_list("thesis_id", "interest_id"):
+            thesis_interests.setdefault(thesis_id, []).append(interest_id)
+        for thesis_id, interest_id in keywords.interest_pairs(status=Thesis.Status.OPEN):
+            thesis_interests.setdefault(thesis_id, []).append(interest_id)
+        return cls(
+            thesis_ids, thesis_skills, thesis_interests, similarity.skill_neighbors(), similarity.interest_neighbors()
+        )
+
+    @staticmethod
+    def _near_bits(neighbors, index):
+        near = {}
+        for pk, ids in (neighbors or {}).items():
+            bits = _pack(ids, index)
+            if bits:
+                near[pk] = bits
+        return near
+
+    def vectorize(self, skill_ids, interest_priorities):
+        """
+        interest_priorities maps interest id -> StudentInterest.priority.
+        """
+        per_level = tuple(
+            _pack((i for i, p in interest_priorities.items() if p == level), self.interest_index)
+            for level in PRIORITY_LEVELS
+        )
+        skill_ids = list(skill_ids)
+        skills = _pack(skill_ids, self.skill_index)
+        near_skills = near_interests = 0
+        for pk in skill_ids:
+            near_skills |= self.skill_near.get(pk, 0)
+        for pk in interest_priorities:
+            near_interests |= self.interest_near.get(pk, 0)
+        all_interests = 0
+        for bits in per_level:
+            all_interests |= bits
+        return StudentVector(
+            skills=skills,
+            interests=per_level,
+            near_skills=near_skills & ~skills,
+            near_interests=near_interests & ~all_interests,
+        )
+
+    def student_vector(self, student_id):
+        skill_ids = StudentSkill.objects.filter(student_id=student_id).values_list("skill_id", flat=True)
+        priorities = dict(
+            StudentInterest.objects.filter(student_id=student_id).values_list("interest_id", "priority")
+        )
+        return self.vectorize(skill_ids, priorities)
+
+    def student_vectors(self, student_ids):
+        """
+        Vectors for many students with two queries in total.
+        """
+        skills, priorities = {}, {}
+        for student_id, skill_id in StudentSkill.objects.filter(student_id__in=student_ids).values_list(
+            "student_id", "skill_id"
+        ):
+            skills.setdefault(student_id, []).append(skill_id)
+        for student_id, interest_id, priority in StudentInterest.objects.filter(
+            student_id__in=student_ids
+        ).values_list("student_id", "interest_id", "priority"):
+            priorities.setdefault(student_id, {})[interest_id] = priority
+        return {pk: self.vectorize(skills.get(pk, ()), priorities.get(pk, {})) for pk in student_ids}
+
+    def _match(self, vector, position):
+        interests = self.interest_bits[position]
+        shared_skills = (self.skill_bits[position] & vector.skills).bit_count()
+        score = shared_skills * SKILL_WEIGHT
+        shared_interests = 0
+        for level, bits in zip(PRIORITY_LEVELS, vector.interests):
+            shared = (interests & bits).bit_count()
+            shared_interests += shared
+            score += level * shared
+        near = (self.skill_bits[position] & vector.near_skills).bit_count() + (
+            interests & vector.near_interests
+        ).bit_count()
+        score += near * NEAR_MISS_WEIGHT
+        return Match(self.thesis_ids[position], score, shared_skills, shared_interests, near)
+
+    def pair_score(self, vector, thesis_id):
+        """
+        Match for a single thesis with no cutoff applied, or None if the thesis is not open.
+        """
+        position = self.positions.get(thesis_id)
+        if position is None:
+            return None
+        return self._match(vector, position)
+
+    def score(self, vector, min_shared=None):
+        """
+        Score every open thesis against a student vector in one pass.
+        A thesis is kept when it shares at least `min_shared` skills or interests, near misses included.
+        """
+        if min_shared is None:
+            min_shared = getattr(settings, "MATCH_MIN_SHARED", 2)
+        student_skills = vector.skills
+        levels = [(level, bits) for level, bits in zip(PRIORITY_LEVELS, vector.interests) if bits]
+        all_interests = 0
+        for _, bits in levels:
+            all_interests |= bits
+        near_skills, near_interests = vector.near_skills, vector.near_interests
+
+        matches = []
+        for thesis_id, skills, interests in zip(self.thesis_ids, self.skill_bits, self.interest_bits):
+            shared_skills = (skills & student_skills).bit_count()
+            shared_interests = (interests & all_interests).bit_count()
+            near_s = (skills & near_skills).bit_count() if near_skills else 0
+            near_i = (interests & near_interests).bit_count() if near_interests else 0
+            if shared_skills + near_s < min_shared and shared_interests + near_i < min_shared:
+                continue
+            score = shared_skills * SKILL_WEIGHT + (near_s + near_i) * NEAR_MISS_WEIGHT
+            for level, bits in levels:
+                score += level * (interests & bits).bit_count()
+            matches.append(Match(thesis_id, score, shared_skills, shared_interests, near_s + near_i))
+        return matches
+
+    def top_matches(self, student_id, k=None, min_shared=None):
+        if k is None:
+            k = getattr(settings, "MATCH_TOP_K", 20)
+        matches = self.score(self.student_vector(student_id), min_shared=min_shared)
+        # highest score first, older theses win ties
+        return heapq.nsmallest(k, matches, key=lambda m: (-m.score, m.thesis_id))
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """
+    Process-wide engine, rebuilt lazily after invalidate() or once it is older
+    than MATCH_ENGINE_TTL seconds (covers changes made by other processes).
+    """
+    global _engine
+    ttl = getattr(settings, "MATCH_ENGINE_TTL", 60)
+    engine = _engine
+    if engine is not None and time.monotonic() - engine.built_at < ttl:
+        return engine
+    with _engine_lock:
+        if _engine is None or time.monotonic() - _engine.built_at >= ttl:
+            _engine = MatchEngine.build()
+        return _engine
+
+
+def invalidate():
+    global _engine
+    _engine = None
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.5 on 2026-10-17 17:30
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_notification"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MatchScore",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.PositiveIntegerField()),
+                ("rank", models.PositiveIntegerField()),
+                ("shared_skills", models.PositiveIntegerField(default=0)),
+                ("shared_interests", models.PositiveIntegerField(default=0)),
+                (
+                    "computed_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "student",
+                    models.ForeignKey(
+                        limit_choices_to={"role": "student"},
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="match_scores",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "thesis",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="match_scores",
+                        to="core.thesis",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["student", "rank"],
+                "unique_together": {("student", "thesis")},
+            },
+        ),
+    ]
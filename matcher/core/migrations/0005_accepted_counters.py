@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-17 17:34
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_counters(apps, schema_editor):
+    Application = apps.get_model("core", "Application")
+    Thesis = apps.get_model("core", "Thesis")
+    User = apps.get_model("core", "User")
+    accepted = Application.objects.filter(status="accepted")
+    for row in accepted.values("thesis_id").annotate(n=Count("id")):
+        Thesis.objects.filter(pk=row["thesis_id"]).update(accepted_count=row["n"])
+    for row in accepted.values("thesis__supervisor_id").annotate(n=Count("id")):
+        User.objects.filter(pk=row["thesis__supervisor_id"]).update(accepted_students_count=row["n"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_matchscore"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="thesis",
+            name="accepted_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="accepted_students_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
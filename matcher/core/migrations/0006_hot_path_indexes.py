@@ -0,0 +1,77 @@
+# Generated by Django 5.2.5 on 2026-10-17 17:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_accepted_counters"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="application",
+            index=models.Index(
+                fields=["student", "status"], name="app_student_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="application",
+            index=models.Index(
+                fields=["thesis", "status"], name="app_thesis_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="application",
+            index=models.Index(
+                fields=["-application_date", "-id"], name="app_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="application",
+            index=models.Index(
+                condition=models.Q(("status", "pending")),
+                fields=["student"],
+                name="app_pending_student_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="application",
+            index=models.Index(
+                condition=models.Q(("status", "pending")),
+                fields=["thesis"],
+                name="app_pending_thesis_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="matchscore",
+            index=models.Index(
+                fields=["student", "rank"], name="match_student_rank_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["recipient", "-created_at"], name="notif_recipient_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("read", False)),
+                fields=["recipient"],
+                name="notif_unread_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="thesis",
+            index=models.Index(fields=["status"], name="thesis_status_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="thesis",
+            index=models.Index(
+                fields=["supervisor", "status"], name="thesis_supervisor_status_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.5 on 2026-10-17 18:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_stats(apps, schema_editor):
+    Application = apps.get_model("core", "Application")
+    Thesis = apps.get_model("core", "Thesis")
+    ThesisStats = apps.get_model("core", "ThesisStats")
+    stats = {
+        pk: ThesisStats(thesis_id=pk)
+        for pk in Thesis.objects.values_list("pk", flat=True)
+    }
+    for row in Application.objects.values("thesis_id", "status").annotate(
+        n=Count("id")
+    ):
+        setattr(stats[row["thesis_id"]], row["status"], row["n"])
+    ThesisStats.objects.bulk_create(stats.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_notification_archive"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ThesisStats",
+            fields=[
+                (
+                    "thesis",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="core.thesis",
+                    ),
+                ),
+                ("pending", models.PositiveIntegerField(default=0)),
+                ("accepted", models.PositiveIntegerField(default=0)),
+                ("rejected", models.PositiveIntegerField(default=0)),
+                ("withdrawn", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-17 18:10
+
+from django.db import migrations
+
+# must stay the same expression as core.search.VECTOR_SQL, or the planner will not use the index
+VECTOR_SQL = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(keywords, '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'C')"
+)
+
+
+def create_search_index(apps, schema_editor):
+    # other backends search through core.search's in-process index
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS thesis_search_idx ON core_thesis USING GIN (({VECTOR_SQL}))"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS thesis_search_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_thesis_stats"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
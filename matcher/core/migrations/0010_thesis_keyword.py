@@ -0,0 +1,80 @@
+# Generated by Django 5.2.5 on 2026-10-17 18:46
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# frozen copy of core.keywords.tokens at the time of this migration
+SEPARATORS = re.compile(r"[,;]")
+
+
+def _tokens(keywords):
+    normalized = (
+        " ".join(part.lower().split())[:100]
+        for part in SEPARATORS.split(keywords or "")
+    )
+    return list(dict.fromkeys(t for t in normalized if t))
+
+
+def backfill_keywords(apps, schema_editor):
+    Thesis = apps.get_model("core", "Thesis")
+    ThesisKeyword = apps.get_model("core", "ThesisKeyword")
+    last_id = 0
+    while True:
+        chunk = list(
+            Thesis.objects.filter(pk__gt=last_id)
+            .order_by("pk")
+            .values_list("pk", "keywords")[:1000]
+        )
+        if not chunk:
+            return
+        last_id = chunk[-1][0]
+        ThesisKeyword.objects.bulk_create(
+            [
+                ThesisKeyword(thesis_id=pk, token=token)
+                for pk, keywords in chunk
+                for token in _tokens(keywords)
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_thesis_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ThesisKeyword",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("token", models.CharField(max_length=100)),
+                (
+                    "thesis",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="keyword_tokens",
+                        to="core.thesis",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["token"], name="thesis_keyword_token_idx")
+                ],
+                "unique_together": {("thesis", "token")},
+            },
+        ),
+        migrations.RunPython(backfill_keywords, migrations.RunPython.noop),
+    ]
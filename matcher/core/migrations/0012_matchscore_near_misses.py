@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 19:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_similarity_neighbors"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="matchscore",
+            name="near_misses",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
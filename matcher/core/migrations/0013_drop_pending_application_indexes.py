@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-17 19:42
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_matchscore_near_misses"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="application",
+            name="app_pending_student_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="application",
+            name="app_pending_thesis_idx",
+        ),
+    ]
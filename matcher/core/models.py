@@ -3,6 +3,9 @@ from django.db import models
 from django.utils import timezone
 from django.conf import settings
 
+# hard cap on accepted students per supervisor, across all of their theses
+MAX_STUDENTS_PER_SUPERVISOR = 7
+
 class User(AbstractUser):
     class Role(models.TextChoices):
         STUDENT = "student", "Student"
@@ -10,6 +13,8 @@ class User(AbstractUser):
 
     role = models.CharField(max_length=20, choices=Role.choices)
     department = models.CharField(max_length=120, blank=True)
+    # accepted applications across all of a supervisor's theses, kept by core.applications
+    accepted_students_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return f"{self.username} ({self.role})"
@@ -26,6 +31,11 @@ class ResearchInterest(models.Model):
     def __str__(self):
         return self.name
 
+class ThesisQuerySet(models.QuerySet):
+    def list_ready(self):
+        """Everything list pages and serializers touch per row, loaded up front."""
+        return self.select_related("supervisor")
+
 class Thesis(models.Model):
     class Status(models.TextChoices):
         OPEN = "open", "Open"
@@ -40,21 +50,36 @@ class Thesis(models.Model):
                                    limit_choices_to={'role': User.Role.SUPERVISOR})
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.OPEN)
     max_students = models.PositiveIntegerField(default=1)
+    # accepted applications for this thesis, kept by core.applications
+    accepted_count = models.PositiveIntegerField(default=0)
 
     interests = models.ManyToManyField(ResearchInterest, through='ThesisInterest', related_name='theses')
     required_skills = models.ManyToManyField(Skill, through='ThesisSkill', related_name='theses')
 
+    objects = ThesisQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status'], name='thesis_status_idx'),
+            models.Index(fields=['supervisor', 'status'], name='thesis_supervisor_status_idx'),
+        ]
+
     def __str__(self):
         return f"{self.title} ({self.supervisor.username})"
 
     @property
     def current_assigned_count(self):
-        return self.applications.filter(status=Application.Status.ACCEPTED).count()
+        return self.accepted_count
 
     @property
     def has_capacity(self):
         return self.current_assigned_count < self.max_students
 
+class ApplicationQuerySet(models.QuerySet):
+    def list_ready(self):
+        """Everything list pages and serializers touch per row, loaded up front."""
+        return self.select_related("student", "thesis", "thesis__supervisor")
+
 class Application(models.Model):
     class Status(models.TextChoices):
         PENDING = "pending", "Pending"
@@ -69,12 +94,33 @@ class Application(models.Model):
     application_date = models.DateTimeField(default=timezone.now)
     motivation_letter = models.TextField(blank=True)
 
+    objects = ApplicationQuerySet.as_manager()
+
     class Meta:
+        # (student, thesis) lookups are served by the unique_together index
         unique_together = ('student', 'thesis')
+        indexes = [
+            models.Index(fields=['student', 'status'], name='app_student_status_idx'),
+            models.Index(fields=['thesis', 'status'], name='app_thesis_status_idx'),
+            models.Index(fields=['-application_date', '-id'], name='app_date_idx'),
+        ]
 
     def __str__(self):
         return f"App({self.student.username} -> {self.thesis.title}) [{self.status}]"
 
+class ThesisStats(models.Model):
+    """
+    Application counts per status for one thesis, kept in step by core.stats.
+    """
+    thesis = models.OneToOneField(Thesis, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    pending = models.PositiveIntegerField(default=0)
+    accepted = models.PositiveIntegerField(default=0)
+    rejected = models.PositiveIntegerField(default=0)
+    withdrawn = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Stats({self.thesis_id}) {self.pending}/{self.accepted}/{self.rejected}/{self.withdrawn}"
+
 class StudentSkill(models.Model):
     student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='student_skills',
                                 limit_choices_to={'role': User.Role.STUDENT})
@@ -115,6 +161,47 @@ class ThesisInterest(models.Model):
     class Meta:
         unique_together = ('thesis', 'interest')
 
+
+class ThesisKeyword(models.Model):
+    """
+    One normalized entry of Thesis.keywords, kept in step by core.keywords.
+    """
+    thesis = models.ForeignKey(Thesis, on_delete=models.CASCADE, related_name='keyword_tokens')
+    token = models.CharField(max_length=100)
+
+    class Meta:
+        unique_together = ('thesis', 'token')
+        indexes = [
+            models.Index(fields=['token'], name='thesis_keyword_token_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.thesis_id}: {self.token}"
+
+
+class SkillNeighbor(models.Model):
+    """
+    Top co-occurring skills of a skill (cosine over the link tables), written by core.similarity.
+    """
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='neighbors')
+    neighbor = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='+')
+    similarity = models.FloatField()
+
+    class Meta:
+        unique_together = ('skill', 'neighbor')
+
+
+class InterestNeighbor(models.Model):
+    """
+    Top co-occurring research interests of an interest, written by core.similarity.
+    """
+    interest = models.ForeignKey(ResearchInterest, on_delete=models.CASCADE, related_name='neighbors')
+    neighbor = models.ForeignKey(ResearchInterest, on_delete=models.CASCADE, related_name='+')
+    similarity = models.FloatField()
+
+    class Meta:
+        unique_together = ('interest', 'neighbor')
+
 class Notification(models.Model):
     recipient = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -125,5 +212,58 @@ class Notification(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     read = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['recipient', '-created_at'], name='notif_recipient_created_idx'),
+            models.Index(fields=['recipient'], condition=models.Q(read=False), name='notif_unread_idx'),
+            # archival scan: oldest read rows first
+            models.Index(fields=['created_at'], condition=models.Q(read=True), name='notif_read_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Notif to {self.recipient.username}: {self.message[:40]}"
+
+class NotificationArchive(models.Model):
+    """
+    Read notifications moved out of the hot table by the archive_notifications command.
+    """
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_notifications"
+    )
+    message = models.TextField()
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['recipient', '-created_at'], name='notif_archive_recipient_idx'),
+        ]
+
+    def __str__(self):
+        return f"Archived notif to {self.recipient_id}: {self.message[:40]}"
+
+class MatchScore(models.Model):
+    """
+    Precomputed top-K theses per student, written by the compute_matches command.
+    """
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='match_scores',
+                                limit_choices_to={'role': User.Role.STUDENT})
+    thesis = models.ForeignKey(Thesis, on_delete=models.CASCADE, related_name='match_scores')
+    score = models.PositiveIntegerField()
+    rank = models.PositiveIntegerField()
+    shared_skills = models.PositiveIntegerField(default=0)
+    shared_interests = models.PositiveIntegerField(default=0)
+    near_misses = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ('student', 'thesis')
+        ordering = ['student', 'rank']
+        indexes = [
+            models.Index(fields=['student', 'rank'], name='match_student_rank_idx'),
+        ]
+
     def __str__(self):
-        return f"Notif to {self.recipient.username}: {self.message[:40]}"
\ No newline at end of file
+        return f"Match({self.student.username} -> {self.thesis.title}) #{self.rank} [{self.score}]"
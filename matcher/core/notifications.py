@@ -0,0 +1,107 @@
+"""
+Notification delivery.
+
+Views and serializers call notify()/notify_many() instead of
+Notification.objects.create(). Every call is one bulk_create in the
+caller's transaction, so a notification commits or rolls back together with
+the change it reports, and a request that notifies many users still pays
+for a single INSERT. Cache and pub/sub side effects run once the
+transaction commits.
+
+Unread counts per user live in the cache. They are adjusted in place when
+notifications are written, read or deleted. A missing key falls back to one
+indexed COUNT, and a TTL bounds any drift.
+
+Written rows are also published on the pub/sub broker (core.pubsub), one
+channel per recipient, for the server-sent event stream.
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from . import pubsub
+from .models import Notification
+
+
+def _unread_key(user_id):
+    return f"notifications:unread:{user_id}"
+
+
+def unread_count(user):
+    key = _unread_key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(recipient=user, read=False).count()
+        cache.set(key, count, getattr(settings, "NOTIFICATION_UNREAD_TTL", 300))
+    return count
+
+
+def _shift_unread(counts):
+    """
+    Adjust cached unread counts by {user_id: delta}; users without a cached value are skipped.
+    """
+    for user_id, delta in counts.items():
+        if not delta:
+            continue
+        try:
+            if cache.incr(_unread_key(user_id), delta) < 0:
+                cache.delete(_unread_key(user_id))
+        except ValueError:
+            pass
+
+
+def event(notification):
+    return {
+        "id": notification.id,
+        "message": notification.message,
+        "created_at": notification.created_at.isoformat(),
+        "read": notification.read,
+    }
+
+
+def _publish(notifications):
+    broker = pubsub.get_broker()
+    for n in notifications:
+        if n.id is not None:
+            broker.publish(n.recipient_id, event(n))
+
+
+def _written(notifications):
+    _shift_unread(Counter(n.recipient_id for n in notifications if not n.read))
+    _publish(notifications)
+
+
+def mark_all_read(user):
+    """
+    One UPDATE for every unread notification of `user`. Returns the number marked.
+    """
+    updated = Notification.objects.filter(recipient=user, read=False).update(read=True)
+    cache.set(_unread_key(user.pk), 0, getattr(settings, "NOTIFICATION_UNREAD_TTL", 300))
+    return updated
+
+
+def delete_notification(notification):
+    notification.delete()
+    if not notification.read:
+        _shift_unread({notification.recipient_id: -1})
+
+
+def notify_many(notifications):
+    """
+    Write unsaved Notification instances in the caller's transaction with one bulk insert.
+    """
+    notifications = list(notifications)
+    if not notifications:
+        return
+    now = timezone.now()
+    for n in notifications:
+        n.created_at = now
+    Notification.objects.bulk_create(notifications, batch_size=1000)
+    transaction.on_commit(lambda: _written(notifications))
+
+
+def notify(recipient, message):
+    notify_many([Notification(recipient=recipient, message=message)])
@@ -0,0 +1,22 @@
+from rest_framework.pagination import CursorPagination
+
+
+# Keyset pagination: the cursor encodes the last seen ordering value, so every page is
+# an indexed range scan and response size stays flat however large the table grows.
+class KeysetPagination(CursorPagination):
+    ordering = ("-id",)
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
+class ApplicationPagination(KeysetPagination):
+    ordering = ("-application_date", "-id")
+
+
+class NotificationPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+
+
+class MatchScorePagination(KeysetPagination):
+    # id last, so rows that tie on (student, rank) during a refresh still page in one fixed order
+    ordering = ("student_id", "rank", "id")
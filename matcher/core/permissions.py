@@ -10,6 +10,10 @@ def is_supervisor(user):
 def is_admin(user):
     return user.is_authenticated and user.is_staff
 
+class IsSupervisor(permissions.BasePermission):
+    def has_permission(self, request, view):
+        return is_supervisor(request.user)
+
 class IsSelfOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
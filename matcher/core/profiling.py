@@ -0,0 +1,152 @@
+"""
+Request profiling: wall time, DB query count, DB time and repeated-query
+fingerprints per view.
+
+QueryProfilingMiddleware records into a process-wide rolling summary
+(read by the admin-only /api/admin/profile/ endpoint) and logs one JSON
+line per sampled request on the "core.profiling" logger. A view that runs
+the same statement shape many times in one request is flagged as a likely
+N+1.
+"""
+import json
+import logging
+import random
+import re
+import statistics
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger("core.profiling")
+
+_IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """
+    Statement shape with IN lists collapsed; parameters are already separate placeholders.
+    """
+    return _WHITESPACE.sub(" ", _IN_LIST.sub("IN (...)", sql)).strip()
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def duplicates(self, threshold):
+        return {sql: n for sql, n in self.fingerprints.items() if n >= threshold}
+
+
+class ProfileSummary:
+    """
+    Rolling per-view aggregates, safe to share between threads.
+    """
+
+    def __init__(self, window=200):
+        self.window = window
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._views = defaultdict(lambda: {
+                "requests": 0,
+                "n_plus_one": 0,
+                "wall_ms": deque(maxlen=self.window),
+                "db_ms": deque(maxlen=self.window),
+                "queries": deque(maxlen=self.window),
+                "duplicates": {},
+            })
+
+    def record(self, view, wall_ms, db_ms, queries, duplicates):
+        with self._lock:
+            row = self._views[view]
+            row["requests"] += 1
+            row["wall_ms"].append(wall_ms)
+            row["db_ms"].append(db_ms)
+            row["queries"].append(queries)
+            if duplicates:
+                row["n_plus_one"] += 1
+                row["duplicates"] = duplicates
+
+    def snapshot(self):
+        with self._lock:
+            views = {view: (dict(row), list(row["wall_ms"]), list(row["db_ms"]), list(row["queries"]))
+                     for view, row in self._views.items()}
+        report = []
+        for view, (row, wall, db, queries) in views.items():
+            ordered = sorted(wall)
+            report.append({
+                "view": view,
+                "requests": row["requests"],
+                "p50_ms": round(statistics.median(ordered), 2),
+                "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))], 2),
+                "mean_db_ms": round(statistics.fmean(db), 2),
+                "mean_queries": round(statistics.fmean(queries), 1),
+                "max_queries": max(queries),
+                "n_plus_one_requests": row["n_plus_one"],
+                "duplicate_queries": row["duplicates"],
+            })
+        # most total time first: that is where optimisation pays off
+        report.sort(key=lambda r: r["p50_ms"] * r["requests"], reverse=True)
+        return report
+
+
+summary = ProfileSummary(getattr(settings, "PROFILING_WINDOW", 200))
+
+
+class QueryProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "PROFILING_ENABLED", True)
+        self.sample_rate = getattr(settings, "PROFILING_SAMPLE_RATE", 1.0)
+        self.threshold = getattr(settings, "PROFILING_N_PLUS_ONE_THRESHOLD", 5)
+
+    def __call__(self, request):
+        if not self.enabled or random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        wall_ms = (time.perf_counter() - started) * 1000
+
+        match = request.resolver_match
+        view = match.view_name if match else "<unresolved>"
+        db_ms = recorder.seconds * 1000
+        duplicates = recorder.duplicates(self.threshold)
+        summary.record(view, wall_ms, db_ms, recorder.count, duplicates)
+
+        payload = {
+            "view": view,
+            "method": request.method,
+            "status": response.status_code,
+            "wall_ms": round(wall_ms, 2),
+            "db_ms": round(db_ms, 2),
+            "queries": recorder.count,
+        }
+        if duplicates:
+            payload["n_plus_one"] = duplicates
+            logger.warning(json.dumps(payload))
+        else:
+            logger.info(json.dumps(payload))
+        return response
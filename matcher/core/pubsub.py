@@ -0,0 +1,92 @@
+"""
+In-process publish/subscribe for pushing events to async consumers.
+
+Publishers may run on any thread (notifications are published from
+whichever thread commits them); subscribers are asyncio queues on the event loop that
+created them. The broker in use comes from settings.NOTIFICATION_BROKER, so
+a different implementation with the same publish()/subscribe() interface
+can be dropped in. LocalBroker only sees events published in its own
+process; clients catch up on anything else when they reconnect.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class Subscription:
+    def __init__(self, channel, maxsize):
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        # set when the consumer fell behind and events were dropped
+        self.overflowed = False
+
+    def _deliver(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout=None):
+        """
+        Next event, or None if nothing arrived within `timeout` seconds.
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class LocalBroker:
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub._deliver, event)
+            except RuntimeError:
+                pass  # loop already closed; the subscription is going away
+
+    @contextmanager
+    def subscribe(self, channel):
+        """
+        Must be entered from a running event loop.
+        """
+        sub = Subscription(channel, self.queue_size)
+        with self._lock:
+            self._subscribers[channel].add(sub)
+        try:
+            yield sub
+        finally:
+            with self._lock:
+                self._subscribers[channel].discard(sub)
+                if not self._subscribers[channel]:
+                    del self._subscribers[channel]
+
+    def subscriber_count(self, channel=None):
+        with self._lock:
+            if channel is not None:
+                return len(self._subscribers.get(channel, ()))
+            return sum(len(subs) for subs in self._subscribers.values())
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(getattr(settings, "NOTIFICATION_BROKER", "core.pubsub.LocalBroker"))()
+    return _broker
@@ -0,0 +1,66 @@
+"""
+Notification retention.
+
+Read notifications older than NOTIFICATION_RETENTION_DAYS are moved out of
+the hot Notification table, either into NotificationArchive or into a
+gzip-compressed JSONL file, in id-ordered chunks. Each chunk is copied and
+then deleted in its own short transaction, so the job can run next to live
+traffic and pick up where it stopped after an interruption. Unread rows are
+never touched.
+"""
+import gzip
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Notification, NotificationArchive
+
+
+def cutoff(days=None):
+    if days is None:
+        days = getattr(settings, "NOTIFICATION_RETENTION_DAYS", 90)
+    return timezone.now() - timedelta(days=days)
+
+
+def expired(days=None):
+    return Notification.objects.filter(read=True, created_at__lt=cutoff(days))
+
+
+def archive_notifications(days=None, batch_size=1000, path=None):
+    """
+    Move expired read notifications to the archive table, or append them to the
+    gzip JSONL file at `path`. Returns the number of rows moved.
+    """
+    before = cutoff(days)
+    out = gzip.open(path, "at", encoding="utf-8") if path else None
+    moved = 0
+    try:
+        while True:
+            with transaction.atomic():
+                rows = list(
+                    Notification.objects.select_for_update()
+                    .filter(read=True, created_at__lt=before)
+                    .order_by("id")
+                    .values("id", "recipient_id", "message", "created_at")[:batch_size]
+                )
+                if not rows:
+                    return moved
+                if out:
+                    for row in rows:
+                        out.write(json.dumps({**row, "created_at": row["created_at"].isoformat()}) + "\n")
+                    out.flush()
+                else:
+                    now = timezone.now()
+                    NotificationArchive.objects.bulk_create([
+                        NotificationArchive(recipient_id=row["recipient_id"], message=row["message"],
+                                            created_at=row["created_at"], archived_at=now)
+                        for row in rows
+                    ])
+                Notification.objects.filter(id__in=[row["id"] for row in rows]).delete()
+            moved += len(rows)
+    finally:
+        if out:
+            out.close()
@@ -0,0 +1,168 @@
+"""
+Ranked full-text search over thesis titles, keywords and descriptions.
+
+On PostgreSQL the query runs against a GIN index on the weighted tsvector
+expression below (created by migration 0009), so matching is an index scan
+and ranking uses ts_rank. Other backends use an in-process inverted index:
+token -> {thesis id: weighted term frequency}, scored with tf-idf. It is
+built lazily, updated in place when a thesis is saved or deleted, and
+rebuilt after SEARCH_INDEX_TTL seconds to pick up other processes' writes.
+Both backends AND the query terms.
+"""
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+
+from .models import Thesis
+
+# the indexed expression of migration 0009 with table-qualified columns, so it stays unambiguous
+# next to joins; PostgreSQL matches index expressions after parsing, so the qualifier does not matter
+VECTOR_SQL = (
+    "setweight(to_tsvector('english'::regconfig, coalesce({table}.title, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce({table}.keywords, '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce({table}.description, '')), 'C')"
+)
+QUERY_SQL = "websearch_to_tsquery('english'::regconfig, %s)"
+
+# same relative weights as the A/B/C tsvector labels
+FIELD_WEIGHTS = {"title": 3.0, "keywords": 2.0, "description": 1.0}
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or the to with".split()
+)
+TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(value):
+    return [t for t in TOKEN_RE.findall((value or "").lower()) if len(t) > 1 and t not in STOP_WORDS]
+
+
+class SearchIndex:
+    def __init__(self, rows=()):
+        """
+        rows: dicts with id, title, keywords, description.
+        """
+        self.postings = defaultdict(dict)
+        self.terms = {}
+        for row in rows:
+            self.add(row)
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def build(cls):
+        return cls(Thesis.objects.values("id", *FIELD_WEIGHTS).iterator(chunk_size=2000))
+
+    def add(self, row):
+        self.remove(row["id"])
+        weights = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(row[field]):
+                weights[token] += weight
+        for token, weight in weights.items():
+            self.postings[token][row["id"]] = weight
+        self.terms[row["id"]] = list(weights)
+
+    def remove(self, thesis_id):
+        for token in self.terms.pop(thesis_id, ()):
+            postings = self.postings[token]
+            postings.pop(thesis_id, None)
+            if not postings:
+                del self.postings[token]
+
+    def search(self, query):
+        """
+        [(thesis id, score)] for theses containing every query term, best first.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        lists = sorted((self.postings.get(token, {}) for token in tokens), key=len)
+        if not lists[0]:
+            return []
+        total = len(self.terms)
+        scores = {}
+        for thesis_id in lists[0]:
+            if all(thesis_id in postings for postings in lists[1:]):
+                scores[thesis_id] = sum(
+                    (1 + math.log(postings[thesis_id])) * math.log(1 + total / len(postings))
+                    for postings in lists
+                )
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    ttl = getattr(settings, "SEARCH_INDEX_TTL", 300)
+    index = _index
+    if index is not None and time.monotonic() - index.built_at < ttl:
+        return index
+    with _index_lock:
+        if _index is None or time.monotonic() - _index.built_at >= ttl:
+            _index = SearchIndex.build()
+        return _index
+
+
+def invalidate():
+    global _index
+    _index = None
+
+
+def thesis_saved(thesis):
+    # the GIN index maintains itself; only a built in-process index needs the update
+    if _index is not None:
+        with _index_lock:
+            _index.add({"id": thesis.pk, **{field: getattr(thesis, field) for field in FIELD_WEIGHTS}})
+
+
+def thesis_deleted(thesis_id):
+    if _index is not None:
+        with _index_lock:
+            _index.remove(thesis_id)
+
+
+def uses_postgres():
+    return connection.vendor == "postgresql"
+
+
+def vector_sql():
+    return VECTOR_SQL.format(table=connection.ops.quote_name(Thesis._meta.db_table))
+
+
+def search(queryset, query, limit=20):
+    """
+    The best `limit` theses of `queryset` for `query`, each with a `search_rank` attribute.
+    """
+    if uses_postgres():
+        vector = vector_sql()
+        return list(
+            queryset.filter(RawSQL(f"({vector}) @@ {QUERY_SQL}", [query], output_field=BooleanField()))
+            .annotate(search_rank=RawSQL(f"ts_rank({vector}, {QUERY_SQL})", [query], output_field=FloatField()))
+            .order_by("-search_rank", "id")[:limit]
+        )
+
+    # rank the whole catalog in memory, then keep what `queryset` allows, best hits first
+    index = get_index()
+    with _index_lock:
+        hits = index.search(query)
+    results = []
+    for start in range(0, len(hits), limit * 2):
+        chunk = hits[start:start + limit * 2]
+        found = queryset.in_bulk([thesis_id for thesis_id, _ in chunk])
+        for thesis_id, rank in chunk:
+            thesis = found.get(thesis_id)
+            if thesis is not None:
+                thesis.search_rank = rank
+                results.append(thesis)
+        if len(results) >= limit:
+            break
+    return results[:limit]
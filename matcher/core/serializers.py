@@ -1,4 +1,10 @@
+from collections import Counter
+
+from django.db import transaction
 from rest_framework import serializers
+
+from . import applications
+from .notifications import notify
 from .models import (
     User,
     Thesis,
@@ -10,6 +16,7 @@ from .models import (
     ThesisSkill,
     ThesisInterest,
     Notification,
+    MatchScore,
 )
 
 class UserSerializer(serializers.ModelSerializer):
@@ -61,10 +68,7 @@ class ApplicationSerializer(serializers.ModelSerializer):
         validated_data["status"] = "pending"
         application = super().create(validated_data)
 
-        Notification.objects.create(
-            recipient=application.thesis.supervisor,
-            message=f"{user.username} applied to your thesis '{application.thesis.title}'."
-        )
+        notify(application.thesis.supervisor, f"{user.username} applied to your thesis '{application.thesis.title}'.")
 
         return application
 
@@ -111,14 +115,19 @@ class ApplicationSerializer(serializers.ModelSerializer):
             if new_status not in [Application.Status.ACCEPTED, Application.Status.REJECTED]:
                 raise serializers.ValidationError("Coordinators can only accept or reject applications.")
 
-        updated_instance = super().update(instance, validated_data)
+        # status goes through core.applications so the accepted counters stay in step
+        validated_data.pop("status", None)
+        with transaction.atomic():
+            updated_instance = super().update(instance, validated_data)
+            if new_status:
+                try:
+                    applications.change_status(updated_instance, new_status)
+                except applications.CapacityError as e:
+                    raise serializers.ValidationError(str(e))
 
         # Create notification for the student
         if user.role == "supervisor" and new_status in [Application.Status.ACCEPTED, Application.Status.REJECTED]:
-            Notification.objects.create(
-                recipient=instance.student,
-                message=f"Your application for '{instance.thesis.title}' was {new_status.lower()}."
-            )
+            notify(instance.student, f"Your application for '{instance.thesis.title}' was {new_status.lower()}.")
 
         return updated_instance
 
@@ -195,4 +204,26 @@ class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = ["id", "recipient", "message", "created_at", "read"]
-        read_only_fields = ["id", "recipient", "created_at"]
\ No newline at end of file
+        read_only_fields = ["id", "recipient", "created_at"]
+
+class DecisionSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    action = serializers.ChoiceField(choices=list(applications.DECISIONS))
+
+class BulkDecisionSerializer(serializers.Serializer):
+    decisions = DecisionSerializer(many=True, allow_empty=False, max_length=1000)
+
+    def validate_decisions(self, decisions):
+        # one decision per application: a repeated id would silently override the earlier one
+        counts = Counter(d["id"] for d in decisions)
+        duplicates = sorted(pk for pk, n in counts.items() if n > 1)
+        if duplicates:
+            raise serializers.ValidationError(f"Duplicate application ids: {duplicates}.")
+        return decisions
+
+class MatchScoreSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MatchScore
+        fields = ["id", "student", "thesis", "score", "rank", "shared_skills", "shared_interests", "near_misses",
+                  "computed_at"]
+        read_only_fields = fields
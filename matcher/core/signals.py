@@ -0,0 +1,129 @@
+from collections import Counter
+
+from django.db.models.signals import post_save, post_delete, pre_save, pre_delete, m2m_changed
+from django.dispatch import receiver
+
+from . import matching, applications, stats, catalog, search, keywords, incremental
+from .models import Thesis, ThesisSkill, ThesisInterest, Application, StudentSkill, StudentInterest, MatchScore, User
+
+
+@receiver(post_save, sender=Thesis)
+@receiver(post_delete, sender=Thesis)
+@receiver(post_save, sender=ThesisSkill)
+@receiver(post_delete, sender=ThesisSkill)
+@receiver(post_save, sender=ThesisInterest)
+@receiver(post_delete, sender=ThesisInterest)
+def invalidate_match_engine(sender, **kwargs):
+    matching.invalidate()
+
+
+# ThesisForm.save_m2m() goes through the through tables with bulk inserts/deletes
+@receiver(m2m_changed, sender=Thesis.required_skills.through)
+@receiver(m2m_changed, sender=Thesis.interests.through)
+def invalidate_match_engine_m2m(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        matching.invalidate()
+
+
+@receiver(post_save, sender=Thesis)
+@receiver(post_delete, sender=Thesis)
+def bump_catalog(sender, **kwargs):
+    catalog.bump()
+
+
+@receiver(post_save, sender=User)
+def bump_catalog_for_supervisor(sender, instance, update_fields=None, **kwargs):
+    # logins only touch last_login, which the catalog does not show
+    if instance.role == User.Role.SUPERVISOR and set(update_fields or ()) != {"last_login"}:
+        catalog.bump()
+
+
+@receiver(post_save, sender=Thesis)
+def index_thesis(sender, instance, **kwargs):
+    search.thesis_saved(instance)
+
+
+@receiver(post_save, sender=Thesis)
+def sync_keyword_tokens(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or "keywords" in update_fields:
+        keywords.sync(instance)
+
+
+@receiver(post_delete, sender=Thesis)
+def unindex_thesis(sender, instance, **kwargs):
+    search.thesis_deleted(instance.pk)
+
+
+@receiver(post_delete, sender=Application)
+def release_accepted_seat(sender, instance, **kwargs):
+    if instance.status == Application.Status.ACCEPTED:
+        applications.record_accepted_deleted(instance)
+
+
+@receiver(post_save, sender=Application)
+def count_new_application(sender, instance, created, **kwargs):
+    if created:
+        stats.shift(Counter({(instance.thesis_id, instance.status): 1}))
+
+
+@receiver(post_delete, sender=Application)
+def uncount_deleted_application(sender, instance, **kwargs):
+    # no rebuild here: during a thesis cascade the stats row is going away too
+    stats.shift(Counter({(instance.thesis_id, instance.status): -1}), create_missing=False)
+
+
+# change capture for incremental MatchScore maintenance (core.incremental)
+@receiver(post_save, sender=StudentSkill)
+@receiver(post_delete, sender=StudentSkill)
+@receiver(post_save, sender=StudentInterest)
+@receiver(post_delete, sender=StudentInterest)
+def mark_student_dirty(sender, instance, **kwargs):
+    incremental.mark(student_ids=[instance.student_id])
+
+
+@receiver(post_save, sender=ThesisSkill)
+@receiver(post_delete, sender=ThesisSkill)
+@receiver(post_save, sender=ThesisInterest)
+@receiver(post_delete, sender=ThesisInterest)
+def mark_thesis_links_dirty(sender, instance, **kwargs):
+    incremental.mark(thesis_ids=[instance.thesis_id])
+
+
+@receiver(m2m_changed, sender=Thesis.required_skills.through)
+@receiver(m2m_changed, sender=Thesis.interests.through)
+def mark_thesis_m2m_dirty(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        incremental.mark(thesis_ids=[instance.pk])
+    elif pk_set:
+        incremental.mark(thesis_ids=pk_set)
+
+
+# status decides whether a thesis is matched at all, keywords can name interests
+MATCHED_THESIS_FIELDS = ("status", "keywords")
+
+
+@receiver(pre_save, sender=Thesis)
+def remember_matched_fields(sender, instance, update_fields=None, **kwargs):
+    if instance.pk is None or (update_fields is not None and not set(MATCHED_THESIS_FIELDS) & set(update_fields)):
+        instance._matched_fields = None
+        return
+    instance._matched_fields = Thesis.objects.filter(pk=instance.pk).values_list(*MATCHED_THESIS_FIELDS).first()
+
+
+@receiver(post_save, sender=Thesis)
+def mark_thesis_dirty(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        incremental.mark(thesis_ids=[instance.pk])
+        return
+    before = getattr(instance, "_matched_fields", None)
+    # a title or description edit does not move any match
+    if before is not None and before != tuple(getattr(instance, f) for f in MATCHED_THESIS_FIELDS):
+        incremental.mark(thesis_ids=[instance.pk])
+
+
+@receiver(pre_delete, sender=Thesis)
+def mark_thesis_holders_dirty(sender, instance, **kwargs):
+    # the cascade removes their rows for this thesis before the refresh runs
+    incremental.mark(student_ids=MatchScore.objects.filter(thesis=instance).values_list("student_id", flat=True))
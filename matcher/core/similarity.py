@@ -0,0 +1,120 @@
+"""
+Skill and research-interest similarity from co-occurrence.
+
+Two skills are similar when the same students and theses tend to list them
+together. build() reads the link tables once, accumulates the item x item
+co-occurrence matrix a block of students/theses at a time (X.T @ X), turns
+it into cosine similarity and keeps the top NEIGHBORS of every item that
+reach MIN_SIMILARITY and were seen together at least MIN_SUPPORT times.
+The result is a small table per kind (SkillNeighbor, InterestNeighbor) that
+match scoring loads once and expands in a single step, so near misses
+("PyTorch" vs "Deep Learning") are found without comparing names per
+request. Rebuild it periodically with the build_similarity command.
+"""
+import numpy as np
+from django.db import transaction
+
+from .models import (
+    StudentSkill,
+    StudentInterest,
+    ThesisSkill,
+    ThesisInterest,
+    SkillNeighbor,
+    InterestNeighbor,
+)
+
+NEIGHBORS = 5
+MIN_SIMILARITY = 0.3
+MIN_SUPPORT = 3
+BLOCK_SIZE = 4096
+
+
+def neighbors_from_pairs(pairs, k=NEIGHBORS, min_similarity=MIN_SIMILARITY, min_support=MIN_SUPPORT,
+                         block_size=BLOCK_SIZE):
+    """
+    (entity, item) pairs -> {item: [(neighbor, similarity), ...]}, most similar first.
+    """
+    entity_index, item_index = {}, {}
+    rows, cols = [], []
+    for entity, item in pairs:
+        rows.append(entity_index.setdefault(entity, len(entity_index)))
+        cols.append(item_index.setdefault(item, len(item_index)))
+    n_items = len(item_index)
+    k = min(k, n_items - 1)
+    if k <= 0:
+        return {}
+
+    rows, cols = np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64)
+    order = np.argsort(rows, kind="stable")
+    rows, cols = rows[order], cols[order]
+    co = np.zeros((n_items, n_items), dtype=np.float32)
+    for start in range(0, len(entity_index), block_size):
+        lo, hi = np.searchsorted(rows, [start, start + block_size])
+        block = np.zeros((min(block_size, len(entity_index) - start), n_items), dtype=np.float32)
+        block[rows[lo:hi] - start, cols[lo:hi]] = 1
+        co += block.T @ block
+
+    # every item occurs at least once, so the diagonal has no zeros
+    counts = np.diag(co).copy()
+    similarity = co / np.sqrt(np.outer(counts, counts))
+    np.fill_diagonal(similarity, 0)
+    similarity[(co < min_support) | (similarity < min_similarity)] = 0
+
+    ids = list(item_index)
+    top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+    result = {}
+    for i, candidates in enumerate(top):
+        candidates = candidates[similarity[i, candidates] > 0]
+        candidates = candidates[np.argsort(-similarity[i, candidates], kind="stable")]
+        if len(candidates):
+            result[ids[i]] = [(ids[j], float(similarity[i, j])) for j in candidates]
+    return result
+
+
+def _pairs(student_links, thesis_links):
+    # students and theses share one entity space: theses get negative ids
+    yield from student_links
+    for thesis_id, item_id in thesis_links:
+        yield -thesis_id, item_id
+
+
+def build(k=NEIGHBORS, min_similarity=MIN_SIMILARITY, min_support=MIN_SUPPORT):
+    """
+    Recompute both neighbor tables. Returns (skill edges, interest edges) written.
+    """
+    written = []
+    for model, source, links in (
+        (SkillNeighbor, "skill_id", _pairs(
+            StudentSkill.objects.values_list("student_id", "skill_id").iterator(chunk_size=5000),
+            ThesisSkill.objects.values_list("thesis_id", "skill_id").iterator(chunk_size=5000),
+        )),
+        (InterestNeighbor, "interest_id", _pairs(
+            StudentInterest.objects.values_list("student_id", "interest_id").iterator(chunk_size=5000),
+            ThesisInterest.objects.values_list("thesis_id", "interest_id").iterator(chunk_size=5000),
+        )),
+    ):
+        neighbors = neighbors_from_pairs(links, k, min_similarity, min_support)
+        rows = [
+            model(**{source: item}, neighbor_id=neighbor, similarity=score)
+            for item, edges in neighbors.items() for neighbor, score in edges
+        ]
+        with transaction.atomic():
+            model.objects.all().delete()
+            model.objects.bulk_create(rows, batch_size=5000)
+        written.append(len(rows))
+    return tuple(written)
+
+
+def _load(model, source):
+    neighbors = {}
+    for item_id, neighbor_id in model.objects.values_list(source, "neighbor_id"):
+        neighbors.setdefault(item_id, []).append(neighbor_id)
+    return neighbors
+
+
+def skill_neighbors():
+    return _load(SkillNeighbor, "skill_id")
+
+
+def interest_neighbors():
+    return _load(InterestNeighbor, "interest_id")
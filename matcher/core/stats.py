@@ -0,0 +1,84 @@
+"""
+Per-thesis application counts (ThesisStats).
+
+Every path that creates, deletes or moves an Application between statuses
+shifts the matching ThesisStats columns with F() updates in the same
+transaction, so the supervisor dashboard and stats API read one row per
+thesis instead of aggregating Application. refresh() rebuilds rows from
+Application for paths that bypass this (admin edits, raw bulk loads).
+"""
+from collections import Counter, defaultdict
+
+from django.db.models import Count, F
+
+from .models import Application, Thesis, ThesisStats
+
+STATUSES = [status.value for status in Application.Status]
+
+
+def shift(changes, create_missing=True):
+    """
+    Apply {(thesis_id, status): delta}. Call after the Application rows were written:
+    a thesis without a stats row yet is rebuilt from Application instead.
+    """
+    per_thesis = defaultdict(dict)
+    for (thesis_id, status), delta in changes.items():
+        if delta:
+            per_thesis[thesis_id][status] = delta
+    missing = []
+    for thesis_id, deltas in per_thesis.items():
+        updated = ThesisStats.objects.filter(thesis_id=thesis_id).update(
+            **{status: F(status) + delta for status, delta in deltas.items()}
+        )
+        if not updated:
+            missing.append(thesis_id)
+    if missing and create_missing:
+        refresh(missing)
+
+
+def record_transition(thesis_id, old_status, new_status):
+    shift(Counter({(thesis_id, old_status): -1, (thesis_id, new_status): 1}))
+
+
+def record_bulk(applications, old_status, new_status):
+    """
+    For bulk status updates: every application in `applications` moved from old_status to new_status.
+    """
+    changes = Counter()
+    for app in applications:
+        changes[(app.thesis_id, old_status)] -= 1
+        changes[(app.thesis_id, new_status)] += 1
+    shift(changes)
+
+
+def refresh(thesis_ids=None):
+    """
+    Recompute stats rows from Application (all theses, or just `thesis_ids`). Returns rows written.
+    """
+    theses = Thesis.objects.all() if thesis_ids is None else Thesis.objects.filter(pk__in=thesis_ids)
+    rows = {pk: ThesisStats(thesis_id=pk) for pk in theses.values_list("pk", flat=True)}
+    counts = Application.objects.all() if thesis_ids is None else Application.objects.filter(thesis_id__in=list(rows))
+    for row in counts.values("thesis_id", "status").annotate(n=Count("id")):
+        setattr(rows[row["thesis_id"]], row["status"], row["n"])
+    ThesisStats.objects.bulk_create(
+        rows.values(), batch_size=1000, update_conflicts=True, unique_fields=["thesis"], update_fields=STATUSES
+    )
+    return len(rows)
+
+
+def for_supervisor(supervisor):
+    """
+    One row per thesis of `supervisor` (zeros where nothing was recorded yet) plus totals.
+    """
+    theses = list(
+        Thesis.objects.filter(supervisor=supervisor).order_by("id").values(
+            "id", "title", "status", *(f"stats__{status}" for status in STATUSES)
+        )
+    )
+    rows = [
+        {"thesis": t["id"], "title": t["title"], "status": t["status"],
+         **{status: t[f"stats__{status}"] or 0 for status in STATUSES}}
+        for t in theses
+    ]
+    totals = {status: sum(row[status] for row in rows) for status in STATUSES}
+    return rows, totals
@@ -1,7 +1,32 @@
-from django.test import TestCase
+import csv
+import gzip
+import json
+import os
+import tempfile
+import threading
+import unittest
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
-from core.models import User, Thesis, Application, ResearchInterest, StudentInterest, Notification
-from core.serializers import ApplicationSerializer, StudentInterestSerializer
+from core import (
+    matching, bulk_matching, applications, benchmarks, profiling, notifications, pubsub, retention,
+    exporters, lean, catalog, search, keywords, similarity, incremental, allocation as allocation_module,
+)
+from core.models import (
+    User, Thesis, Application, Skill, ResearchInterest, StudentSkill, StudentInterest,
+    ThesisSkill, ThesisInterest, ThesisKeyword, SkillNeighbor, Notification, NotificationArchive, MatchScore, ThesisStats,
+    MAX_STUDENTS_PER_SUPERVISOR,
+)
+from core.serializers import ApplicationSerializer, StudentInterestSerializer, ThesisSerializer
 from rest_framework.test import APITestCase
 from django.urls import reverse
 
@@ -97,4 +122,1177 @@ class NotificationTests(APITestCase):
         })
         self.assertEqual(response.status_code, 201)
         notif = Notification.objects.get(recipient=self.supervisor)
-        self.assertIn("stud applied", notif.message)
\ No newline at end of file
+        self.assertIn("stud applied", notif.message)
+
+class MatchFixtureMixin:
+    def setUp(self):
+        self.supervisor = User.objects.create_user(username="prof", password="pass", role="supervisor")
+        self.student = User.objects.create_user(username="stud", password="pass", role="student")
+        self.python = Skill.objects.create(name="Python")
+        self.ml = Skill.objects.create(name="Machine Learning")
+        self.sql = Skill.objects.create(name="SQL")
+        self.ai = ResearchInterest.objects.create(name="Artificial Intelligence")
+        self.db = ResearchInterest.objects.create(name="Databases")
+
+        self.ml_thesis = Thesis.objects.create(title="ML", supervisor=self.supervisor, status="open")
+        ThesisSkill.objects.create(thesis=self.ml_thesis, skill=self.python)
+        ThesisSkill.objects.create(thesis=self.ml_thesis, skill=self.ml)
+        ThesisInterest.objects.create(thesis=self.ml_thesis, interest=self.ai)
+
+        self.db_thesis = Thesis.objects.create(title="DB", supervisor=self.supervisor, status="open")
+        ThesisSkill.objects.create(thesis=self.db_thesis, skill=self.python)
+        ThesisSkill.objects.create(thesis=self.db_thesis, skill=self.sql)
+
+        closed = Thesis.objects.create(title="Closed", supervisor=self.supervisor, status="closed")
+        ThesisSkill.objects.create(thesis=closed, skill=self.python)
+        ThesisSkill.objects.create(thesis=closed, skill=self.ml)
+
+        StudentSkill.objects.create(student=self.student, skill=self.python)
+        StudentSkill.objects.create(student=self.student, skill=self.ml)
+        StudentSkill.objects.create(student=self.student, skill=self.sql)
+        StudentInterest.objects.create(student=self.student, interest=self.ai, priority=3)
+
+
+class MatchEngineTests(MatchFixtureMixin, TestCase):
+    def test_top_matches_ranked_by_score(self):
+        matches = matching.MatchEngine.build().top_matches(self.student.id, k=10)
+        self.assertEqual([m.thesis_id for m in matches], [self.ml_thesis.id, self.db_thesis.id])
+        self.assertEqual(matches[0].shared_skills, 2)
+        self.assertEqual(matches[0].shared_interests, 1)
+        self.assertEqual(matches[0].score, 2 * matching.SKILL_WEIGHT + 3)
+
+    def test_min_shared_cutoff_and_k(self):
+        engine = matching.MatchEngine.build()
+        self.assertEqual(engine.top_matches(self.student.id, k=1)[0].thesis_id, self.ml_thesis.id)
+        self.assertEqual(engine.top_matches(self.student.id, min_shared=3), [])
+
+    def test_engine_invalidated_on_thesis_change(self):
+        engine = matching.get_engine()
+        ThesisSkill.objects.filter(thesis=self.db_thesis, skill=self.sql).delete()
+        self.assertIsNot(matching.get_engine(), engine)
+        ids = [m.thesis_id for m in matching.get_engine().top_matches(self.student.id)]
+        self.assertEqual(ids, [self.ml_thesis.id])
+
+    def test_matched_theses_view(self):
+        self.client.login(username="stud", password="pass")
+        response = self.client.get(reverse("matched-theses"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([t.id for t in response.context["theses"]], [self.ml_thesis.id, self.db_thesis.id])
+
+
+class BulkMatchingTests(MatchFixtureMixin, TestCase):
+    def test_cohort_scores_match_engine(self):
+        other = User.objects.create_user(username="stud2", password="pass", role="student")
+        StudentSkill.objects.create(student=other, skill=self.sql)
+        StudentInterest.objects.create(student=other, interest=self.db, priority=1)
+
+        engine = matching.MatchEngine.build()
+        results = dict(bulk_matching.compute_top_matches(min_shared=1, chunk_size=1))
+        for student in (self.student, other):
+            self.assertEqual(results[student.id], engine.top_matches(student.id, min_shared=1))
+
+    def test_persist_match_scores(self):
+        written = bulk_matching.persist_match_scores()
+        self.assertEqual(written, 2)
+        rows = list(MatchScore.objects.filter(student=self.student).values_list("thesis_id", "rank"))
+        self.assertEqual(rows, [(self.ml_thesis.id, 1), (self.db_thesis.id, 2)])
+
+        # recomputing replaces instead of duplicating
+        bulk_matching.persist_match_scores(student_ids=[self.student.id], top_k=1)
+        self.assertEqual(MatchScore.objects.filter(student=self.student).count(), 1)
+
+    def test_match_api_scoped_to_student(self):
+        bulk_matching.persist_match_scores()
+        self.client.login(username="stud", password="pass")
+        response = self.client.get(reverse("api-match-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["thesis"] for row in response.json()["results"]], [self.ml_thesis.id, self.db_thesis.id])
+
+
+class AllocationTests(MatchFixtureMixin, TestCase):
+    def test_best_match_wins_contested_seat(self):
+        weaker = User.objects.create_user(username="weak", password="pass", role="student")
+        StudentSkill.objects.create(student=weaker, skill=self.python)
+        # the weaker student applied first, but the thesis prefers the better match
+        early = Application.objects.create(student=weaker, thesis=self.ml_thesis)
+        strong = Application.objects.create(student=self.student, thesis=self.ml_thesis)
+        fallback = Application.objects.create(student=weaker, thesis=self.db_thesis)
+
+        allocation = allocation_module.allocate()
+        self.assertCountEqual(allocation.accepted_ids, [strong.id, fallback.id])
+        self.assertEqual([a.id for a in allocation.unmatched], [early.id])
+
+    def test_supervisor_cap_respected(self):
+        thesis = Thesis.objects.create(title="Big", supervisor=self.supervisor, status="open", max_students=20)
+        for i in range(MAX_STUDENTS_PER_SUPERVISOR + 3):
+            student = User.objects.create_user(username=f"s{i}", password="pass", role="student")
+            Application.objects.create(student=student, thesis=thesis)
+
+        allocation = allocation_module.allocate()
+        self.assertEqual(len(allocation.accepted), MAX_STUDENTS_PER_SUPERVISOR)
+
+    def test_dry_run_and_commit(self):
+        app = Application.objects.create(student=self.student, thesis=self.ml_thesis)
+        other = User.objects.create_user(username="other", password="pass", role="student")
+        loser = Application.objects.create(student=other, thesis=self.ml_thesis)
+
+        call_command("allocate_applications", "--dry-run", stdout=StringIO())
+        self.assertEqual(Application.objects.filter(status="accepted").count(), 0)
+
+        call_command("allocate_applications", "--reject-unmatched", stdout=StringIO())
+        app.refresh_from_db()
+        loser.refresh_from_db()
+        self.assertEqual(app.status, "accepted")
+        self.assertEqual(loser.status, "rejected")
+        self.assertEqual(Notification.objects.filter(recipient__in=[self.student, other]).count(), 2)
+
+    def test_commit_skips_seats_taken_since_allocate(self):
+        app = Application.objects.create(student=self.student, thesis=self.ml_thesis)
+        allocation = allocation_module.allocate()
+        self.assertEqual(allocation.accepted_ids, [app.id])
+
+        # the seat goes elsewhere between allocate() and commit
+        Thesis.objects.filter(pk=self.ml_thesis.pk).update(accepted_count=self.ml_thesis.max_students)
+        allocation_module.commit_allocation(allocation)
+        app.refresh_from_db()
+        self.ml_thesis.refresh_from_db()
+        self.assertEqual(app.status, "pending")
+        self.assertEqual(self.ml_thesis.accepted_count, self.ml_thesis.max_students)
+
+
+class AcceptedCounterTests(TestCase):
+    def setUp(self):
+        self.supervisor = User.objects.create_user(username="prof", password="pass", role="supervisor")
+        self.thesis = Thesis.objects.create(title="T", supervisor=self.supervisor, status="open", max_students=1)
+        self.students = [
+            User.objects.create_user(username=f"stud{i}", password="pass", role="student") for i in range(2)
+        ]
+        self.apps = [Application.objects.create(student=s, thesis=self.thesis) for s in self.students]
+
+    def test_accept_updates_counters_and_enforces_capacity(self):
+        applications.change_status(self.apps[0], Application.Status.ACCEPTED)
+        self.thesis.refresh_from_db()
+        self.supervisor.refresh_from_db()
+        self.assertEqual(self.thesis.accepted_count, 1)
+        self.assertEqual(self.supervisor.accepted_students_count, 1)
+        self.assertFalse(self.thesis.has_capacity)
+
+        with self.assertRaises(applications.CapacityError):
+            applications.change_status(self.apps[1], Application.Status.ACCEPTED)
+
+        applications.change_status(self.apps[0], Application.Status.REJECTED)
+        self.thesis.refresh_from_db()
+        self.assertEqual(self.thesis.accepted_count, 0)
+
+    def test_capacity_check_needs_no_count(self):
+        applications.change_status(self.apps[0], Application.Status.ACCEPTED)
+        thesis = Thesis.objects.get(pk=self.thesis.pk)
+        with self.assertNumQueries(0):
+            self.assertFalse(thesis.has_capacity)
+
+    def test_deleting_accepted_application_releases_seat(self):
+        applications.change_status(self.apps[0], Application.Status.ACCEPTED)
+        self.apps[0].delete()
+        self.supervisor.refresh_from_db()
+        self.assertEqual(self.supervisor.accepted_students_count, 0)
+
+    def test_reconcile_repairs_drift(self):
+        Application.objects.filter(pk=self.apps[0].pk).update(status=Application.Status.ACCEPTED)
+        self.assertEqual(applications.reconcile_counters(), (1, 1))
+        self.thesis.refresh_from_db()
+        self.assertEqual(self.thesis.accepted_count, 1)
+        self.assertEqual(applications.reconcile_counters(), (0, 0))
+
+    def test_web_accept_respects_capacity(self):
+        self.client.login(username="prof", password="pass")
+        url = reverse("update-application-status", args=[self.apps[0].pk])
+        self.client.post(url, {"action": "accept"})
+        self.client.post(reverse("update-application-status", args=[self.apps[1].pk]), {"action": "accept"})
+        self.assertEqual(
+            list(Application.objects.order_by("id").values_list("status", flat=True)), ["accepted", "pending"]
+        )
+
+    def test_api_accept_respects_capacity(self):
+        self.client.login(username="prof", password="pass")
+        for app, expected in zip(self.apps, (200, 400)):
+            response = self.client.patch(
+                reverse("api-update-application-status", args=[app.pk]), {"status": "accepted"},
+                content_type="application/json",
+            )
+            self.assertEqual(response.status_code, expected)
+        self.thesis.refresh_from_db()
+        self.assertEqual(self.thesis.accepted_count, 1)
+        self.assertEqual(Application.objects.get(pk=self.apps[1].pk).status, Application.Status.PENDING)
+
+    def test_supervisor_cap_rolls_back_thesis_seat(self):
+        User.objects.filter(pk=self.supervisor.pk).update(accepted_students_count=MAX_STUDENTS_PER_SUPERVISOR)
+        with self.assertRaises(applications.CapacityError):
+            applications.change_status(self.apps[0], Application.Status.ACCEPTED)
+        self.thesis.refresh_from_db()
+        self.assertEqual(self.thesis.accepted_count, 0)
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "needs real row locks and concurrent connections")
+class CapacityRaceTests(TransactionTestCase):
+    def accept_concurrently(self, apps):
+        barrier = threading.Barrier(len(apps))
+        outcomes = []
+
+        def accept(app):
+            try:
+                barrier.wait()
+                applications.change_status(app, Application.Status.ACCEPTED)
+                outcomes.append(True)
+            except applications.CapacityError:
+                outcomes.append(False)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=accept, args=(app,)) for app in apps]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return outcomes
+
+    def test_thesis_and_supervisor_caps_hold(self):
+        supervisor = User.objects.create_user(username="prof", password="pass", role="supervisor")
+        theses = [Thesis.objects.create(title=f"T{i}", supervisor=supervisor, status="open", max_students=3)
+                  for i in range(4)]
+        apps = [
+            Application.objects.create(
+                student=User.objects.create_user(username=f"stud{i}", password="pass", role="student"),
+                thesis=theses[i % len(theses)],
+            )
+            for i in range(20)
+        ]
+        self.assertEqual(self.accept_concurrently(apps).count(True), MAX_STUDENTS_PER_SUPERVISOR)
+
+        supervisor.refresh_from_db()
+        self.assertEqual(supervisor.accepted_students_count, MAX_STUDENTS_PER_SUPERVISOR)
+        for thesis in theses:
+            thesis.refresh_from_db()
+            accepted = Application.objects.filter(thesis=thesis, status=Application.Status.ACCEPTED).count()
+            self.assertEqual(thesis.accepted_count, accepted)
+            self.assertLessEqual(accepted, thesis.max_students)
+
+
+class ListQueryCountTests(APITestCase):
+    """
+    List pages and endpoints must cost the same number of queries whatever the row count.
+    """
+
+    def setUp(self):
+        self.supervisor = User.objects.create_user(username="prof", password="pass", role="supervisor")
+        self.student = User.objects.create_user(username="stud", password="pass", role="student")
+        self.skills = [Skill.objects.create(name=f"skill{i}") for i in range(2)]
+        for skill in self.skills:
+            StudentSkill.objects.create(student=self.student, skill=skill)
+        self.rows = 0
+        self._add_rows(1)
+
+    def _add_rows(self, n):
+        for _ in range(n):
+            self.rows += 1
+            supervisor = User.objects.create_user(username=f"sup{self.rows}", password="pass", role="supervisor")
+            other = User.objects.create_user(username=f"other{self.rows}", password="pass", role="student")
+            for owner in (supervisor, self.supervisor):
+                thesis = Thesis.objects.create(title=f"T{self.rows}", supervisor=owner, status="open")
+                for skill in self.skills:
+                    ThesisSkill.objects.create(thesis=thesis, skill=skill)
+                Application.objects.create(student=self.student if owner is supervisor else other, thesis=thesis)
+
+    def assertConstantQueries(self, username, url):
+        self.client.login(username=username, password="pass")
+        cache.clear()  # both requests start cold, like the matching engine after _add_rows
+        with CaptureQueriesContext(connection) as few:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self._add_rows(5)
+        cache.clear()
+        with CaptureQueriesContext(connection) as many:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(len(few), len(many), f"{url} issues per-row queries")
+
+    def test_student_pages(self):
+        for name in ("theses", "matched-theses", "my-applications"):
+            with self.subTest(name):
+                self.assertConstantQueries("stud", reverse(name))
+
+    def test_supervisor_pages(self):
+        for name in ("theses", "supervisor-applications"):
+            with self.subTest(name):
+                self.assertConstantQueries("prof", reverse(name))
+
+    def test_api_lists(self):
+        for username, name in (
+            ("prof", "api-thesis-list"),
+            ("prof", "api-application-list"),
+            ("prof", "api-my-thesis-applications"),
+            ("stud", "api-student-thesis-list"),
+            ("stud", "api-my-applications"),
+        ):
+            with self.subTest(name):
+                self.assertConstantQueries(username, reverse(name))
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="stud", password="pass", role="student")
+        for i in range(5):
+            Notification.objects.create(recipient=self.user, message=f"n{i}")
+
+    def test_cursor_walks_newest_first_without_repeats(self):
+        self.client.login(username="stud", password="pass")
+        url = reverse("api-notification-list") + "?page_size=2"
+        seen = []
+        while url:
+            page = self.client.get(url).json()
+            self.assertLessEqual(len(page["results"]), 2)
+            seen += [row["message"] for row in page["results"]]
+            url = page["next"]
+        self.assertEqual(seen, ["n4", "n3", "n2", "n1", "n0"])
+
+
+class BenchmarkSuiteTests(TestCase):
+    def test_generate_dataset_and_benchmark(self):
+        call_command("generate_dataset", "--students", "20", "--supervisors", "2", "--theses", "6", stdout=StringIO())
+        self.assertEqual(User.objects.filter(role="student").count(), 20)
+        self.assertEqual(Application.objects.count(), 40)
+        pending = Application.objects.filter(status="pending").count()
+        notified = Notification.objects.count()
+
+        results = benchmarks.run(iterations=2, warmup=0)
+        self.assertIn("matched_theses", results)
+        self.assertIn("update_application_status", results)
+        self.assertEqual(results["supervisor_applications"]["samples"], 2)
+        # the write scenario is rolled back
+        self.assertEqual(Application.objects.filter(status="pending").count(), pending)
+        self.assertEqual(Notification.objects.count(), notified)
+
+        slower = {name: dict(row, p50_ms=row["p50_ms"] / 10, queries=row["queries"] - 1)
+                  for name, row in results.items()}
+        self.assertTrue(benchmarks.regressions(results, slower))
+        self.assertEqual(benchmarks.regressions(results, results), [])
+
+
+class ProfilingTests(APITestCase):
+    def setUp(self):
+        profiling.summary.reset()
+        self.admin = User.objects.create_user(username="admin", password="pass", role="supervisor", is_staff=True)
+        self.student = User.objects.create_user(username="stud", password="pass", role="student")
+
+    def test_fingerprint_collapses_in_lists(self):
+        self.assertEqual(
+            profiling.fingerprint('SELECT * FROM "t" WHERE id IN (%s, %s, %s)'),
+            profiling.fingerprint('SELECT * FROM "t" WHERE id IN (%s)'),
+        )
+
+    def test_summary_records_views_and_is_admin_only(self):
+        self.client.login(username="stud", password="pass")
+        self.client.get(reverse("my-applications"))
+        self.assertEqual(self.client.get(reverse("api-profile-summary")).status_code, 403)
+
+        self.client.login(username="admin", password="pass")
+        rows = {row["view"]: row for row in self.client.get(reverse("api-profile-summary")).json()}
+        self.assertEqual(rows["my-applications"]["requests"], 1)
+        self.assertGreater(rows["my-applications"]["max_queries"], 0)
+
+    def test_repeated_queries_flagged(self):
+        recorder = profiling.QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            for user in User.objects.all():
+                list(Notification.objects.filter(recipient=user))
+                list(Notification.objects.filter(recipient=user))
+                list(Notification.objects.filter(recipient=user))
+        self.assertEqual(list(recorder.duplicates(threshold=5).values()), [6])
+
+
+class NotificationDeliveryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="stud", password="pass", role="student")
+
+    def test_written_in_the_callers_transaction(self):
+        with transaction.atomic():
+            notifications.notify(self.user, "lost")
+            transaction.set_rollback(True)
+        self.assertFalse(Notification.objects.exists())
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            with self.assertNumQueries(1):
+                notifications.notify_many(Notification(recipient=self.user, message=m) for m in "abc")
+        self.assertEqual(list(Notification.objects.order_by("id").values_list("message", flat=True)),
+                         ["a", "b", "c"])
+        # cache and pub/sub only hear about it once the transaction commits
+        self.assertEqual(len(callbacks), 1)
+
+
+class UnreadCounterTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="stud", password="pass", role="student")
+        Notification.objects.create(recipient=self.user, message="old", read=True)
+        notifications.notify(self.user, "one")
+        notifications.notify(self.user, "two")
+
+    def test_count_is_cached_and_kept_in_step(self):
+        self.assertEqual(notifications.unread_count(self.user), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            notifications.notify(self.user, "three")
+        with self.assertNumQueries(0):
+            self.assertEqual(notifications.unread_count(self.user), 3)
+
+        notifications.delete_notification(Notification.objects.filter(read=False).first())
+        notifications.delete_notification(Notification.objects.get(read=True))
+        with self.assertNumQueries(0):
+            self.assertEqual(notifications.unread_count(self.user), 2)
+
+    def test_falls_back_to_database_when_cache_is_empty(self):
+        notifications.unread_count(self.user)
+        cache.clear()
+        self.assertEqual(notifications.unread_count(self.user), 2)
+
+    def test_mark_all_read_is_one_update(self):
+        self.client.login(username="stud", password="pass")
+        with self.assertNumQueries(1):
+            self.assertEqual(notifications.mark_all_read(self.user), 2)
+        self.assertFalse(Notification.objects.filter(read=False).exists())
+        self.assertEqual(self.client.get(reverse("api-notification-unread")).json(), {"unread": 0})
+
+        notifications.notify(self.user, "fresh")
+        response = self.client.post(reverse("api-notification-mark-read"))
+        self.assertEqual(response.json(), {"updated": 1})
+
+    def test_badge_rendered_from_cache(self):
+        self.client.login(username="stud", password="pass")
+        notifications.unread_count(self.user)
+        response = self.client.get(reverse("dashboard"))
+        self.assertContains(response, '<span class="badge bg-danger">2</span>', html=True)
+
+
+class NotificationStreamTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="stud", password="pass", role="student")
+        self.url = reverse("api-notification-stream")
+
+    async def _open(self, **headers):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(self.url, headers=headers)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b"retry: 3000\n\n")
+        return stream
+
+    def _notify(self, message):
+        with self.captureOnCommitCallbacks(execute=True):
+            notifications.notify(self.user, message)
+
+    async def test_pushes_notifications_once_committed(self):
+        stream = await self._open()
+        self.assertEqual(pubsub.get_broker().subscriber_count(self.user.pk), 1)
+        await sync_to_async(self._notify)("accepted")
+        chunk = (await anext(stream)).decode()
+        notification = await Notification.objects.aget(recipient=self.user)
+        self.assertTrue(chunk.startswith(f"id: {notification.id}\n"))
+        self.assertIn('"message": "accepted"', chunk)
+        await stream.aclose()
+
+    async def test_replays_from_last_event_id(self):
+        first, second, third = [
+            await Notification.objects.acreate(recipient=self.user, message=m) for m in ("a", "b", "c")
+        ]
+        stream = await self._open(**{"Last-Event-ID": str(first.id)})
+        self.assertIn(f"id: {second.id}", (await anext(stream)).decode())
+        self.assertIn(f"id: {third.id}", (await anext(stream)).decode())
+        await stream.aclose()
+
+    @override_settings(NOTIFICATION_STREAM_HEARTBEAT=0.01)
+    async def test_idle_connection_gets_keep_alive(self):
+        stream = await self._open()
+        self.assertEqual(await anext(stream), b": keep-alive\n\n")
+        await stream.aclose()
+
+    async def test_requires_login(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+
+    def test_not_served_over_wsgi(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(self.url).status_code, 501)
+
+
+@override_settings(NOTIFICATION_RETENTION_DAYS=30)
+class NotificationRetentionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="stud", password="pass", role="student")
+        old = timezone.now() - timedelta(days=60)
+        self.expired = [
+            Notification.objects.create(recipient=self.user, message=f"old {i}", created_at=old, read=True)
+            for i in range(5)
+        ]
+        self.kept = [
+            Notification.objects.create(recipient=self.user, message="old unread", created_at=old),
+            Notification.objects.create(recipient=self.user, message="recent", read=True),
+        ]
+
+    def test_moves_expired_read_rows_in_batches(self):
+        out = StringIO()
+        call_command("archive_notifications", "--dry-run", stdout=out)
+        self.assertIn("5 notifications", out.getvalue())
+
+        self.assertEqual(retention.archive_notifications(batch_size=2), 5)
+        self.assertEqual(set(Notification.objects.values_list("id", flat=True)), {n.id for n in self.kept})
+        archived = NotificationArchive.objects.order_by("id")
+        self.assertEqual([a.message for a in archived], [f"old {i}" for i in range(5)])
+        self.assertEqual(archived[0].created_at, self.expired[0].created_at)
+        self.assertEqual(retention.archive_notifications(), 0)
+
+    def test_archives_to_compressed_jsonl(self):
+        handle, path = tempfile.mkstemp(suffix=".jsonl.gz")
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        call_command("archive_notifications", "--file", path, "--batch-size", "3", stdout=StringIO())
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual([row["id"] for row in rows], [n.id for n in self.expired])
+        self.assertEqual(rows[0]["recipient_id"], self.user.id)
+        self.assertFalse(NotificationArchive.objects.exists())
+        self.assertEqual(Notification.objects.count(), 2)
+
+
+class ThesisStatsTests(APITestCase):
+    def setUp(self):
+        self.supervisor = User.objects.create_user(username="prof", password="pass", role="supervisor")
+        self.thesis = Thesis.objects.create(title="Busy", supervisor=self.supervisor, status="open", max_students=3)
+        self.quiet = Thesis.objects.create(title="Quiet", supervisor=self.supervisor, status="open")
+        self.apps = [
+            Application.objects.create(
+                student=User.objects.create_user(username=f"s{i}", password="pass", role="student"),
+                thesis=self.thesis,
+            )
+            for i in range(4)
+        ]
+
+    def counts(self, thesis=None):
+        row = ThesisStats.objects.get(thesis=thesis or self.thesis)
+        return row.pending, row.accepted, row.rejected, row.withdrawn
+
+    def test_kept_in_step_with_status_changes(self):
+        self.assertEqual(self.counts(), (4, 0, 0, 0))
+        applications.change_status(self.apps[0], Application.Status.ACCEPTED)
+        applications.change_status(self.apps[1], Application.Status.REJECTED)
+        applications.change_status(self.apps[2], Application.Status.WITHDRAWN)
+        self.assertEqual(self.counts(), (1, 1, 1, 1))
+        self.apps[1].delete()
+        self.assertEqual(self.counts(), (1, 1, 0, 1))
+
+        ThesisStats.objects.filter(thesis=self.thesis).update(pending=40)
+        call_command("refresh_thesis_stats", stdout=StringIO())
+        self.assertEqual(self.counts(), (1, 1, 0, 1))
+        self.assertEqual(self.counts(self.quiet), (0, 0, 0, 0))
+
+    def test_bulk_allocation_is_counted(self):
+        allocation_module.commit_allocation(allocation_module.allocate(), reject_unmatched=True)
+        self.assertEqual(self.counts(), (0, 3, 1, 0))
+
+    def test_stats_api_and_dashboard(self):
+        applications.change_status(self.apps[0], Application.Status.ACCEPTED)
+        self.client.login(username="prof", password="pass")
+        response = self.client.get(reverse("api-supervisor-stats"))
+        self.assertEqual(response.json()["totals"], {"pending": 3, "accepted": 1, "rejected": 0, "withdrawn": 0})
+        self.assertEqual([row["title"] for row in response.json()["theses"]], ["Busy", "Quiet"])
+        self.assertEqual(response.json()["theses"][1]["pending"], 0)
+
+        response = self.client.get(reverse("dashboard"))
+        self.assertContains(response, "Applications per thesis")
+
+        self.client.login(username="s0", password="pass")
+        self.assertEqual(self.client.get(reverse("api-supervisor-stats")).status_code, 403)
+
+
+class BulkDecisionTests(APITestCase):
+    def setUp(self):
+        self.supervisor = User.objects.create_user(username="prof", password="pass", role="supervisor")
+        self.other = User.objects.create_user(username="other", password="pass", role="supervisor")
+        self.thesis = Thesis.objects.create(title="Big", supervisor=self.supervisor, status="open", max_students=2)
+        self.foreign = Thesis.objects.create(title="Foreign", supervisor=self.other, status="open")
+        self.students = [User.objects.create_user(username=f"s{i}", password="pass", role="student") for i in range(8)]
+        self.apps = [Application.objects.create(student=st, thesis=self.thesis) for st in self.students[:6]]
+        self.foreign_app = Application.objects.create(student=self.students[7], thesis=self.foreign)
+        self.url = reverse("api-bulk-decisions")
+        self.client.login(username="prof", password="pass")
+
+    def post(self, decisions):
+        return self.client.post(self.url, {"decisions": [{"id": i, "action": a} for i, a in decisions]}, format="json")
+
+    def test_applies_decisions_within_capacity(self):
+        a = self.apps
+        response = self.post([(a[0].id, "accept"), (a[1].id, "accept"), (a[2].id, "accept"),
+                              (a[3].id, "reject"), (self.foreign_app.id, "accept")])
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["accepted"], [a[0].id, a[1].id])
+        self.assertEqual(body["rejected"], [a[3].id])
+        self.assertEqual(body["errors"], {str(a[2].id): "Thesis has no capacity.",
+                                          str(self.foreign_app.id): "Application not found."})
+
+        self.thesis.refresh_from_db()
+        self.supervisor.refresh_from_db()
+        self.assertEqual((self.thesis.accepted_count, self.supervisor.accepted_students_count), (2, 2))
+        self.assertEqual(ThesisStats.objects.get(thesis=self.thesis).accepted, 2)
+        self.assertEqual(Notification.objects.filter(recipient__in=self.students).count(), 3)
+        self.foreign_app.refresh_from_db()
+        self.assertEqual(self.foreign_app.status, Application.Status.PENDING)
+
+        # rejecting an accepted application frees its seat for the next accept in the same batch
+        response = self.post([(a[2].id, "accept"), (a[0].id, "reject")])
+        self.assertEqual(response.json()["accepted"], [a[2].id])
+        self.thesis.refresh_from_db()
+        self.assertEqual(self.thesis.accepted_count, 2)
+
+    def test_supervisor_cap_and_constant_queries(self):
+        self.thesis.max_students = 10
+        self.thesis.save()
+        User.objects.filter(pk=self.supervisor.pk).update(accepted_students_count=MAX_STUDENTS_PER_SUPERVISOR - 1)
+        with CaptureQueriesContext(connection) as few:
+            self.post([(self.apps[0].id, "reject")])
+        with CaptureQueriesContext(connection) as many:
+            response = self.post([(app.id, "accept") for app in self.apps[1:]])
+        self.assertEqual(len(response.json()["accepted"]), 1)
+        self.assertEqual(len(response.json()["errors"]), 4)
+        self.assertLessEqual(len(many), len(few) + 2)  # counter updates only
+
+    def test_students_and_bad_payloads_are_refused(self):
+        self.assertEqual(self.post([(self.apps[0].id, "maybe")]).status_code, 400)
+        self.assertEqual(self.post([]).status_code, 400)
+        a = self.apps
+        response = self.post([(a[0].id, "accept"), (a[1].id, "reject"), (a[0].id, "reject")])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str([a[0].id]), str(response.json()["decisions"]))
+        self.assertFalse(Application.objects.exclude(status="pending").exists())
+        self.client.login(username="s0", password="pass")
+        self.assertEqual(self.post([(self.apps[0].id, "accept")]).status_code, 403)
+
+
+class ThesisImportTests(APITestCase):
+    def setUp(self):
+        self.supervisor = User.objects.create_user(username="prof", password="pass", role="supervisor")
+        self.admin = User.objects.create_user(username="admin", password="pass", role="supervisor", is_staff=True)
+        Skill.objects.create(name="Python")
+
+    def test_csv_command_creates_theses_links_and_reports_bad_rows(self):
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        self.addCleanup(os.remove, path)
+        with os.fdopen(handle, "w", newline="", encoding="utf-8") as f:
+            f.write("title,supervisor,max_students,skills,interests\n"
+                    "Compilers,prof,2,Python;C;Python,Languages\n"
+                    "Ghost,nobody,1,Python,\n"
+                    "Vision,prof,x,Python,\n"
+                    "Robots,prof,,C;ROS,Languages;Robotics\n")
+        out = StringIO()
+        call_command("import_theses", path, "--chunk-size", "2", stdout=out, stderr=StringIO())
+        self.assertIn("4 rows read, 2 theses, 7 links, 2 errors", out.getvalue())
+
+        compilers = Thesis.objects.get(title="Compilers")
+        self.assertEqual(compilers.max_students, 2)
+        self.assertEqual(sorted(compilers.required_skills.values_list("name", flat=True)), ["C", "Python"])
+        self.assertEqual(Skill.objects.filter(name="Python").count(), 1)
+        self.assertEqual(ResearchInterest.objects.count(), 2)
+        self.assertEqual(Thesis.objects.get(title="Robots").interests.count(), 2)
+
+    def test_jsonl_upload(self):
+        lines = [
+            {"title": "Graphs", "supervisor": "prof", "skills": ["Python", "Networks"], "interests": "Theory"},
+            "not json",
+            {"title": "", "supervisor": "prof"},
+        ]
+        body = "\n".join(json.dumps(line) if isinstance(line, dict) else line for line in lines).encode()
+        upload = SimpleUploadedFile("theses.jsonl", body)
+        self.client.login(username="prof", password="pass")
+        self.assertEqual(self.client.post(reverse("api-import-theses"), {"file": upload}).status_code, 403)
+
+        self.client.login(username="admin", password="pass")
+        upload.seek(0)
+        response = self.client.post(reverse("api-import-theses"), {"file": upload})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["created"], 1)
+        self.assertEqual(response.json()["links"], 3)
+        self.assertEqual([e["row"] for e in response.json()["errors"]], [2, 3])
+
+        upload = SimpleUploadedFile("theses.xml", b"<theses/>")
+        self.assertEqual(self.client.post(reverse("api-import-theses"), {"file": upload}).status_code, 400)
+
+
+class StudentImportTests(APITestCase):
+    def setUp(self):
+        self.existing = User.objects.create_user(username="alice", password="pass", role="student",
+                                                 department="Physics", email="old@example.com")
+        User.objects.create_user(username="prof", password="pass", role="supervisor")
+        self.admin = User.objects.create_user(username="admin", password="pass", role="supervisor", is_staff=True)
+        self.ai = ResearchInterest.objects.create(name="AI")
+        StudentInterest.objects.create(student=self.existing, interest=self.ai, priority=1)
+
+    def import_csv(self, content):
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        self.addCleanup(os.remove, path)
+        with os.fdopen(handle, "w", newline="", encoding="utf-8") as f:
+            f.write(content)
+        out, err = StringIO(), StringIO()
+        call_command("import_students", path, "--chunk-size", "10", stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_upserts_students_and_links_with_row_errors(self):
+        out, err = self.import_csv(
+            "username,email,department,skills,interests\n"
+            "alice,alice@example.com,CS,Python;SQL,AI:3;Databases\n"
+            "bob,,Math,Python,AI:1\n"
+            "prof,,,Python,\n"
+            "carol,not-an-email,,,\n"
+            "bob,,Math,SQL,\n"
+            "dave,,,,Robotics:9\n"
+        )
+        self.assertIn("6 rows read, 1 created, 1 updated, 6 links, 4 errors", out)
+        self.assertIn("row 3: 'prof' is not a student account", err)
+        self.assertIn("row 5: duplicate of row 2", err)
+
+        alice = User.objects.get(username="alice")
+        self.assertEqual((alice.email, alice.department), ("alice@example.com", "CS"))
+        self.assertTrue(alice.check_password("pass"))
+        self.assertEqual(StudentInterest.objects.get(student=alice, interest=self.ai).priority, 3)
+        self.assertEqual(StudentInterest.objects.get(student=alice, interest__name="Databases").priority, 2)
+        bob = User.objects.get(username="bob")
+        self.assertEqual(bob.role, User.Role.STUDENT)
+        self.assertFalse(bob.has_usable_password())
+        self.assertFalse(User.objects.filter(username__in=["carol", "dave"]).exists())
+
+    def test_long_usernames_and_colons_in_interest_names(self):
+        prefix = "x" * 150
+        out, err = self.import_csv(
+            "username,interests\n"
+            f"{prefix}a,\n"
+            f"{prefix}b,\n"
+            "erin,HCI: Design;Ethics: AI:1\n"
+        )
+        self.assertIn("3 rows read, 1 created", out)
+        self.assertIn("row 1: username is limited to 150 characters", err)
+        self.assertIn("row 2: username is limited to 150 characters", err)
+        self.assertFalse(User.objects.filter(username__startswith=prefix).exists())
+        self.assertEqual(
+            dict(StudentInterest.objects.filter(student__username="erin").values_list("interest__name", "priority")),
+            {"HCI: Design": 2, "Ethics: AI": 1},
+        )
+
+    def test_rerun_is_idempotent_and_keeps_missing_columns(self):
+        self.import_csv("username,skills\nalice,Python\n")
+        out, _ = self.import_csv("username,skills\nalice,Python\n")
+        self.assertIn("1 updated", out)
+        alice = User.objects.get(username="alice")
+        self.assertEqual(alice.department, "Physics")
+        self.assertEqual(StudentSkill.objects.filter(student=alice).count(), 1)
+
+    def test_jsonl_upload(self):
+        body = json.dumps({"username": "erin", "skills": ["Go"], "interests": {"AI": 2}}).encode()
+        self.client.login(username="admin", password="pass")
+        response = self.client.post(reverse("api-import-students"),
+                                    {"file": SimpleUploadedFile("students.jsonl", body)})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.json()["created"], response.json()["links"]), (1, 2))
+
+    def test_duplicate_skill_in_form_is_reported(self):
+        python = Skill.objects.create(name="Python")
+        StudentSkill.objects.create(student=self.existing, skill=python)
+        self.client.login(username="alice", password="pass")
+        response = self.client.post(reverse("my-skills"), {"skill": python.pk}, follow=True)
+        self.assertContains(response, "Skill already added.")
+
+
+class ApplicationExportTests(APITestCase):
+    def setUp(self):
+        self.prof = User.objects.create_user(username="prof", password="pass", role="supervisor")
+        self.other = User.objects.create_user(username="other", password="pass", role="supervisor")
+        self.admin = User.objects.create_user(username="admin", password="pass", role="supervisor", is_staff=True)
+        cs = Thesis.objects.create(title="Compilers, v2", supervisor=self.prof, department="CS", max_students=5)
+        bio = Thesis.objects.create(title="Cells", supervisor=self.other, department="Bio", max_students=5)
+        for i in range(6):
+            student = User.objects.create_user(username=f"s{i}", password="pass", role="student")
+            Application.objects.create(student=student, thesis=cs if i % 2 else bio,
+                                       status="accepted" if i < 2 else "pending")
+
+    def test_command_writes_csv(self):
+        out = StringIO()
+        call_command("export_applications", "--status", "accepted", stdout=out)
+        rows = list(csv.DictReader(StringIO(out.getvalue())))
+        self.assertEqual([row["student"] for row in rows], ["s0", "s1"])
+        self.assertEqual(rows[1]["thesis"], "Compilers, v2")
+        self.assertEqual(rows[1]["supervisor"], "prof")
+
+    def test_api_streams_filtered_jsonl_in_one_query(self):
+        self.client.login(username="admin", password="pass")
+        response = self.client.get(reverse("api-application-export", args=["jsonl"]), {"department": "CS"})
+        self.assertTrue(response.streaming)
+        with self.assertNumQueries(1):
+            rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row["student"] for row in rows], ["s1", "s3", "s5"])
+        self.assertEqual(set(rows[0]), set(exporters.COLUMNS))
+
+    def test_supervisors_only_see_their_theses(self):
+        self.client.login(username="prof", password="pass")
+        response = self.client.get(reverse("api-application-export", args=["csv"]), {"supervisor": "other"})
+        rows = list(csv.DictReader(StringIO(b"".join(response.streaming_content).decode())))
+        self.assertEqual({row["supervisor"] for row in rows}, {"prof"})
+        self.assertEqual(len(rows), 3)
+
+        self.client.login(username="s0", password="pass")
+        self.assertEqual(self.client.get(reverse("api-application-export", args=["csv"])).status_code, 403)
+
+
+class LeanSerializerTests(APITestCase):
+    """
+    The lean projections must produce exactly what the DRF serializers do.
+    """
+
+    def setUp(self):
+        self.prof = User.objects.create_user(username="prof", password="pass", role="supervisor",
+                                             email="prof@uni.test", department="CS")
+        theses = [
+            Thesis.objects.create(title="Compilers", supervisor=self.prof, department="CS",
+                                  keywords="llvm", max_students=2),
+            Thesis.objects.create(title="Empty", supervisor=self.prof, description="", status="closed"),
+        ]
+        for i in range(5):
+            student = User.objects.create_user(username=f"s{i}", password="pass", role="student")
+            Application.objects.create(student=student, thesis=theses[i % 2], motivation_letter=f"letter {i}",
+                                       status="accepted" if i == 0 else "pending")
+
+    def test_projections_match_serializers(self):
+        theses = Thesis.objects.list_ready().order_by("id")
+        self.assertEqual(lean.THESIS.many(lean.THESIS.rows(theses)), ThesisSerializer(theses, many=True).data)
+        apps = Application.objects.list_ready().order_by("id")
+        self.assertEqual(
+            lean.APPLICATION.many(lean.APPLICATION.rows(apps)), ApplicationSerializer(apps, many=True).data
+        )
+
+    def test_api_lists_match_serializer_fallback(self):
+        self.client.login(username="prof", password="pass")
+        for name in ("api-thesis-list", "api-application-list", "api-my-thesis-applications"):
+            with self.subTest(name):
+                url = reverse(name) + "?page_size=2"
+                fast = self.client.get(url).json()
+                with override_settings(LEAN_LIST_SERIALIZERS=False):
+                    slow = self.client.get(url).json()
+                self.assertEqual(fast, slow)
+                # cursors built from dict rows walk the same pages
+                if fast.get("next"):
+                    self.assertEqual(self.client.get(fast["next"]).json(), self.client.get(slow["next"]).json())
+
+
+class CatalogCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.prof = User.objects.create_user(username="prof", password="pass", role="supervisor")
+        self.student = User.objects.create_user(username="stud", password="pass", role="student")
+        self.thesis = Thesis.objects.create(title="Compilers", supervisor=self.prof, max_students=1)
+        Thesis.objects.create(title="Closed", supervisor=self.prof, status="closed")
+        self.client.login(username="stud", password="pass")
+
+    def catalog_queries(self, url, **headers):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, headers=headers)
+        return response, [q["sql"] for q in ctx.captured_queries if "core_thesis" in q["sql"]]
+
+    def test_repeat_api_views_skip_the_database_and_revalidate(self):
+        url = reverse("api-student-thesis-list")
+        first, queries = self.catalog_queries(url)
+        self.assertTrue(queries)
+        second, queries = self.catalog_queries(url)
+        self.assertEqual(queries, [])
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second["ETag"], first["ETag"])
+
+        response, queries = self.catalog_queries(url, if_none_match=first["ETag"])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(queries, [])
+
+        self.thesis.title = "Compilers II"
+        self.thesis.save()
+        response, _ = self.catalog_queries(url, if_none_match=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], first["ETag"])
+        self.assertEqual([row["title"] for row in response.json()["results"]], ["Compilers II"])
+
+    def test_supervisors_are_not_served_from_the_catalog(self):
+        self.client.login(username="prof", password="pass")
+        response = self.client.get(reverse("api-thesis-list"))
+        self.assertNotIn("ETag", response)
+        self.assertEqual(len(response.json()["results"]), 2)
+
+    def test_theses_page_is_cached_until_acceptance_fills_the_supervisor(self):
+        self.assertContains(self.client.get(reverse("theses")), "Compilers")
+        _, queries = self.catalog_queries(reverse("theses"))
+        self.assertEqual(queries, [])
+
+        before = catalog.version()
+        self.prof.accepted_students_count = MAX_STUDENTS_PER_SUPERVISOR - 1
+        self.prof.save()
+        app = Application.objects.create(student=self.student, thesis=self.thesis)
+        applications.change_status(app, Application.Status.ACCEPTED)
+        self.assertGreater(catalog.version(), before)
+        self.assertNotContains(self.client.get(reverse("theses")), "Compilers")
+
+    def test_supervisor_edits_bump_the_catalog(self):
+        before = catalog.version()
+        self.prof.first_name = "Ada"
+        self.prof.save()
+        self.assertGreater(catalog.version(), before)
+
+        # a student saving their profile does not
+        before = catalog.version()
+        self.student.first_name = "Bob"
+        self.student.save()
+        self.assertEqual(catalog.version(), before)
+
+
+class ThesisSearchTests(APITestCase):
+    def setUp(self):
+        search.invalidate()
+        self.addCleanup(search.invalidate)
+        self.prof = User.objects.create_user(username="prof", password="pass", role="supervisor")
+        User.objects.create_user(username="stud", password="pass", role="student")
+        self.graphs = Thesis.objects.create(title="Graph neural networks", supervisor=self.prof,
+                                            keywords="deep learning, graphs", department="CS")
+        self.vision = Thesis.objects.create(title="Medical imaging", supervisor=self.prof,
+                                            description="Deep learning for tumour segmentation of graphs")
+        Thesis.objects.create(title="Closed graph theory", supervisor=self.prof, status="closed")
+        self.client.login(username="stud", password="pass")
+
+    def titles(self, q, **params):
+        response = self.client.get(reverse("api-thesis-search"), {"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row["title"] for row in response.json()["results"]]
+
+    def test_ranks_title_and_keyword_hits_first(self):
+        self.assertEqual(self.titles("graphs"), ["Graph neural networks", "Medical imaging"])
+        self.assertEqual(self.titles("deep learning tumour"), ["Medical imaging"])
+        self.assertEqual(self.titles("graphs", department="CS"), ["Graph neural networks"])
+        self.assertEqual(self.titles("quantum"), [])
+
+    def test_students_only_find_open_theses(self):
+        self.assertNotIn("Closed graph theory", self.titles("graph"))
+        self.client.login(username="prof", password="pass")
+        self.assertIn("Closed graph theory", self.titles("graph"))
+
+    def test_index_follows_saves_and_deletes(self):
+        self.assertEqual(self.titles("segmentation"), ["Medical imaging"])
+        self.vision.description = "Registration of MRI scans"
+        self.vision.save()
+        self.assertEqual(self.titles("segmentation"), [])
+        self.assertEqual(self.titles("mri"), ["Medical imaging"])
+        self.vision.delete()
+        self.assertEqual(self.titles("mri"), [])
+
+    def test_requires_a_query(self):
+        self.assertEqual(self.client.get(reverse("api-thesis-search")).status_code, 400)
+
+    def test_postgres_expression_is_table_qualified(self):
+        # bare column names would turn ambiguous once the queryset joins a table with the same columns
+        table = connection.ops.quote_name(Thesis._meta.db_table)
+        for column in ("title", "keywords", "description"):
+            self.assertIn(f"coalesce({table}.{column}, '')", search.vector_sql())
+
+
+class ThesisKeywordTests(MatchFixtureMixin, APITestCase):
+    def tokens(self, thesis):
+        return sorted(ThesisKeyword.objects.filter(thesis=thesis).values_list("token", flat=True))
+
+    def test_tokens_are_normalized(self):
+        self.assertEqual(keywords.tokens(" Deep  Learning, graphs;GRAPHS ,"), ["deep learning", "graphs"])
+        self.assertEqual(keywords.tokens(""), [])
+
+    def test_save_keeps_tokens_in_step(self):
+        self.ml_thesis.keywords = "Vision, Robotics"
+        self.ml_thesis.save()
+        self.assertEqual(self.tokens(self.ml_thesis), ["robotics", "vision"])
+        self.ml_thesis.keywords = "robotics; planning"
+        self.ml_thesis.save()
+        self.assertEqual(self.tokens(self.ml_thesis), ["planning", "robotics"])
+
+    def test_backfill_rebuilds_rows_written_around_the_orm(self):
+        Thesis.objects.update(keywords="Databases, SQL")
+        self.assertEqual(self.tokens(self.db_thesis), [])
+        out = StringIO()
+        call_command("backfill_thesis_keywords", "--chunk-size", "2", stdout=out)
+        self.assertEqual(self.tokens(self.db_thesis), ["databases", "sql"])
+        self.assertEqual(ThesisKeyword.objects.count(), 6)
+        self.assertIn("Wrote 6 keyword tokens", out.getvalue())
+
+    def test_keyword_filter(self):
+        self.db_thesis.keywords = "Query Optimization, SQL"
+        self.db_thesis.save()
+        self.client.login(username="prof", password="pass")
+        response = self.client.get(reverse("api-thesis-list"), {"keyword": "query  optimization"})
+        self.assertEqual([row["id"] for row in response.json()["results"]], [self.db_thesis.id])
+
+    def test_keywords_naming_an_interest_count_in_both_scoring_paths(self):
+        engine = matching.MatchEngine.build()
+        before = engine.pair_score(engine.student_vector(self.student.id), self.db_thesis.id)
+        self.db_thesis.keywords = "artificial intelligence, storage"
+        self.db_thesis.save()
+        # already linked through ThesisInterest: no double counting
+        self.ml_thesis.keywords = "Artificial Intelligence"
+        self.ml_thesis.save()
+
+        engine = matching.MatchEngine.build()
+        matches = engine.top_matches(self.student.id, min_shared=1)
+        by_thesis = {m.thesis_id: m for m in matches}
+        self.assertEqual(by_thesis[self.db_thesis.id].shared_interests, before.shared_interests + 1)
+        self.assertEqual(by_thesis[self.db_thesis.id].score, before.score + 3)
+        self.assertEqual(by_thesis[self.ml_thesis.id].shared_interests, 1)
+        self.assertEqual(dict(bulk_matching.compute_top_matches(min_shared=1))[self.student.id], matches)
+
+
+class SimilarityGraphTests(TestCase):
+    def setUp(self):
+        self.prof = User.objects.create_user(username="prof", password="pass", role="supervisor")
+        self.student = User.objects.create_user(username="stud", password="pass", role="student")
+        self.pytorch, self.deep, self.sql = (Skill.objects.create(name=n) for n in ("PyTorch", "Deep Learning", "SQL"))
+        self.thesis = Thesis.objects.create(title="Vision", supervisor=self.prof)
+        ThesisSkill.objects.create(thesis=self.thesis, skill=self.deep)
+        StudentSkill.objects.create(student=self.student, skill=self.pytorch)
+        # three other students list PyTorch with Deep Learning, one lists SQL with it
+        for i in range(4):
+            other = User.objects.create_user(username=f"o{i}", password="pass", role="student")
+            StudentSkill.objects.create(student=other, skill=self.deep)
+            StudentSkill.objects.create(student=other, skill=self.pytorch if i < 3 else self.sql)
+
+    def test_neighbors_keep_strong_pairs_only(self):
+        pairs = [(1, "a"), (1, "b"), (2, "a"), (2, "b"), (3, "a"), (3, "c"), (4, "c")]
+        neighbors = similarity.neighbors_from_pairs(pairs, min_support=2)
+        self.assertEqual({item: [n for n, _ in edges] for item, edges in neighbors.items()}, {"a": ["b"], "b": ["a"]})
+        self.assertAlmostEqual(neighbors["a"][0][1], 2 / 6 ** 0.5, places=5)
+        self.assertEqual(similarity.neighbors_from_pairs(pairs, min_support=1, min_similarity=0.9), {})
+
+    def test_build_writes_neighbor_edges(self):
+        call_command("build_similarity", stdout=StringIO())
+        edges = set(SkillNeighbor.objects.values_list("skill_id", "neighbor_id"))
+        self.assertIn((self.pytorch.id, self.deep.id), edges)
+        self.assertIn((self.deep.id, self.pytorch.id), edges)
+        self.assertNotIn((self.sql.id, self.deep.id), edges)
+
+    @override_settings(MATCH_MIN_SHARED=1)
+    def test_build_rescores_with_near_misses(self):
+        call_command("build_similarity", stdout=StringIO())
+        row = MatchScore.objects.get(student=self.student)
+        self.assertEqual((row.thesis_id, row.shared_skills, row.near_misses), (self.thesis.id, 0, 1))
+
+    def test_near_misses_are_matched_by_both_paths(self):
+        self.assertEqual(matching.MatchEngine.build().top_matches(self.student.id, min_shared=1), [])
+        similarity.build()
+        matches = matching.MatchEngine.build().top_matches(self.student.id, min_shared=1)
+        self.assertEqual(matches, [matching.Match(self.thesis.id, matching.NEAR_MISS_WEIGHT, 0, 0, 1)])
+        self.assertEqual(
+            dict(bulk_matching.compute_top_matches(student_ids=[self.student.id], min_shared=1))[self.student.id],
+            matches,
+        )
+
+    def test_listed_skills_are_not_near_misses(self):
+        StudentSkill.objects.create(student=self.student, skill=self.deep)
+        similarity.build()
+        matches = matching.MatchEngine.build().top_matches(self.student.id, min_shared=1)
+        self.assertEqual(matches, [matching.Match(self.thesis.id, matching.SKILL_WEIGHT, 1, 0, 0)])
+        self.assertEqual(dict(bulk_matching.compute_top_matches(min_shared=1))[self.student.id], matches)
+
+
+@override_settings(MATCH_REFRESH_ASYNC=False, MATCH_MIN_SHARED=1)
+class IncrementalMatchTests(MatchFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = User.objects.create_user(username="stud2", password="pass", role="student")
+        StudentSkill.objects.create(student=self.other, skill=self.sql)
+        bulk_matching.persist_match_scores()
+
+    def rows(self):
+        return list(MatchScore.objects.order_by("student_id", "rank").values_list("student_id", "thesis_id", "score"))
+
+    def assertFresh(self):
+        # incremental rows must equal a full recompute
+        current = self.rows()
+        bulk_matching.persist_match_scores()
+        self.assertEqual(current, self.rows())
+
+    def test_student_edits_recompute_that_student(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            StudentSkill.objects.create(student=self.other, skill=self.python)
+            StudentInterest.objects.create(student=self.other, interest=self.db, priority=3)
+        theses = MatchScore.objects.filter(student=self.other).values_list("thesis_id", flat=True)
+        self.assertIn(self.ml_thesis.id, theses)
+        self.assertFresh()
+
+    def test_thesis_edits_only_recompute_affected_students(self):
+        closed = Thesis.objects.get(title="Closed")
+        with mock.patch.object(incremental, "persist_match_scores", wraps=incremental.persist_match_scores) as persist:
+            with self.captureOnCommitCallbacks(execute=True):
+                closed.status = Thesis.Status.OPEN
+                closed.save()
+        # python + ml only overlap with the first student
+        persist.assert_called_once_with(student_ids=[self.student.id])
+        self.assertIn(closed.id, MatchScore.objects.filter(student=self.student).values_list("thesis_id", flat=True))
+        self.assertFresh()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.db_thesis.required_skills.remove(self.sql)
+            self.ml_thesis.delete()
+        self.assertFalse(MatchScore.objects.filter(student=self.other).exists())
+        self.assertFresh()
+
+    def test_only_matched_thesis_fields_mark_it_dirty(self):
+        with mock.patch.object(incremental, "mark") as mark:
+            self.ml_thesis.title = "Machine learning, typo fixed"
+            self.ml_thesis.save()
+            mark.assert_not_called()
+            self.ml_thesis.keywords = "databases"
+            self.ml_thesis.save()
+        mark.assert_called_once_with(thesis_ids=[self.ml_thesis.id])
+
+    def test_thesis_is_only_scored_against_overlapping_students(self):
+        closed = Thesis.objects.get(title="Closed")
+        Thesis.objects.filter(pk=closed.pk).update(status=Thesis.Status.OPEN)
+        MatchScore.objects.filter(student=self.student).delete()
+        with mock.patch.object(incremental, "compute_top_matches", wraps=incremental.compute_top_matches) as compute:
+            self.assertEqual(incremental.affected_students([closed.id]), {self.student.id})
+        # python + ml: the SQL-only student is never scored
+        self.assertEqual(compute.call_args.kwargs["student_ids"], [self.student.id])
+
+    def test_queue_coalesces_marks(self):
+        queue = incremental.DirtyQueue()
+        with mock.patch.object(incremental, "refresh", return_value=1) as refresh:
+            queue._students.update([self.student.id, self.student.id])
+            queue._theses.add(self.ml_thesis.id)
+            self.assertEqual(queue.pending(), (1, 1))
+            queue.flush()
+            queue.flush()
+        refresh.assert_called_once_with({self.student.id}, {self.ml_thesis.id})
+        self.assertEqual(queue.pending(), (0, 0))
+
+    def test_queue_drops_marks_that_keep_failing(self):
+        queue = incremental.DirtyQueue(interval=3600, max_retries=2)
+
+        def refresh(students, theses):
+            if self.other.id in students:
+                raise ValueError("bad row")
+            return len(students)
+
+        with mock.patch.object(incremental, "refresh", side_effect=refresh):
+            queue._students.update([self.student.id, self.other.id])
+            with self.assertLogs("core.incremental", "ERROR"):
+                self.assertEqual(queue.flush(), 1)
+            self.assertEqual(queue.pending(), (1, 0))
+            with self.assertLogs("core.incremental", "ERROR") as logs:
+                self.assertEqual(queue.flush(), 0)
+        self.assertIn(f"dropping student {self.other.id}", logs.output[-1])
+        self.assertEqual(queue.pending(), (0, 0))
+
+    def test_sync_refresh_errors_do_not_reach_the_request(self):
+        with mock.patch.object(incremental, "refresh", side_effect=ValueError("bad row")):
+            with mock.patch.object(incremental.queue, "put") as put, self.assertLogs("core.incremental", "ERROR"):
+                with self.captureOnCommitCallbacks(execute=True):
+                    StudentSkill.objects.create(student=self.other, skill=self.python)
+        put.assert_called_once_with({self.other.id}, set())
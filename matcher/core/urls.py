@@ -41,5 +41,6 @@ urlpatterns = [
     # notifications
     path("notifications/", views.web_notifications, name="web-notifications"),
     path("notifications/<int:pk>/delete/", views.delete_notification, name="delete-notification"),
+    path("notifications/mark-read/", views.mark_notifications_read, name="mark-notifications-read"),
 
 ]
@@ -1,13 +1,27 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import IntegrityError, transaction
+from django.http import JsonResponse, StreamingHttpResponse
 from rest_framework import generics, permissions
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from .permissions import (
+    IsSupervisor,
     IsSelfOrReadOnly,
     ThesisPermission,
     ApplicationPermission,
     StudentDataPermission,
     ThesisDataPermission,
 )
-from .models import User, Thesis, Application, StudentSkill, StudentInterest, ThesisSkill, ThesisInterest, Notification
+from .models import User, Thesis, Application, StudentSkill, StudentInterest, ThesisSkill, ThesisInterest, Notification, \
+    MatchScore
+from .catalog import CatalogCacheMixin
+from .lean import LeanListMixin, THESIS, APPLICATION
+from .pagination import ApplicationPagination, NotificationPagination, MatchScorePagination
 from .serializers import (
     UserSerializer,
     ThesisSerializer,
@@ -17,6 +31,8 @@ from .serializers import (
     ThesisSkillSerializer,
     ThesisInterestSerializer,
     NotificationSerializer,
+    MatchScoreSerializer,
+    BulkDecisionSerializer,
 )
 
 from django_filters.rest_framework import DjangoFilterBackend
@@ -34,7 +50,9 @@ from rest_framework.permissions import BasePermission, SAFE_METHODS
 from django.contrib import messages
 from django.urls import reverse
 
-from django.db.models import Count, Q, OuterRef, Subquery
+from . import matching, applications, profiling, pubsub, stats, importers, exporters, catalog, search, keywords
+from . import notifications
+from .notifications import notify
 
 #too much to keep track..........
 class IsCoordinatorOrReadOnly(BasePermission):
@@ -65,15 +83,19 @@ class ApplicationPermission(BasePermission):
         return False
 
 #List all theses
-class ThesisListView(generics.ListCreateAPIView):
-    queryset = Thesis.objects.all()
+class ThesisListView(CatalogCacheMixin, LeanListMixin, generics.ListCreateAPIView):
+    queryset = Thesis.objects.list_ready()
     serializer_class = ThesisSerializer
+    lean_projection = THESIS
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["department", "status", "supervisor__id"]
     permission_classes = [IsAuthenticated, ThesisPermission]
 
     def get_queryset(self):
         qs = super().get_queryset()
+        # ?keyword= matches one Thesis.keywords entry through the ThesisKeyword token index
+        if keyword := self.request.query_params.get("keyword"):
+            qs = qs.filter(keyword_tokens__token=keywords.normalize(keyword))
         if self.request.user.role == "student":
             return qs.filter(status="Open")
         if self.request.user.role == "supervisor":
@@ -82,17 +104,19 @@ class ThesisListView(generics.ListCreateAPIView):
 
 #Retrieve single thesis
 class ThesisDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Thesis.objects.all()
+    queryset = Thesis.objects.list_ready()
     serializer_class = ThesisSerializer
     permission_classes = [IsAuthenticated, ThesisPermission]
 
-class ApplicationListView(generics.ListCreateAPIView):
-    queryset = Application.objects.all()
+class ApplicationListView(LeanListMixin, generics.ListCreateAPIView):
+    queryset = Application.objects.list_ready()
     serializer_class = ApplicationSerializer
+    lean_projection = APPLICATION
+    pagination_class = ApplicationPagination
     permission_classes = [IsAuthenticated, ApplicationPermission]
 
 class ApplicationDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Application.objects.all()
+    queryset = Application.objects.list_ready()
     serializer_class = ApplicationSerializer
     permission_classes = [IsAuthenticated, ApplicationPermission]
 
@@ -102,13 +126,13 @@ class UserListView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated, IsSelfOrReadOnly]
 
 class StudentSkillView(generics.ListCreateAPIView):
-    queryset = StudentSkill.objects.all()
+    queryset = StudentSkill.objects.select_related("skill")
     serializer_class = StudentSkillSerializer
     permission_classes = [IsAuthenticated, StudentDataPermission]
 
 
 class StudentInterestView(generics.ListCreateAPIView):
-    queryset = StudentInterest.objects.all()
+    queryset = StudentInterest.objects.select_related("interest")
     serializer_class = StudentInterestSerializer
     permission_classes = [IsAuthenticated, StudentDataPermission]
 
@@ -165,26 +189,30 @@ def logout_view(request):
 
 class NotificationListView(generics.ListAPIView):
     serializer_class = NotificationSerializer
+    pagination_class = NotificationPagination
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Notification.objects.filter(recipient=self.request.user).order_by("-created_at")
+        return Notification.objects.filter(recipient=self.request.user)
 
 # Students: list only *open* theses
-class StudentThesisListView(generics.ListAPIView):
+class StudentThesisListView(CatalogCacheMixin, LeanListMixin, generics.ListAPIView):
     serializer_class = ThesisSerializer
+    lean_projection = THESIS
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Thesis.objects.filter(status=Thesis.Status.OPEN)
+        return Thesis.objects.list_ready().filter(status=Thesis.Status.OPEN)
 
 # Students: see their own applications
-class MyApplicationsView(generics.ListAPIView):
+class MyApplicationsView(LeanListMixin, generics.ListAPIView):
     serializer_class = ApplicationSerializer
+    lean_projection = APPLICATION
+    pagination_class = ApplicationPagination
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Application.objects.filter(student=self.request.user)
+        return Application.objects.list_ready().filter(student=self.request.user)
 
 # Students: create an application for a thesis
 class ApplyToThesisView(generics.CreateAPIView):
@@ -197,30 +225,34 @@ class ApplyToThesisView(generics.CreateAPIView):
 # Students: see their notifications
 class MyNotificationsView(generics.ListAPIView):
     serializer_class = NotificationSerializer
+    pagination_class = NotificationPagination
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Notification.objects.filter(recipient=self.request.user).order_by("-created_at")
+        return Notification.objects.filter(recipient=self.request.user)
 
 # Supervisors: manage their own theses
-class MyThesisListCreateView(generics.ListCreateAPIView):
+class MyThesisListCreateView(LeanListMixin, generics.ListCreateAPIView):
     serializer_class = ThesisSerializer
+    lean_projection = THESIS
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Thesis.objects.filter(supervisor=self.request.user)
+        return Thesis.objects.list_ready().filter(supervisor=self.request.user)
 
     def perform_create(self, serializer):
         serializer.save(supervisor=self.request.user)
 
 
 # Supervisors: see all applications for THEIR theses
-class MyThesisApplicationsView(generics.ListAPIView):
+class MyThesisApplicationsView(LeanListMixin, generics.ListAPIView):
     serializer_class = ApplicationSerializer
+    lean_projection = APPLICATION
+    pagination_class = ApplicationPagination
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Application.objects.filter(thesis__supervisor=self.request.user)
+        return Application.objects.list_ready().filter(thesis__supervisor=self.request.user)
 
 
 # Supervisors: update (accept/reject) applications
@@ -230,22 +262,211 @@ class UpdateApplicationStatusView(generics.RetrieveUpdateAPIView):
 
     def get_queryset(self):
         # Supervisors can only modify applications for their theses
-        return Application.objects.filter(thesis__supervisor=self.request.user)
+        return Application.objects.list_ready().filter(thesis__supervisor=self.request.user)
 
     def perform_update(self, serializer):
         application = serializer.save()
         # Create notification for student
-        Notification.objects.create(
-            recipient=application.student,
-            message=f"Your application for '{application.thesis.title}' was {application.status}."
+        notify(application.student, f"Your application for '{application.thesis.title}' was {application.status}.")
+
+# Precomputed matches (see compute_matches): students see their own ranking,
+# supervisors the rows for their theses, staff everything
+class MatchScoreListView(generics.ListAPIView):
+    serializer_class = MatchScoreSerializer
+    pagination_class = MatchScorePagination
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ["student__id", "thesis__id"]
+
+    def get_queryset(self):
+        qs = MatchScore.objects.all()
+        user = self.request.user
+        if user.is_staff:
+            return qs
+        if user.role == "supervisor":
+            return qs.filter(thesis__supervisor=user)
+        return qs.filter(student=user)
+
+# Admin: rolling per-view latency / query summary from QueryProfilingMiddleware
+class ProfilingSummaryView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(profiling.summary.snapshot())
+
+    def delete(self, request):
+        profiling.summary.reset()
+        return Response(status=204)
+
+# Supervisors: accept/reject many applications in one request
+class BulkDecisionView(APIView):
+    permission_classes = [IsSupervisor]
+
+    def post(self, request):
+        serializer = BulkDecisionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        decisions = {d["id"]: d["action"] for d in serializer.validated_data["decisions"]}
+        return Response(applications.decide_many(request.user, decisions))
+
+def upload_records(request):
+    """
+    (row number, dict) records from the multipart "file" upload, read line by line.
+    """
+    upload = request.FILES.get("file")
+    if upload is None:
+        raise importers.ImportFormatError("Upload the data as a 'file' field.")
+    fmt = importers.detect_format(upload.name, request.query_params.get("format"))
+    return importers.read_records((line.decode("utf-8-sig") for line in upload), fmt)
+
+# Staff: bulk-load theses with their skills and interests
+class ThesisImportView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        try:
+            records = upload_records(request)
+        except importers.ImportFormatError as e:
+            return Response({"detail": str(e)}, status=400)
+        result = importers.import_theses(records)
+        return Response(result.as_dict(), status=201 if result.created else 200)
+
+# Staff: onboard students from a registrar export
+class StudentImportView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        try:
+            records = upload_records(request)
+        except importers.ImportFormatError as e:
+            return Response({"detail": str(e)}, status=400)
+        result = importers.import_students(records)
+        return Response(result.as_dict(), status=201 if result.created else 200)
+
+# Staff export everything, supervisors the applications to their own theses
+class ApplicationExportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, fmt):
+        user = request.user
+        if fmt not in exporters.FORMATS:
+            return Response({"detail": "Export as .csv or .jsonl."}, status=404)
+        if not user.is_staff and user.role != "supervisor":
+            return Response({"detail": "Only supervisors and staff can export applications."}, status=403)
+        status = request.query_params.get("status")
+        if status and status not in Application.Status.values:
+            return Response({"detail": f"Unknown status {status!r}."}, status=400)
+        rows = exporters.applications(
+            status=status,
+            department=request.query_params.get("department"),
+            supervisor=request.query_params.get("supervisor") if user.is_staff else user.username,
         )
+        response = StreamingHttpResponse(exporters.lines(rows, fmt), content_type=exporters.FORMATS[fmt])
+        response["Content-Disposition"] = f'attachment; filename="applications.{fmt}"'
+        return response
+
+SEARCH_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+class ThesisSearchView(APIView):
+    """
+    Ranked search over title, keywords and description (?q=, optional department, limit).
+    Students only find open theses.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return Response({"detail": "Pass a search query as ?q=."}, status=400)
+        try:
+            limit = min(max(int(request.query_params.get("limit", SEARCH_LIMIT)), 1), SEARCH_MAX_LIMIT)
+        except ValueError:
+            return Response({"detail": "limit must be a whole number."}, status=400)
+        theses = Thesis.objects.list_ready()
+        if request.user.role == "student":
+            theses = theses.filter(status=Thesis.Status.OPEN)
+        if department := request.query_params.get("department"):
+            theses = theses.filter(department=department)
+        results = search.search(theses, query, limit)
+        data = ThesisSerializer(results, many=True).data
+        for row, thesis in zip(data, results):
+            row["rank"] = round(thesis.search_rank, 4)
+        return Response({"query": query, "results": data})
+
+class SupervisorStatsView(APIView):
+    permission_classes = [IsSupervisor]
+
+    def get(self, request):
+        rows, totals = stats.for_supervisor(request.user)
+        return Response({"theses": rows, "totals": totals})
+
+class NotificationUnreadView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response({"unread": notifications.unread_count(request.user)})
+
+class NotificationMarkAllReadView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        return Response({"updated": notifications.mark_all_read(request.user)})
+
+STREAM_REPLAY_LIMIT = 500
+
+def _sse(event):
+    return f"id: {event['id']}\ndata: {json.dumps(event)}\n\n"
+
+async def notification_stream(request):
+    """
+    Server-sent events: the signed-in user's notifications, pushed as they are written.
+    A reconnecting client sends Last-Event-ID and first gets what it missed from the database.
+    """
+    if not isinstance(request, ASGIRequest):
+        # a WSGI worker would be tied up for the whole connection
+        return JsonResponse({"detail": "Streaming is only served through matcher.asgi."}, status=501)
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+    try:
+        last_id = int(request.headers.get("Last-Event-ID") or request.GET.get("last_event_id") or 0)
+    except ValueError:
+        last_id = 0
+    heartbeat = getattr(settings, "NOTIFICATION_STREAM_HEARTBEAT", 15)
+    broker = pubsub.get_broker()
+
+    async def events():
+        nonlocal last_id
+        # subscribe before the replay so rows written meanwhile are not lost
+        with broker.subscribe(user.pk) as subscription:
+            yield "retry: 3000\n\n"
+            if last_id:
+                missed = await sync_to_async(list)(
+                    Notification.objects.filter(recipient=user, id__gt=last_id).order_by("id")[:STREAM_REPLAY_LIMIT]
+                )
+                for notification in missed:
+                    last_id = notification.id
+                    yield _sse(notifications.event(notification))
+            while not subscription.overflowed:
+                event = await subscription.get(timeout=heartbeat)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                elif event["id"] > last_id:
+                    last_id = event["id"]
+                    yield _sse(event)
+        # the client fell behind: ending the stream makes it reconnect and replay from last_id
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
 
 class MySkillsView(generics.ListCreateAPIView):
     serializer_class = StudentSkillSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return StudentSkill.objects.filter(student=self.request.user)
+        return StudentSkill.objects.select_related("skill").filter(student=self.request.user)
 
 
 class MyInterestsView(generics.ListCreateAPIView):
@@ -253,35 +474,27 @@ class MyInterestsView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return StudentInterest.objects.filter(student=self.request.user)
+        return StudentInterest.objects.select_related("interest").filter(student=self.request.user)
 
 # STUDENT & SUPERVISOR DASHBOARD
 @login_required
 def dashboard(request):
     role = request.user.role
-    return render(request, "dashboard.html", {"role": role})
+    context = {"role": role}
+    if role == "supervisor":
+        # precomputed ThesisStats rows, one per thesis
+        context["thesis_stats"], context["stats_totals"] = stats.for_supervisor(request.user)
+    return render(request, "dashboard.html", context)
 
 # THESIS LIST (human-readable)
 @login_required
 def theses_list(request):
     if request.user.role == "student":
-        # Annotate supervisors with total accepted applications
-        supervisors_with_counts = (
-            Application.objects
-            .filter(thesis__supervisor=OuterRef("supervisor"), status=Application.Status.ACCEPTED)
-            .values("thesis__supervisor")
-            .annotate(total=Count("id"))
-            .values("total")
-        )
-
-        theses = (
-            Thesis.objects.filter(status=Thesis.Status.OPEN)
-            .annotate(supervisor_accepted_count=Subquery(supervisors_with_counts[:1]))
-            .filter(Q(supervisor_accepted_count__lt=7) | Q(supervisor_accepted_count__isnull=True))
-        )
+        # Skip supervisors who already reached the cap; cached until a thesis or counter changes
+        theses = catalog.open_theses()
 
     elif request.user.role == "supervisor":
-        theses = Thesis.objects.all()
+        theses = Thesis.objects.list_ready()
 
     return render(request, "theses.html", {"theses": theses})
 
@@ -289,7 +502,7 @@ def theses_list(request):
 # THESIS DETAIL + APPLY (student can apply from here)
 @login_required
 def thesis_detail(request, pk):
-    thesis = get_object_or_404(Thesis, pk=pk)
+    thesis = get_object_or_404(Thesis.objects.list_ready(), pk=pk)
     can_apply = request.user.role == "student" and thesis.status == Thesis.Status.OPEN
     # check if student already applied
     already_applied = Application.objects.filter(student=request.user, thesis=thesis).exists() if request.user.role == "student" else False
@@ -303,7 +516,7 @@ def thesis_detail(request, pk):
             app.status = Application.Status.PENDING
             app.save()
             # notify supervisor
-            Notification.objects.create(recipient=thesis.supervisor, message=f"{request.user.username} applied to your thesis '{thesis.title}'.")
+            notify(thesis.supervisor, f"{request.user.username} applied to your thesis '{thesis.title}'.")
             messages.success(request, "Application submitted.")
             return redirect("thesis-detail", pk=thesis.pk)
     else:
@@ -321,7 +534,7 @@ def thesis_detail(request, pk):
 def my_applications(request):
     if request.user.role != "student":
         return redirect("dashboard")
-    apps = Application.objects.filter(student=request.user).order_by("-application_date")
+    apps = Application.objects.list_ready().filter(student=request.user).order_by("-application_date")
     return render(request, "my_applications.html", {"applications": apps})
 
 # SUPERVISOR: Applications to my theses
@@ -330,44 +543,30 @@ def supervisor_applications(request):
     if request.user.role != "supervisor":
         messages.error(request, "Access denied.")
         return redirect("dashboard")
-    apps = Application.objects.filter(thesis__supervisor=request.user).order_by("-application_date")
+    apps = Application.objects.list_ready().filter(thesis__supervisor=request.user).order_by("-application_date")
     return render(request, "supervisor_applications.html", {"applications": apps})
 
 # SUPERVISOR: accept/reject via POST
 @login_required
 def update_application_status(request, pk):
-    app = get_object_or_404(Application, pk=pk, thesis__supervisor=request.user)
+    app = get_object_or_404(Application.objects.list_ready(), pk=pk, thesis__supervisor=request.user)
 
     if request.method == "POST":
         action = request.POST.get("action")
 
         if action == "accept":
-            # count accepted applications for this supervisor across ALL their theses
-            accepted_count = Application.objects.filter(
-                thesis__supervisor=request.user,
-                status=Application.Status.ACCEPTED,
-            ).count()
-
-            if accepted_count >= 7:
-                messages.error(request, "You cannot accept more than 7 students across all your theses.")
-            elif not app.thesis.has_capacity:
-                messages.error(request, "Thesis has no capacity.")
+            # capacity is checked against the maintained counters, no COUNT queries
+            try:
+                applications.change_status(app, Application.Status.ACCEPTED)
+            except applications.CapacityError as e:
+                messages.error(request, str(e))
             else:
-                app.status = Application.Status.ACCEPTED
-                app.save()
-                Notification.objects.create(
-                    recipient=app.student,
-                    message=f"Your application for '{app.thesis.title}' was accepted."
-                )
+                notify(app.student, f"Your application for '{app.thesis.title}' was accepted.")
                 messages.success(request, "Application accepted.")
 
         elif action == "reject":
-            app.status = Application.Status.REJECTED
-            app.save()
-            Notification.objects.create(
-                recipient=app.student,
-                message=f"Your application for '{app.thesis.title}' was rejected."
-            )
+            applications.change_status(app, Application.Status.REJECTED)
+            notify(app.student, f"Your application for '{app.thesis.title}' was rejected.")
             messages.success(request, "Application rejected.")
 
         return redirect("supervisor-applications")
@@ -424,14 +623,15 @@ def my_skills(request):
             skill_obj = form.save(commit=False)
             skill_obj.student = request.user
             try:
-                skill_obj.save()
+                with transaction.atomic():
+                    skill_obj.save()
                 messages.success(request, "Skill added.")
-            except Exception:
+            except IntegrityError:
                 messages.error(request, "Skill already added.")
             return redirect("my-skills")
     else:
         form = StudentSkillForm()
-    skills = StudentSkill.objects.filter(student=request.user)
+    skills = StudentSkill.objects.select_related("skill").filter(student=request.user)
     return render(request, "skills.html", {"skills": skills, "form": form})
 
 @login_required
@@ -449,14 +649,15 @@ def my_interests(request):
             int_obj = form.save(commit=False)
             int_obj.student = request.user
             try:
-                int_obj.save()
+                with transaction.atomic():
+                    int_obj.save()
                 messages.success(request, "Interest added.")
-            except Exception:
+            except IntegrityError:
                 messages.error(request, "Interest already added.")
             return redirect("my-interests")
     else:
         form = StudentInterestForm()
-    interests = StudentInterest.objects.filter(student=request.user)
+    interests = StudentInterest.objects.select_related("interest").filter(student=request.user)
     return render(request, "interests.html", {"interests": interests, "form": form})
 
 @login_required
@@ -504,10 +705,16 @@ def apply_to_thesis(request, pk):
 @login_required
 def delete_notification(request, pk):
     notif = get_object_or_404(Notification, pk=pk, recipient=request.user)
-    notif.delete()
+    notifications.delete_notification(notif)
     messages.success(request, "Notification deleted.")
     return redirect("web-notifications")
 
+@login_required
+def mark_notifications_read(request):
+    if request.method == "POST":
+        notifications.mark_all_read(request.user)
+    return redirect("web-notifications")
+
 from django.contrib.auth.forms import UserChangeForm
 
 @login_required
@@ -527,8 +734,7 @@ def edit_profile(request):
 def withdraw_application(request, pk):
     app = get_object_or_404(Application, pk=pk, student=request.user, status="pending")
     if request.method == "POST":
-        app.status = "withdrawn"
-        app.save()
+        applications.change_status(app, Application.Status.WITHDRAWN)
         messages.info(request, "Application withdrawn.")
     return redirect("my-applications")
 
@@ -538,27 +744,18 @@ def matched_theses(request):
         messages.error(request, "Only students can view matched theses.")
         return redirect("dashboard")
 
-    # Collect the student's skills and interests (just the IDs)
-    student_skill_ids = StudentSkill.objects.filter(student=request.user).values_list("skill_id", flat=True)
-    student_interest_ids = StudentInterest.objects.filter(student=request.user).values_list("interest_id", flat=True)
-
-    # Match theses by overlapping required_skills or interests
-    theses = (
-        Thesis.objects.filter(status=Thesis.Status.OPEN)
-        .annotate(
-            shared_skills=Count(
-                "required_skills",
-                filter=Q(required_skills__in=student_skill_ids),
-                distinct=True,
-            ),
-            shared_interests=Count(
-                "interests",
-                filter=Q(interests__in=student_interest_ids),
-                distinct=True,
-            ),
-        )
-        .filter(Q(shared_skills__gte=2) | Q(shared_interests__gte=2))
-    )
+    # Rank open theses with the in-memory engine instead of Count joins per thesis
+    matches = matching.get_engine().top_matches(request.user.id)
+    by_id = Thesis.objects.list_ready().in_bulk([m.thesis_id for m in matches])
+    theses = []
+    for m in matches:
+        thesis = by_id.get(m.thesis_id)
+        if thesis is None:
+            continue
+        thesis.match_score = m.score
+        thesis.shared_skills = m.shared_skills
+        thesis.shared_interests = m.shared_interests
+        thesis.near_misses = m.near_misses
+        theses.append(thesis)
 
     return render(request, "matched_theses.html", {"theses": theses})
-
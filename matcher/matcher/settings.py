@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,6 +45,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.profiling.QueryProfilingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -65,6 +67,7 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "core.context_processors.notifications",
             ],
         },
     },
@@ -87,6 +90,15 @@ DATABASES = {
     }
 }
 
+# MATCHER_DB=sqlite runs everything (tests, benchmarks) against a local file, no Postgres needed
+if os.environ.get("MATCHER_DB") == "sqlite":
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get("MATCHER_SQLITE_PATH", BASE_DIR / 'db.sqlite3'),
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -131,13 +143,72 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "core.User"
 
+# Read-only list APIs build JSON from values() rows (core.lean); False falls back to the DRF serializers
+LEAN_LIST_SERIALIZERS = True
+
 REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
-    ]
+    ],
+    # list endpoints page by cursor; clients may ask for up to 500 rows with ?page_size=
+    "DEFAULT_PAGINATION_CLASS": "core.pagination.KeysetPagination",
+    "PAGE_SIZE": 50,
 }
 
+# Matching: minimum shared skills or interests, results per student,
+# and how long a process keeps its in-memory engine before rebuilding
+MATCH_MIN_SHARED = 2
+MATCH_TOP_K = 20
+MATCH_ENGINE_TTL = 60
+# Skill/interest/status edits mark students or theses dirty; a background thread recomputes
+# their MatchScore rows every MATCH_REFRESH_INTERVAL seconds (False: right after the commit)
+MATCH_REFRESH_ASYNC = True
+MATCH_REFRESH_INTERVAL = 2.0
+MATCH_REFRESH_BATCH_SIZE = 500
+
+# Request profiling (core.profiling): share of requests measured, how often one statement
+# may repeat in a request before it is flagged as N+1, and per-view history kept
+PROFILING_ENABLED = True
+PROFILING_SAMPLE_RATE = 1.0
+PROFILING_N_PLUS_ONE_THRESHOLD = 5
+PROFILING_WINDOW = 200
+
+NOTIFICATION_UNREAD_TTL = 300  # seconds; bounds drift of the cached unread counts
+NOTIFICATION_RETENTION_DAYS = 90  # read notifications older than this are archived (archive_notifications)
+
+# Server-sent event stream (/api/notifications/stream/, ASGI only): pub/sub broker class
+# and seconds between keep-alive comments on an idle connection
+NOTIFICATION_BROKER = "core.pubsub.LocalBroker"
+NOTIFICATION_STREAM_HEARTBEAT = 15
+
+# The cache holds one unread-count key per user plus the catalog entries. LocMemCache is per
+# process: with several workers, badges and catalogs can be stale for up to their TTLs, so
+# MATCHER_REDIS_URL=redis://host:6379/0 (needs the redis package) switches to one shared cache.
+# MAX_ENTRIES is sized so that active users' counters are not culled back to COUNT queries.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "matcher",
+        "TIMEOUT": 600,
+        "OPTIONS": {"MAX_ENTRIES": 50000},
+    }
+}
+if os.environ.get("MATCHER_REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["MATCHER_REDIS_URL"],
+            "TIMEOUT": 600,
+        }
+    }
+
+# Seconds a cached student catalog may live; bounds staleness across workers with a per-process cache
+CATALOG_CACHE_TTL = 600
+
+# Seconds before the in-process search index (non-PostgreSQL backends) is rebuilt from the database
+SEARCH_INDEX_TTL = 300
+
 LOGIN_REDIRECT_URL = "/profile/"
 LOGOUT_REDIRECT_URL = "/login/"
 LOGIN_URL = "/login/"
@@ -4,22 +4,33 @@ from core import views
 from core.views import ThesisListView, ThesisDetailView, ApplicationListView, ApplicationDetailView, UserListView, \
     StudentSkillView, ThesisSkillView, StudentInterestView, ThesisInterestView, NotificationListView, \
     StudentThesisListView, MyApplicationsView, ApplyToThesisView, MyNotificationsView, MyThesisListCreateView, \
-    MyThesisApplicationsView, UpdateApplicationStatusView
+    MyThesisApplicationsView, UpdateApplicationStatusView, MatchScoreListView, ProfilingSummaryView, \
+    NotificationUnreadView, NotificationMarkAllReadView, SupervisorStatsView, \
+    BulkDecisionView, ThesisImportView, StudentImportView, ApplicationExportView, ThesisSearchView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("accounts/", include("django.contrib.auth.urls")),
 
     path("api/theses/", ThesisListView.as_view(), name="api-thesis-list"),
+    path("api/theses/search/", ThesisSearchView.as_view(), name="api-thesis-search"),
     path("api/theses/<int:pk>/", ThesisDetailView.as_view(), name="api-thesis-detail"),
     path("api/applications/", ApplicationListView.as_view(), name="api-application-list"),
     path("api/applications/<int:pk>/", ApplicationDetailView.as_view(), name="api-application-detail"),
+    path("api/applications/export.<str:fmt>", ApplicationExportView.as_view(), name="api-application-export"),
     path("api/users/", UserListView.as_view(), name="api-user-list"),
     path("api/student-skills/", StudentSkillView.as_view(), name="api-student-skills"),
     path("api/student-interests/", StudentInterestView.as_view(), name="api-student-interests"),
     path("api/thesis-skills/", ThesisSkillView.as_view(), name="api-thesis-skills"),
     path("api/thesis-interests/", ThesisInterestView.as_view(), name="api-thesis-interests"),
     path("api/notifications/", NotificationListView.as_view(), name="api-notification-list"),
+    path("api/notifications/unread/", NotificationUnreadView.as_view(), name="api-notification-unread"),
+    path("api/notifications/mark-read/", NotificationMarkAllReadView.as_view(), name="api-notification-mark-read"),
+    path("api/notifications/stream/", views.notification_stream, name="api-notification-stream"),
+    path("api/matches/", MatchScoreListView.as_view(), name="api-match-list"),
+    path("api/admin/profile/", ProfilingSummaryView.as_view(), name="api-profile-summary"),
+    path("api/admin/import/theses/", ThesisImportView.as_view(), name="api-import-theses"),
+    path("api/admin/import/students/", StudentImportView.as_view(), name="api-import-students"),
 
     # student API
     path("api/student/theses/", StudentThesisListView.as_view(), name="api-student-thesis-list"),
@@ -32,6 +43,8 @@ urlpatterns = [
     path("api/supervisor/applications/", MyThesisApplicationsView.as_view(), name="api-my-thesis-applications"),
     path("api/supervisor/applications/<int:pk>/", UpdateApplicationStatusView.as_view(),
          name="api-update-application-status"),
+    path("api/supervisor/applications/decide/", BulkDecisionView.as_view(), name="api-bulk-decisions"),
+    path("api/supervisor/stats/", SupervisorStatsView.as_view(), name="api-supervisor-stats"),
 
     path("", include("core.urls")),
 ]